@@ -3746,6 +3746,14 @@
       ADD CONSTRAINT pk_order_details PRIMARY KEY (order_id, product_id);
 
 
+  --
+  -- Name: idx_order_details_product_id; Type: INDEX; Schema: public; Owner: -
+  -- Filtro GET /order-details?product_id= (a PK só atende buscas por order_id)
+  --
+
+  CREATE INDEX idx_order_details_product_id ON order_details (product_id);
+
+
   --
   -- Name: pk_orders; Type: CONSTRAINT; Schema: public; Owner: -; Tablespace: 
   --
@@ -3908,4 +3916,28 @@
       
   --
   -- PostgreSQL database dump complete
-  --
\ No newline at end of file
+  --
+
+  --
+  -- Contador de alterações por tabela, usado como validador (ETag/Last-Modified) pela API
+  --
+  CREATE TABLE IF NOT EXISTS table_version (
+      table_name VARCHAR(63) PRIMARY KEY,
+      version BIGINT NOT NULL DEFAULT 0,
+      modified_at TIMESTAMPTZ NOT NULL DEFAULT now()
+  );
+
+  CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger AS $$
+  BEGIN
+      INSERT INTO table_version (table_name, version, modified_at)
+      VALUES (TG_TABLE_NAME, 1, now())
+      ON CONFLICT (table_name) DO UPDATE
+      SET version = table_version.version + 1, modified_at = now();
+      RETURN NULL;
+  END;
+  $$ LANGUAGE plpgsql;
+
+  CREATE TRIGGER trg_categories_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON categories
+      FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+  CREATE TRIGGER trg_order_details_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON order_details
+      FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
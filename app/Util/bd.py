@@ -1,35 +1,302 @@
-import psycopg2
-from psycopg2 import OperationalError
-import yaml
-import os
-
-# Obter o caminho absoluto usando o diretório atual do script
-current_dir = os.path.dirname(os.path.abspath(__file__))
-config_path = os.path.join(current_dir, 'paramsBD.yml')
-
-with open(config_path, 'r') as config_file:
-    config = yaml.safe_load(config_file)
-
-def create_connection():
-    """
-    Create a connection to the PostgreSQL database.
-    :return: Connection object or raises an exception
-    """
-    try:
-        print(f"Attempting to connect to database: {config['db_name']} at {config['db_host']}:{config['db_port']}")
-        connection = psycopg2.connect(
-            database=config['db_name'],
-            user=config['db_user'],
-            password=config['db_password'],
-            host=config['db_host'],
-            port=config['db_port'],
-        )
-        print("Connection to PostgreSQL DB successful")
-        return connection
-    except OperationalError as e:
-        print(f"Database connection failed: {e}")
-        print(f"Connection details: host={config['db_host']}, port={config['db_port']}, database={config['db_name']}, user={config['db_user']}")
-        raise e
-
-# Example usage:
-# connection = create_connection("your_db_name", "your_db_user", "your_db_password", "your_db_host", "your_db_port")
\ No newline at end of file
+import psycopg2
+from psycopg2 import OperationalError, InterfaceError
+from psycopg2 import extensions
+from collections import OrderedDict
+from contextlib import contextmanager
+import logging
+import threading
+import time
+import yaml
+import os
+
+# Novas conexões físicas (o pool as recicla) são registradas só em nível DEBUG
+logger = logging.getLogger(__name__)
+
+# Obter o caminho absoluto usando o diretório atual do script
+current_dir = os.path.dirname(os.path.abspath(__file__))
+config_path = os.path.join(current_dir, 'paramsBD.yml')
+
+with open(config_path, 'r') as config_file:
+    config = yaml.safe_load(config_file)
+
+# Funções chamadas a cada chamada ao banco com (evento, duração em segundos,
+# cursor, sql, parâmetros), onde evento é 'execute' ou 'fetch'; usadas pela
+# instrumentação da API (app/Util/metrics.py).
+query_listeners = []
+
+def _notify(event, elapsed, cursor, query=None, vars=None):
+    for listener in query_listeners:
+        listener(event, elapsed, cursor, query, vars)
+
+
+class TimedCursor(extensions.cursor):
+    """
+    Cursor that reports the time spent in each database call, and in
+    fetching its rows, to query_listeners. `label` replaces the SQL text
+    reported for the next calls (e.g. the original query of an EXECUTE).
+    """
+
+    label = None
+
+    def execute(self, query, vars=None):
+        start = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            _notify('execute', time.perf_counter() - start, self, self.label or query, vars)
+
+    def executemany(self, query, vars_list):
+        start = time.perf_counter()
+        try:
+            return super().executemany(query, vars_list)
+        finally:
+            _notify('execute', time.perf_counter() - start, self, self.label or query, vars_list)
+
+    def copy_expert(self, sql, file, size=8192):
+        start = time.perf_counter()
+        try:
+            return super().copy_expert(sql, file, size)
+        finally:
+            _notify('execute', time.perf_counter() - start, self, sql)
+
+    def fetchone(self):
+        start = time.perf_counter()
+        try:
+            return super().fetchone()
+        finally:
+            _notify('fetch', time.perf_counter() - start, self)
+
+    def fetchmany(self, size=None):
+        start = time.perf_counter()
+        try:
+            return super().fetchmany(self.arraysize if size is None else size)
+        finally:
+            _notify('fetch', time.perf_counter() - start, self)
+
+    def fetchall(self):
+        start = time.perf_counter()
+        try:
+            return super().fetchall()
+        finally:
+            _notify('fetch', time.perf_counter() - start, self)
+
+
+class TrackedConnection(extensions.connection):
+    """
+    Connection that remembers the statements PREPAREd on its session, in
+    least recently used order (see app/Util/statements.py).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared = OrderedDict()
+
+
+def create_connection():
+    """
+    Create a connection to the PostgreSQL database.
+    :return: Connection object or raises an exception
+    """
+    try:
+        logger.debug("Attempting to connect to database: %s at %s:%s", config['db_name'], config['db_host'], config['db_port'])
+        connection = psycopg2.connect(
+            database=config['db_name'],
+            user=config['db_user'],
+            password=config['db_password'],
+            host=config['db_host'],
+            port=config['db_port'],
+            connection_factory=TrackedConnection,
+            cursor_factory=TimedCursor,
+        )
+        logger.debug("Connection to PostgreSQL DB successful")
+        return connection
+    except OperationalError as e:
+        logger.error(
+            "Database connection failed: %s (host=%s, port=%s, database=%s, user=%s)",
+            e, config['db_host'], config['db_port'], config['db_name'], config['db_user']
+        )
+        raise e
+
+
+class PoolTimeout(Exception):
+    """
+    Raised when no connection could be borrowed from the pool within the timeout.
+    """
+
+
+class ConnectionPool:
+    """
+    Bounded, thread-safe pool of PostgreSQL connections.
+
+    Idle connections are kept in a LIFO stack together with the time they were
+    returned, so the most recently used (and therefore warmest) connection is
+    handed out first and the ones left at the bottom age out via max_idle.
+    """
+
+    def __init__(self, min_size=1, max_size=10, timeout=30.0, max_idle=300.0, max_lifetime=3600.0, connect=create_connection):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("Invalid pool size: min_size=%s, max_size=%s" % (min_size, max_size))
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self._connect = connect
+        self._idle = []  # [(connection, returned_at)]
+        self._created_at = {}  # id(connection) -> created_at
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition(threading.Lock())
+        for _ in range(min_size):
+            conn = self._open()
+            self._idle.append((conn, time.monotonic()))
+
+    def _open(self):
+        conn = self._connect()
+        self._created_at[id(conn)] = time.monotonic()
+        self._size += 1
+        return conn
+
+    def _discard(self, conn):
+        self._created_at.pop(id(conn), None)
+        self._size -= 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _is_usable(self, conn, returned_at, now):
+        if conn.closed:
+            return False
+        if self.max_idle and now - returned_at > self.max_idle:
+            return False
+        if self.max_lifetime and now - self._created_at.get(id(conn), now) > self.max_lifetime:
+            return False
+        return True
+
+    def getconn(self):
+        """
+        Borrow a connection, waiting up to `timeout` seconds for one to be free.
+        """
+        deadline = time.monotonic() + self.timeout
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolTimeout("Connection pool is closed")
+                now = time.monotonic()
+                while self._idle:
+                    conn, returned_at = self._idle.pop()
+                    if self._is_usable(conn, returned_at, now):
+                        return conn
+                    self._discard(conn)
+                if self._size < self.max_size:
+                    # Reserve the slot before releasing the lock to connect.
+                    self._size += 1
+                    break
+                remaining = deadline - now
+                if remaining <= 0:
+                    raise PoolTimeout("Timed out after %.1fs waiting for a database connection" % self.timeout)
+                self._cond.wait(remaining)
+        try:
+            conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._created_at[id(conn)] = time.monotonic()
+        return conn
+
+    def putconn(self, conn, broken=False):
+        """
+        Return a borrowed connection. Connections that are closed, broken or
+        left in an unknown transaction state are dropped instead of reused.
+        """
+        if not broken and not conn.closed:
+            try:
+                status = conn.info.transaction_status
+                if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+                    broken = True
+                elif status != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except (OperationalError, InterfaceError):
+                broken = True
+        with self._cond:
+            if broken or conn.closed or self._closed:
+                self._discard(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def closeall(self):
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                conn, _ = self._idle.pop()
+                self._discard(conn)
+            self._cond.notify_all()
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+# Pools herdados de outro processo via fork. Ficam referenciados para nunca serem
+# finalizados aqui: fechar essas conexões encerraria as sessões do processo pai.
+_inherited_pools = []
+
+def get_pool():
+    """
+    Return the process-wide pool, creating it on first use. The pool is rebuilt
+    after a fork so child processes never share sockets with their parent.
+    """
+    global _pool, _pool_pid
+    pid = os.getpid()
+    if _pool is not None and _pool_pid == pid:
+        return _pool
+    with _pool_lock:
+        if _pool is None or _pool_pid != pid:
+            if _pool is not None:
+                _inherited_pools.append(_pool)
+            _pool = ConnectionPool(
+                min_size=int(config.get('pool_min_size', 1)),
+                max_size=int(config.get('pool_max_size', 10)),
+                timeout=float(config.get('pool_timeout', 30)),
+                max_idle=float(config.get('pool_max_idle', 300)),
+                max_lifetime=float(config.get('pool_max_lifetime', 3600)),
+            )
+            _pool_pid = pid
+    return _pool
+
+def close_pool():
+    """
+    Close every idle connection of this process' pool and drop it; the next
+    get_connection() creates a new one. Used by the server before forking workers.
+    """
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is not None:
+            if _pool_pid == os.getpid():
+                _pool.closeall()
+            else:
+                _inherited_pools.append(_pool)
+        _pool = None
+        _pool_pid = None
+
+@contextmanager
+def get_connection():
+    """
+    Borrow a connection from the pool for the duration of a `with` block.
+    Any transaction left open is rolled back before the connection is returned.
+    :return: Connection object
+    """
+    pool = get_pool()
+    conn = pool.getconn()
+    broken = False
+    try:
+        yield conn
+    except (OperationalError, InterfaceError):
+        broken = True
+        raise
+    finally:
+        pool.putconn(conn, broken=broken or conn.closed != 0)
@@ -0,0 +1,102 @@
+import os
+import tempfile
+
+from app.Util.bd import config
+
+BLOB_CACHE_DIR = config.get('blob_cache_dir') or os.path.join(tempfile.gettempdir(), 'api_blob_cache')
+
+# Tamanho máximo do cache em disco (bytes); acima disso os menos usados são removidos
+BLOB_CACHE_MAX_BYTES = int(config.get('blob_cache_max_bytes', 256 * 1024 * 1024))
+
+# Assinaturas (magic numbers) dos formatos de imagem aceitos
+_SIGNATURES = (
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif'),
+    (b'BM', 'image/bmp'),
+)
+
+# As figuras do Northwind foram gravadas como objetos OLE do Access: um
+# cabeçalho de 78 bytes seguido do bitmap.
+_OLE_HEADER_SIZE = 78
+
+
+def strip_ole_header(data):
+    """
+    Return the image bytes without the Access OLE header, when present.
+    """
+    data = bytes(data)
+    if data[:2] == b'\x15\x1c' and data[_OLE_HEADER_SIZE:_OLE_HEADER_SIZE + 2] == b'BM':
+        return data[_OLE_HEADER_SIZE:]
+    return data
+
+
+def sniff_mimetype(head):
+    """
+    Guess the content type of an image from its first bytes.
+    """
+    for signature, mimetype in _SIGNATURES:
+        if head.startswith(signature):
+            return mimetype
+    return 'application/octet-stream'
+
+
+def cached_blob_path(key):
+    """
+    Path of the cached copy of a blob, or None if it is not cached yet.
+    :param key: Content hash of the blob
+    """
+    path = os.path.join(BLOB_CACHE_DIR, key)
+    try:
+        # O mtime marca o último uso, para a remoção dos menos usados
+        os.utime(path)
+    except OSError:
+        return None
+    return path if os.path.isfile(path) else None
+
+
+def _evict(keep):
+    # Remove os arquivos usados há mais tempo até o cache caber no limite.
+    # Outros workers podem remover os mesmos arquivos ao mesmo tempo.
+    entries = []
+    with os.scandir(BLOB_CACHE_DIR) as found:
+        for entry in found:
+            if entry.name.startswith('tmp') or entry.path == keep:
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+    total = sum(size for _, size, _ in entries) + os.path.getsize(keep)
+    for _, size, path in sorted(entries):
+        if total <= BLOB_CACHE_MAX_BYTES:
+            break
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+        total -= size
+
+
+def store_blob(key, data):
+    """
+    Write a blob to the on-disk cache atomically, so concurrent workers never
+    serve a partially written file, then evict the least recently used blobs
+    beyond BLOB_CACHE_MAX_BYTES (replaced pictures leave their old digest
+    behind until it is evicted).
+    :return: Path of the cached file
+    """
+    os.makedirs(BLOB_CACHE_DIR, exist_ok=True)
+    path = os.path.join(BLOB_CACHE_DIR, key)
+    fd, tmp_path = tempfile.mkstemp(dir=BLOB_CACHE_DIR)
+    try:
+        with os.fdopen(fd, 'wb') as tmp:
+            tmp.write(data)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+    _evict(path)
+    return path
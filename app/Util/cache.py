@@ -0,0 +1,157 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+import threading
+import time
+
+from flask import g, has_app_context
+from prometheus_client import Counter, Gauge
+
+from app.Util.bd import config
+
+CACHE_HITS = Counter('api_query_cache_hits_total', 'Consultas respondidas pelo cache', ['table'])
+CACHE_MISSES = Counter('api_query_cache_misses_total', 'Consultas que precisaram ir ao banco', ['table'])
+CACHE_EVICTIONS = Counter('api_query_cache_evictions_total', 'Entradas removidas do cache', ['reason'])
+CACHE_ENTRIES = Gauge('api_query_cache_entries', 'Entradas no cache de consultas', multiprocess_mode='liveall')
+
+
+class CacheBackend(ABC):
+    """
+    Interface of the query cache storage. Values are stored with the set of
+    table tags they depend on, so writes can invalidate them by table.
+    """
+
+    @abstractmethod
+    def get(self, key):
+        """Return the cached value or None."""
+
+    @abstractmethod
+    def set(self, key, value, tags):
+        """Store value under key, tagged with the tables it depends on."""
+
+    @abstractmethod
+    def invalidate(self, tags):
+        """Drop every entry tagged with any of the given tables."""
+
+    @abstractmethod
+    def clear(self):
+        """Drop every entry."""
+
+
+class MemoryCache(CacheBackend):
+    """
+    In-process LRU cache with a TTL and a bound on the number of entries.
+    Each worker process has its own copy; the TTL bounds how long another
+    worker may serve data older than a write it did not see.
+    """
+
+    def __init__(self, max_entries=1024, ttl=60.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (value, tags, expires_at)
+        self._keys_by_tag = {}
+        self._lock = threading.Lock()
+
+    def _remove(self, key, reason):
+        _, tags, _ = self._entries.pop(key)
+        for tag in tags:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+        CACHE_EVICTIONS.labels(reason).inc()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[2] < time.monotonic():
+                self._remove(key, 'expired')
+                CACHE_ENTRIES.set(len(self._entries))
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key, value, tags):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key, 'replaced')
+            self._entries[key] = (value, tuple(tags), time.monotonic() + self.ttl)
+            for tag in tags:
+                self._keys_by_tag.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)), 'size')
+            CACHE_ENTRIES.set(len(self._entries))
+
+    def invalidate(self, tags):
+        with self._lock:
+            for tag in tags:
+                for key in list(self._keys_by_tag.get(tag, ())):
+                    self._remove(key, 'invalidated')
+            CACHE_ENTRIES.set(len(self._entries))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_tag.clear()
+            CACHE_ENTRIES.set(0)
+
+
+_backend = MemoryCache(
+    max_entries=int(config.get('cache_max_entries', 1024)),
+    ttl=float(config.get('cache_ttl', 60)),
+)
+
+def set_cache_backend(backend):
+    """
+    Replace the storage used by the query cache (e.g. a shared cache server).
+    """
+    global _backend
+    _backend = backend
+
+def _versions(tags):
+    # Versões lidas por @conditional nesta requisição (app/Util/etag.py): com elas na
+    # chave, uma escrita feita fora da API (sem invalidate) não serve o corpo antigo
+    # com o ETag novo
+    versions = g.get('table_versions') if has_app_context() else None
+    if not versions:
+        return None
+    return tuple(versions.get(tag) for tag in tags)
+
+def _cached(cursor, sql, params, tags, fetch):
+    key = (fetch, sql, tuple(params), _versions(tags))
+    table = tags[0]
+    value = _backend.get(key)
+    if value is not None:
+        CACHE_HITS.labels(table).inc()
+        return value[0]
+    CACHE_MISSES.labels(table).inc()
+    cursor.execute(sql, params)
+    result = cursor.fetchone() if fetch == 'one' else cursor.fetchall()
+    # Guardado dentro de uma tupla para que resultados None (registro inexistente) também fiquem em cache
+    _backend.set(key, (result,), tags)
+    return result
+
+def cached_fetchone(cursor, sql, params, tags):
+    """
+    Read-through cache for a single-row query.
+    :param tags: Tables the result depends on; the first one labels the metrics
+    :return: Row tuple or None
+    """
+    return _cached(cursor, sql, params, tags, 'one')
+
+def cached_fetchall(cursor, sql, params, tags):
+    """
+    Read-through cache for a multi-row query.
+    :param tags: Tables the result depends on; the first one labels the metrics
+    :return: List of row tuples
+    """
+    return _cached(cursor, sql, params, tags, 'all')
+
+def invalidate(*tags):
+    """
+    Drop cached results that depend on any of the given tables.
+    Call after committing a write to those tables.
+    """
+    _backend.invalidate(tags)
@@ -0,0 +1,126 @@
+import gzip
+import zlib
+
+from flask import request
+
+from app.Util.bd import config
+
+# brotli e zstandard são opcionais: sem eles a negociação oferece só o que estiver instalado
+try:
+    import brotli
+except ImportError:
+    brotli = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Respostas menores que isso (bytes) não compensam a compressão
+MIN_SIZE = int(config.get('compression_min_size', 1024))
+
+_LEVELS = config.get('compression_levels') or {}
+GZIP_LEVEL = int(_LEVELS.get('gzip', 6))
+BROTLI_QUALITY = int(_LEVELS.get('br', 4))
+ZSTD_LEVEL = int(_LEVELS.get('zstd', 3))
+
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson', 'application/javascript', 'image/svg+xml')
+
+# Ordem de preferência do servidor quando o cliente aceita mais de uma com a mesma qualidade
+ENCODINGS = [name for name, available in (('br', brotli), ('zstd', zstandard), ('gzip', gzip)) if available]
+
+
+def choose_encoding(accept):
+    """
+    Pick the content coding for a response.
+    :param accept: Parsed Accept-Encoding (werkzeug Accept, e.g. request.accept_encodings)
+    :return: 'br', 'zstd', 'gzip' or None
+    """
+    best, best_quality = None, 0
+    for encoding in ENCODINGS:
+        quality = accept.quality(encoding)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def is_compressible(mimetype):
+    return bool(mimetype) and (mimetype.startswith('text/') or mimetype in COMPRESSIBLE_TYPES)
+
+
+def compress(data, encoding):
+    """
+    Compress a whole body.
+    """
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    if encoding == 'zstd':
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def compress_stream(chunks, encoding):
+    """
+    Compress a streamed body chunk by chunk, flushing after each one so the
+    client receives every batch as soon as it is produced.
+    Closing the generator closes `chunks` (and releases its connection).
+    """
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        process, flush, finish = compressor.process, compressor.flush, compressor.finish
+    elif encoding == 'zstd':
+        compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+        process = compressor.compress
+        flush = lambda: compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        finish = compressor.flush
+    else:
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        process = compressor.compress
+        flush = lambda: compressor.flush(zlib.Z_SYNC_FLUSH)
+        finish = compressor.flush
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            data = process(chunk) + flush()
+            if data:
+                yield data
+        yield finish()
+    finally:
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            close()
+
+
+def _compress_response(response):
+    if (request.method == 'HEAD' or response.status_code < 200 or response.status_code in (204, 206, 304)
+            or 'Content-Encoding' in response.headers or response.direct_passthrough
+            or not is_compressible(response.mimetype)):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = choose_encoding(request.accept_encodings)
+    if encoding is None:
+        return response
+    if response.is_streamed:
+        response.response = compress_stream(response.response, encoding)
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < MIN_SIZE:
+            return response
+        response.set_data(compress(data, encoding))
+    response.headers['Content-Encoding'] = encoding
+    # O corpo compactado difere byte a byte do original: o ETag passa a ser fraco
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_compression(app):
+    """
+    Compress the JSON/NDJSON/text responses of the Flask app with the best
+    coding the client accepts (Accept-Encoding): brotli, zstd or gzip.
+    Bodies under MIN_SIZE are sent as is; streamed responses are compressed
+    chunk by chunk.
+    """
+    app.after_request(_compress_response)
@@ -0,0 +1,104 @@
+import functools
+import hashlib
+
+from flask import current_app, g, request
+from psycopg2 import errors
+
+from app.Util.bd import get_connection
+
+# Desligado na primeira vez em que a tabela table_version não existir (banco sem
+# a migração); as rotas passam a responder normalmente, sem validadores.
+_enabled = True
+
+
+def _table_state(tables):
+    """
+    Read the change counters of the given tables, maintained by the
+    bump_table_version() triggers (see init.sql).
+    :return: (versions, last_modified) or None when unavailable
+    """
+    global _enabled
+    if not _enabled:
+        return None
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                "SELECT table_name, version, modified_at FROM table_version WHERE table_name = ANY(%s)",
+                (list(tables),)
+            )
+            rows = {row[0]: row for row in cursor.fetchall()}
+        except errors.UndefinedTable:
+            print("Tabela table_version não encontrada; ETag/Last-Modified desativados")
+            _enabled = False
+            return None
+        finally:
+            cursor.close()
+    versions = tuple((table, rows[table][1] if table in rows else 0) for table in tables)
+    modified = [row[2] for row in rows.values() if row[2] is not None]
+    return versions, max(modified) if modified else None
+
+
+def make_etag(full_path, accept, versions, key=''):
+    """
+    ETag of a response built from tables at the given versions.
+    The representation depends on the full URL (filters, pagination, fields)
+    and on the Accept header, so both are part of the hash.
+    :param key: Further inputs of the representation that are not in the URL
+    """
+    raw = f"{full_path}|{accept}|{versions}|{key}"
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def _not_modified(etag, last_modified):
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since and last_modified is not None:
+        return last_modified.replace(microsecond=0) <= request.if_modified_since
+    return False
+
+
+def conditional(*tables, extra=None, vary=None):
+    """
+    Answer GET requests with 304 Not Modified while none of `tables` changed
+    since the validators the client sent, without running the view.
+    :param tables: Tables the response is built from
+    :param extra: Function returning further tables read by the current
+                  request (e.g. app.Util.expand.expand_tables)
+    :param vary: Function returning (key, since) for inputs of the response
+                 missing from the URL, such as a default period resolved from
+                 today: key goes into the ETag and Last-Modified is never
+                 earlier than since (an aware datetime, or None)
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                request_tables = tables
+                if extra is not None:
+                    request_tables += tuple(table for table in extra() if table not in tables)
+                state = _table_state(request_tables)
+                key, since = vary() if vary is not None else ('', None)
+            except Exception:
+                state = None
+            if state is None:
+                return view(*args, **kwargs)
+            versions, last_modified = state
+            if since is not None and (last_modified is None or since > last_modified):
+                last_modified = since
+            # Usadas também na chave do cache de consultas (app/Util/cache.py)
+            g.table_versions = dict(versions)
+            etag = make_etag(request.full_path, request.headers.get('Accept', ''), versions, key)
+            if _not_modified(etag, last_modified):
+                response = current_app.response_class(status=304)
+            else:
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag, weak=True)
+            if last_modified is not None:
+                response.last_modified = last_modified
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,120 @@
+from flask import request
+
+from app.Util.bd import config
+from app.Util.schema import NUMERIC_COLUMNS, TABLE_COLUMNS
+
+# Níveis aceitos em ?expand= (ex.: alunos.pagamentos tem dois)
+MAX_DEPTH = int(config.get('expand_max_depth', 2))
+
+# Relações resolvidas por ?expand=: tabela -> nome -> (tabela relacionada, cardinalidade,
+# coluna da relacionada, coluna da tabela de origem, ORDER BY das listas)
+RELATIONS = {
+    'turma': {
+        'professor': ('professor', 'one', 'id_professor', 'id_professor', ()),
+        'alunos': ('aluno', 'many', 'id_turma', 'id_turma', ('nome_completo', 'id_aluno')),
+    },
+    'aluno': {
+        'turma': ('turma', 'one', 'id_turma', 'id_turma', ()),
+        'pagamentos': ('pagamento', 'many', 'id_aluno', 'id_aluno', ('data_pagamento', 'id_pagamento')),
+    },
+    'pagamento': {
+        'aluno': ('aluno', 'one', 'id_aluno', 'id_aluno', ()),
+    },
+}
+
+
+def parse_expand(table, raw):
+    """
+    Parse the `expand` parameter: comma separated relation paths, nested
+    with dots (e.g. `professor,alunos.pagamentos`). Names are checked
+    against RELATIONS, so they are safe to interpolate into the query.
+    :param raw: Parameter value, or None when absent
+    :return: Tree of relations, e.g. {'professor': {}, 'alunos': {'pagamentos': {}}}
+    """
+    tree = {}
+    if raw is None:
+        return tree
+    for path in (path.strip() for path in raw.split(',')):
+        if not path:
+            continue
+        names = path.split('.')
+        if len(names) > MAX_DEPTH:
+            raise ValueError(f"Parâmetro 'expand' aceita no máximo {MAX_DEPTH} níveis: {path}")
+        current_table, node = table, tree
+        for name in names:
+            if name not in RELATIONS.get(current_table, {}):
+                raise ValueError(f"Relação inválida em 'expand': {path}")
+            node = node.setdefault(name, {})
+            current_table = RELATIONS[current_table][name][0]
+    return tree
+
+
+def related_tables(table, tree):
+    """
+    Tables read by the expansions in `tree`.
+    """
+    tables = []
+    for name, subtree in tree.items():
+        related = RELATIONS[table][name][0]
+        for found in [related] + related_tables(related, subtree):
+            if found not in tables:
+                tables.append(found)
+    return tables
+
+
+def _json_object(table, alias, tree, depth):
+    pairs = []
+    for column in TABLE_COLUMNS[table]:
+        # NUMERIC vira texto, como no provedor JSON da API (sem perda de precisão)
+        value = f"{alias}.{column}::text" if column in NUMERIC_COLUMNS else f"{alias}.{column}"
+        pairs.append(f"'{column}', {value}")
+    for name, subtree in tree.items():
+        pairs.append(f"'{name}', {_subquery(table, alias, name, subtree, depth + 1)}")
+    return f"json_build_object({', '.join(pairs)})"
+
+
+def _subquery(table, parent, name, tree, depth):
+    related, cardinality, column, parent_column, order = RELATIONS[table][name]
+    alias = f"x{depth}"
+    value = _json_object(related, alias, tree, depth)
+    where = f"{alias}.{column} = {parent}.{parent_column}"
+    if cardinality == 'one':
+        return f"(SELECT {value} FROM {related} {alias} WHERE {where})"
+    order_by = ', '.join(f"{alias}.{key}" for key in order)
+    return f"(SELECT coalesce(json_agg({value} ORDER BY {order_by}), '[]'::json) FROM {related} {alias} WHERE {where})"
+
+
+def expand_select(table, fields, raw):
+    """
+    Add one correlated subquery per expanded relation to the SELECT list,
+    built with json_build_object / json_agg so the related rows come back
+    in the same round trip, already shaped as JSON.
+    :param fields: Columns returned by get_fields
+    :param raw: `expand` parameter, or None
+    :return: (select, names, tables): SELECT expressions, the keys of the
+             result objects (fields followed by the relation names) and the
+             related tables read
+    """
+    tree = parse_expand(table, raw)
+    subqueries = tuple(f"{_subquery(table, table, name, subtree, 1)} AS {name}" for name, subtree in tree.items())
+    return fields + subqueries, fields + tuple(tree), related_tables(table, tree)
+
+
+def get_expand(table, fields):
+    """
+    Read `expand` from the query string of the current request.
+    """
+    return expand_select(table, fields, request.args.get('expand'))
+
+
+def expand_tables(table):
+    """
+    Related tables of the current request, for conditional(..., extra=...),
+    so the ETag also changes when an expanded table changes.
+    """
+    def tables():
+        try:
+            return related_tables(table, parse_expand(table, request.args.get('expand')))
+        except ValueError:
+            return []
+    return tables
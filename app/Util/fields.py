@@ -0,0 +1,44 @@
+from flask import request
+
+from app.Util.schema import TABLE_COLUMNS
+
+
+def parse_fields(table, raw):
+    """
+    Parse the `fields` parameter (comma separated column names). Names are
+    checked against TABLE_COLUMNS, so they are safe to interpolate into the
+    SELECT list.
+    :param table: Table the endpoint reads from
+    :param raw: Parameter value, or None when absent
+    :return: Tuple of columns in the requested order, or every column when absent
+    """
+    if raw is None:
+        return TABLE_COLUMNS[table]
+    fields = tuple(dict.fromkeys(name.strip() for name in raw.split(',') if name.strip()))
+    if not fields:
+        raise ValueError("Parâmetro 'fields' não pode ser vazio")
+    unknown = [name for name in fields if name not in TABLE_COLUMNS[table]]
+    if unknown:
+        raise ValueError(f"Campos inválidos em 'fields': {', '.join(unknown)}")
+    return fields
+
+
+def get_fields(table):
+    """
+    Read `fields` from the query string of the current request.
+    """
+    return parse_fields(table, request.args.get('fields'))
+
+
+def select_list(fields, keys=()):
+    """
+    Build the SELECT list of a keyset-paginated query: the requested fields
+    followed by the ORDER BY columns the cursor needs but the client left
+    out. rows_to_dicts(fields, rows) drops those trailing columns again.
+    :param fields: Columns returned by get_fields
+    :param keys: ORDER BY columns of the endpoint
+    :return: (sql, key) where key is the sort key function for split_page
+    """
+    columns = fields + tuple(key for key in keys if key not in fields)
+    positions = tuple(columns.index(key) for key in keys)
+    return ', '.join(columns), lambda row: tuple(row[i] for i in positions)
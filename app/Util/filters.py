@@ -0,0 +1,63 @@
+import datetime
+
+from flask import request
+
+
+def parse_int(value):
+    return int(value)
+
+
+def parse_date(value):
+    return datetime.date.fromisoformat(value)
+
+
+def parse_bool(value):
+    lowered = value.lower()
+    if lowered in ('true', '1'):
+        return True
+    if lowered in ('false', '0'):
+        return False
+    raise ValueError(value)
+
+
+def parse_str(value):
+    return value
+
+
+_TYPE_NAMES = {
+    parse_int: 'número inteiro',
+    parse_date: 'data AAAA-MM-DD',
+    parse_bool: 'true ou false',
+    parse_str: 'texto',
+}
+
+
+def parse_filters(spec, args):
+    """
+    Validate the filter parameters of a list endpoint.
+    :param spec: Tuple of (param, column, operator, parse), e.g.
+                 ('de', 'data_pagamento', '>=', parse_date)
+    :param args: Mapping with the query string
+    :return: List of (column, operator, value) for the parameters present
+    """
+    filters = []
+    for param, column, operator, parse in spec:
+        raw = args.get(param)
+        if raw is None or raw == '':
+            continue
+        try:
+            value = parse(raw)
+        except ValueError:
+            raise ValueError(f"Parâmetro '{param}' inválido: esperado {_TYPE_NAMES[parse]}")
+        filters.append((column, operator, value))
+    return filters
+
+
+def get_filters(spec):
+    """
+    Compile the filters of the current request into parameterized conditions.
+    :return: (conditions, params) to be passed on to keyset_where
+    """
+    filters = parse_filters(spec, request.args)
+    conditions = [f"{column} {operator} %s" for column, operator, _ in filters]
+    return conditions, tuple(value for _, _, value in filters)
@@ -0,0 +1,89 @@
+import base64
+import datetime
+import decimal
+import json
+import time
+
+from flask import g, has_request_context
+from flask.json.provider import JSONProvider
+
+# orjson é opcional: sem ele o provedor usa o json da biblioteca padrão com as mesmas regras
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(value):
+    # Datas em ISO-8601, Decimal como texto (sem perda de precisão) e bytea em base64
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return base64.b64encode(value).decode('ascii')
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    def dumps_bytes(obj):
+        """
+        Serialize obj to UTF-8 encoded JSON.
+        """
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+    def loads(s):
+        return orjson.loads(s)
+else:
+    def dumps_bytes(obj):
+        """
+        Serialize obj to UTF-8 encoded JSON.
+        """
+        return json.dumps(obj, default=_default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    def loads(s):
+        return json.loads(s)
+
+
+def _record_serialize_time(start):
+    # Somado ao "serialize" do cabeçalho Server-Timing (app/Util/metrics.py)
+    if has_request_context():
+        g.serialize_time = g.get('serialize_time', 0.0) + (time.perf_counter() - start)
+
+
+def dumps(obj):
+    """
+    Serialize obj to a JSON string.
+    """
+    return dumps_bytes(obj).decode('utf-8')
+
+
+def rows_to_dicts(columns, rows):
+    """
+    Map row tuples to JSON objects using the column names, e.g. from
+    [col[0] for col in cursor.description] or app.Util.schema.TABLE_COLUMNS.
+    """
+    start = time.perf_counter()
+    result = [dict(zip(columns, row)) for row in rows]
+    _record_serialize_time(start)
+    return result
+
+
+class FastJSONProvider(JSONProvider):
+    """
+    Flask JSON provider backed by orjson (when installed) that keeps the
+    response body as bytes end to end, instead of building a str first.
+    """
+
+    def dumps(self, obj, **kwargs):
+        return dumps(obj)
+
+    def loads(self, s, **kwargs):
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        start = time.perf_counter()
+        body = dumps_bytes(obj)
+        _record_serialize_time(start)
+        return self._app.response_class(body, mimetype='application/json')
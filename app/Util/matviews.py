@@ -0,0 +1,135 @@
+import os
+import threading
+import time
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from app.Util.bd import config, get_connection
+
+# Visões materializadas derivadas de cada tabela (ver init.sql / app/migrations)
+MATERIALIZED_VIEWS = {
+    'pagamento': ('pagamento_resumo_mensal', 'pagamento_meses_pagos'),
+}
+
+# Intervalo do refresh agendado e espera mínima entre dois refreshes disparados por escritas
+REFRESH_INTERVAL = float(config.get('matview_refresh_interval', 300))
+REFRESH_DEBOUNCE = float(config.get('matview_refresh_debounce', 5))
+
+REFRESH_DURATION = Histogram(
+    'api_matview_refresh_duration_seconds', 'Duração do REFRESH MATERIALIZED VIEW CONCURRENTLY',
+    ['view'], buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+)
+REFRESH_ERRORS = Counter('api_matview_refresh_errors_total', 'Refreshes de visões materializadas que falharam', ['view'])
+LAST_REFRESH = Gauge(
+    'api_matview_last_refresh_timestamp_seconds', 'Momento (epoch) do último refresh concluído',
+    ['view'], multiprocess_mode='max'
+)
+
+_dirty = set()
+_lock = threading.Lock()
+_wakeup = threading.Event()
+_thread = None
+_thread_pid = None
+
+
+def refresh_view(view, max_age=None):
+    """
+    Refresh a materialized view without blocking its readers and bump its
+    counter in table_version, so @conditional('<view>') responses change
+    only when the view content may have changed.
+    :param max_age: Skip the refresh when the view was refreshed less than
+                    max_age seconds ago (by any worker)
+    :return: False when another worker holds the view's lock
+    """
+    start = time.perf_counter()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            # Só um worker atualiza cada visão por vez; os demais desistem
+            cursor.execute("SELECT pg_try_advisory_xact_lock(hashtext(%s))", (view,))
+            if not cursor.fetchone()[0]:
+                conn.rollback()
+                return False
+            if max_age is not None:
+                cursor.execute(
+                    "SELECT 1 FROM table_version WHERE table_name = %s AND modified_at > now() - make_interval(secs => %s)",
+                    (view, max_age)
+                )
+                if cursor.fetchone():
+                    conn.rollback()
+                    return True
+            cursor.execute(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view}")
+            cursor.execute(
+                """
+                INSERT INTO table_version (table_name, version, modified_at)
+                VALUES (%s, 1, now())
+                ON CONFLICT (table_name) DO UPDATE
+                SET version = table_version.version + 1, modified_at = now()
+                """,
+                (view,)
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            REFRESH_ERRORS.labels(view).inc()
+            raise
+        finally:
+            cursor.close()
+    REFRESH_DURATION.labels(view).observe(time.perf_counter() - start)
+    LAST_REFRESH.labels(view).set(time.time())
+    return True
+
+
+def _run():
+    last_refresh = 0.0
+    while True:
+        triggered = _wakeup.wait(timeout=REFRESH_INTERVAL)
+        if triggered:
+            # Agrupa uma rajada de escritas em um único refresh
+            time.sleep(max(0.0, REFRESH_DEBOUNCE - (time.monotonic() - last_refresh)))
+        _wakeup.clear()
+        with _lock:
+            if triggered:
+                views = set(_dirty)
+            else:
+                views = {view for views in MATERIALIZED_VIEWS.values() for view in views}
+            _dirty.clear()
+        for view in sorted(views):
+            try:
+                # Cada worker tem seu próprio agendamento: o refresh agendado é pulado
+                # se outro worker já atualizou a visão dentro do intervalo
+                if not refresh_view(view, max_age=None if triggered else REFRESH_INTERVAL):
+                    # Outro worker está atualizando e pode não ter visto a última escrita
+                    with _lock:
+                        _dirty.add(view)
+                    _wakeup.set()
+            except Exception as e:
+                print(f"Falha ao atualizar a visão materializada {view}: {e}")
+        last_refresh = time.monotonic()
+
+
+def start_refresher():
+    """
+    Start the background refresh thread of this process, if not running.
+    Threads do not survive fork, so each worker starts its own on first use.
+    """
+    global _thread, _thread_pid
+    with _lock:
+        if _thread is not None and _thread_pid == os.getpid() and _thread.is_alive():
+            return
+        _thread = threading.Thread(target=_run, name='matview-refresh', daemon=True)
+        _thread_pid = os.getpid()
+        _thread.start()
+
+
+def request_refresh(table):
+    """
+    Schedule a refresh of the views derived from `table`, after a write.
+    """
+    views = MATERIALIZED_VIEWS.get(table)
+    if not views:
+        return
+    with _lock:
+        _dirty.update(views)
+    start_refresher()
+    _wakeup.set()
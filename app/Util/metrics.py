@@ -0,0 +1,156 @@
+import hashlib
+import os
+import re
+import time
+
+from flask import Response, g, has_request_context, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest, multiprocess
+)
+
+from app.Util.bd import config, query_listeners
+from app.Util.json_provider import dumps
+
+# Com PROMETHEUS_MULTIPROC_DIR definido (servidor com vários workers), cada
+# processo grava suas métricas em arquivos nesse diretório e /metrics agrega todos.
+MULTIPROCESS = bool(os.environ.get('PROMETHEUS_MULTIPROC_DIR'))
+
+# Consultas mais lentas que isso (ms) são registradas no log; 0 desliga
+SLOW_QUERY_THRESHOLD = float(config.get('slow_query_ms', 200)) / 1000.0
+# Cabeçalho Server-Timing (db, serialize, total) nas respostas
+SERVER_TIMING = bool(config.get('server_timing', True))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+REQUEST_COUNT = Counter(
+    'api_http_requests_total', 'Total de requisições HTTP atendidas',
+    ['method', 'blueprint', 'endpoint', 'status']
+)
+REQUEST_LATENCY = Histogram(
+    'api_http_request_duration_seconds', 'Tempo de resposta das requisições HTTP',
+    ['method', 'blueprint', 'endpoint'], buckets=LATENCY_BUCKETS
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    'api_http_requests_in_progress', 'Requisições HTTP em andamento',
+    ['method', 'blueprint', 'endpoint'], multiprocess_mode='livesum'
+)
+RESPONSE_SIZE = Histogram(
+    'api_http_response_size_bytes', 'Tamanho do corpo das respostas HTTP',
+    ['method', 'blueprint', 'endpoint'], buckets=SIZE_BUCKETS
+)
+DB_TIME = Histogram(
+    'api_http_request_db_seconds', 'Tempo gasto em consultas ao banco por requisição',
+    ['method', 'blueprint', 'endpoint'], buckets=LATENCY_BUCKETS
+)
+DB_QUERIES = Histogram(
+    'api_http_request_db_queries', 'Consultas ao banco por requisição',
+    ['method', 'blueprint', 'endpoint'], buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100)
+)
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r'\s+')
+
+
+def fingerprint(query):
+    """
+    Normalize a query for grouping in the slow query log: literals become
+    `?` and whitespace is collapsed.
+    :return: (short hash, normalized SQL)
+    """
+    if isinstance(query, bytes):
+        query = query.decode('utf-8', 'replace')
+    normalized = _WHITESPACE.sub(' ', _LITERALS.sub('?', str(query))).strip()
+    return hashlib.md5(normalized.encode('utf-8')).hexdigest()[:12], normalized
+
+
+def _log_slow_query(elapsed, cursor, query, vars):
+    digest, normalized = fingerprint(query)
+    print(dumps({
+        'event': 'slow_query',
+        'method': request.method,
+        'route': request.url_rule.rule if request.url_rule else request.path,
+        'fingerprint': digest,
+        'sql': normalized[:1000],
+        'params': len(vars) if vars is not None else 0,
+        'duration_ms': round(elapsed * 1000, 3),
+        'rows': cursor.rowcount,
+    }), flush=True)
+
+
+def record_db_call(event, elapsed, cursor, query, vars):
+    """
+    Add the duration of a database call to the current request and log it
+    when slower than SLOW_QUERY_THRESHOLD.
+    Registered in app/Util/bd.py query_listeners; ignored outside a request.
+    """
+    if not has_request_context() or 'metrics_labels' not in g:
+        return
+    g.db_time += elapsed
+    if event == 'execute':
+        g.db_queries += 1
+        if SLOW_QUERY_THRESHOLD and elapsed >= SLOW_QUERY_THRESHOLD:
+            _log_slow_query(elapsed, cursor, query, vars)
+
+
+def _labels():
+    return (request.method, request.blueprint or '', request.endpoint or 'unmatched')
+
+
+def _before_request():
+    labels = _labels()
+    g.metrics_labels = labels
+    g.metrics_start = time.perf_counter()
+    g.db_time = 0.0
+    g.db_queries = 0
+    REQUESTS_IN_PROGRESS.labels(*labels).inc()
+
+
+def _after_request(response):
+    labels = g.get('metrics_labels')
+    if labels is None:
+        return response
+    total = time.perf_counter() - g.metrics_start
+    REQUEST_LATENCY.labels(*labels).observe(total)
+    REQUEST_COUNT.labels(*labels, str(response.status_code)).inc()
+    DB_TIME.labels(*labels).observe(g.db_time)
+    DB_QUERIES.labels(*labels).observe(g.db_queries)
+    if SERVER_TIMING:
+        # Respostas em streaming só contam o trabalho feito antes do primeiro lote
+        response.headers['Server-Timing'] = (
+            f'db;dur={g.db_time * 1000:.2f};desc="{g.db_queries} queries", '
+            f"serialize;dur={g.get('serialize_time', 0.0) * 1000:.2f}, "
+            f"total;dur={total * 1000:.2f}"
+        )
+    size = response.calculate_content_length()
+    if size is not None:
+        RESPONSE_SIZE.labels(*labels).observe(size)
+    return response
+
+
+def _teardown_request(exc):
+    labels = g.pop('metrics_labels', None)
+    if labels is not None:
+        REQUESTS_IN_PROGRESS.labels(*labels).dec()
+
+
+def metrics():
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
+
+
+def init_metrics(app):
+    """
+    Instrument every request of the Flask app, add the Server-Timing header
+    and expose /metrics in the Prometheus text format.
+    """
+    if record_db_call not in query_listeners:
+        query_listeners.append(record_db_call)
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+    app.add_url_rule('/metrics', 'metrics', metrics)
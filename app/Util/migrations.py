@@ -0,0 +1,164 @@
+"""
+Versioned schema migrations.
+
+Each file in app/migrations is named <version>_<description>.sql and is
+applied once, in version order; applied versions are recorded in the
+schema_migrations table. Statements run one by one in autocommit mode so
+they may use CREATE INDEX CONCURRENTLY against a live database, which also
+means a migration must be idempotent (IF NOT EXISTS) to be safely retried
+after a failure; a migration that must be atomic wraps its statements in
+BEGIN/COMMIT.
+
+    python -m app.Util.migrations           # aplica as migrações pendentes
+    python -m app.Util.migrations status    # lista aplicadas e pendentes
+"""
+import os
+import re
+import sys
+
+from psycopg2 import extensions
+
+from app.Util.bd import create_connection
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+
+# Chave do pg_advisory_lock: impede que dois processos apliquem migrações ao mesmo tempo
+_LOCK_KEY = 727274
+
+_FILE_PATTERN = re.compile(r'^(\d+)_(\w+)\.sql$')
+_CONCURRENT_INDEX = re.compile(r'CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+IF\s+NOT\s+EXISTS\s+(\w+)', re.IGNORECASE)
+
+
+def available_migrations():
+    """
+    List the migration files.
+    :return: List of (version, name, path) sorted by version
+    """
+    migrations = []
+    for filename in os.listdir(MIGRATIONS_DIR):
+        match = _FILE_PATTERN.match(filename)
+        if match:
+            migrations.append((match.group(1), match.group(2), os.path.join(MIGRATIONS_DIR, filename)))
+    return sorted(migrations, key=lambda migration: int(migration[0]))
+
+
+def split_statements(sql):
+    """
+    Split a migration script into statements (one per `;` at end of line,
+    outside $$ quoted function bodies), dropping `--` comment lines.
+    """
+    statements, current, in_body = [], [], False
+    for line in sql.splitlines():
+        if not in_body and line.strip().startswith('--'):
+            continue
+        current.append(line)
+        if line.count('$$') % 2:
+            in_body = not in_body
+        if not in_body and line.rstrip().endswith(';'):
+            statements.append('\n'.join(current).strip().rstrip(';'))
+            current = []
+    if '\n'.join(current).strip():
+        statements.append('\n'.join(current).strip())
+    return statements
+
+
+def _drop_invalid_index(cursor, statement):
+    # Um CREATE INDEX CONCURRENTLY interrompido deixa o índice marcado como
+    # inválido; o IF NOT EXISTS o ignoraria, então ele é removido antes de recriar.
+    match = _CONCURRENT_INDEX.search(statement)
+    if not match:
+        return
+    cursor.execute(
+        """
+        SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE c.relname = %s AND NOT i.indisvalid
+        """,
+        (match.group(1),)
+    )
+    if cursor.fetchone():
+        print(f"Removendo índice inválido {match.group(1)}")
+        cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {match.group(1)}")
+
+
+def _applied_versions(cursor):
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version VARCHAR(20) PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        )
+        """
+    )
+    cursor.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def run_migrations():
+    """
+    Apply every pending migration.
+    :return: List of the versions applied
+    """
+    conn = create_connection()
+    conn.autocommit = True
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT pg_advisory_lock(%s)", (_LOCK_KEY,))
+        try:
+            applied = _applied_versions(cursor)
+            done = []
+            for version, name, path in available_migrations():
+                if version in applied:
+                    continue
+                print(f"Aplicando migração {version}_{name}")
+                with open(path, 'r', encoding='utf-8') as migration_file:
+                    statements = split_statements(migration_file.read())
+                for statement in statements:
+                    _drop_invalid_index(cursor, statement)
+                    cursor.execute(statement)
+                cursor.execute(
+                    "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+                    (version, name)
+                )
+                done.append(version)
+            return done
+        finally:
+            # Migração com BEGIN/COMMIT interrompida: desfaz antes de liberar o lock
+            if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                cursor.execute("ROLLBACK")
+            cursor.execute("SELECT pg_advisory_unlock(%s)", (_LOCK_KEY,))
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def migration_status():
+    """
+    :return: List of (version, name, applied) for every migration file
+    """
+    conn = create_connection()
+    conn.autocommit = True
+    cursor = conn.cursor()
+    try:
+        applied = _applied_versions(cursor)
+    finally:
+        cursor.close()
+        conn.close()
+    return [(version, name, version in applied) for version, name, _ in available_migrations()]
+
+
+def main(argv):
+    if argv and argv[0] == 'status':
+        for version, name, applied in migration_status():
+            print(f"{version}_{name}: {'aplicada' if applied else 'pendente'}")
+        return 0
+    if argv:
+        print("Uso: python -m app.Util.migrations [status]")
+        return 2
+    done = run_migrations()
+    print(f"{len(done)} migração(ões) aplicada(s)" if done else "Nenhuma migração pendente")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
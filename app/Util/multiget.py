@@ -0,0 +1,58 @@
+from flask import request
+
+from app.Util.bd import config
+from app.Util.fields import select_list
+from app.Util.json_provider import rows_to_dicts
+from app.Util.statements import execute_prepared
+
+# Quantidade máxima de ids aceita por ?ids= em uma requisição
+MAX_IDS = int(config.get('multiget_max_ids', 200))
+
+
+def parse_ids(raw):
+    """
+    Parse the `ids` parameter (comma separated integers).
+    :param raw: Parameter value, or None when absent
+    :return: List of unique ids in the requested order, or None when absent
+    """
+    if raw is None or raw == '':
+        return None
+    try:
+        ids = list(dict.fromkeys(int(value) for value in raw.split(',') if value.strip()))
+    except ValueError:
+        raise ValueError("Parâmetro 'ids' deve ser uma lista de números inteiros separados por vírgula")
+    if not ids:
+        raise ValueError("Parâmetro 'ids' não pode ser vazio")
+    if len(ids) > MAX_IDS:
+        raise ValueError(f"Parâmetro 'ids' aceita no máximo {MAX_IDS} ids")
+    return ids
+
+
+def get_ids():
+    """
+    Read `ids` from the query string of the current request.
+    """
+    return parse_ids(request.args.get('ids'))
+
+
+def fetch_by_ids(cursor, table, key, fields, ids, names=None):
+    """
+    Fetch the rows of `table` whose primary key is in `ids` with a single
+    `= ANY(%s)` query.
+    :param key: Primary key column
+    :param fields: Columns returned by get_fields (or the SELECT list of get_expand)
+    :param names: Keys of the result objects, when different from fields
+    :return: (rows as dicts in the order of ids, ids not found)
+    """
+    columns, row_key = select_list(fields, (key,))
+    execute_prepared(cursor, f"SELECT {columns} FROM {table} WHERE {key} = ANY(%s)", (ids,))
+    found = {row_key(row)[0]: row for row in cursor.fetchall()}
+    rows = rows_to_dicts(names or fields, [found[id_] for id_ in ids if id_ in found])
+    return rows, [id_ for id_ in ids if id_ not in found]
+
+
+def missing_headers(missing):
+    """
+    Response headers listing the requested ids that were not found.
+    """
+    return {'X-Missing-Ids': ','.join(str(id_) for id_ in missing)} if missing else {}
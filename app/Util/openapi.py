@@ -0,0 +1,174 @@
+"""
+OpenAPI (Swagger) documentation of the API.
+
+The spec is built once, on the first request to /apispec_1.json or ahead of
+time with
+
+    python -m app.Util.openapi app/apispec_1.json
+
+and then served as a static payload, gzipped and with an ETag. When
+API_SPEC_FILE names a prebuilt spec, the route docs in app/swagger.py are
+never imported. API_DOCS=0 removes /apidocs and /apispec_1.json altogether
+and also skips flasgger.
+"""
+import gzip
+import hashlib
+import os
+import sys
+import threading
+
+from flask import current_app, request
+
+from app.Util.json_provider import dumps_bytes
+
+DOCS_ENABLED = os.environ.get('API_DOCS', '1') != '0'
+SPEC_FILE = os.environ.get('API_SPEC_FILE', '')
+
+SPEC_ROUTE = '/apispec_1.json'
+
+# Ligado por main() para gerar a spec mesmo com API_SPEC_FILE já existente
+_building = False
+
+
+def _prebuilt():
+    return bool(SPEC_FILE) and os.path.isfile(SPEC_FILE) and not _building
+
+
+def docs_needed():
+    """
+    Whether the route docs must be attached to the views, i.e. the spec is
+    generated in this process.
+    """
+    return DOCS_ENABLED and not _prebuilt()
+
+
+def api_doc(docs, name):
+    """
+    Document a view with app.swagger.<docs>[name] (same as flasgger's
+    swag_from), importing the docs only when docs_needed().
+    """
+    if not docs_needed():
+        return lambda view: view
+    from flasgger import swag_from
+    from app import swagger
+    return swag_from(getattr(swagger, docs)[name])
+
+
+class SpecPayload:
+    """
+    Serialized spec with its gzipped form and ETag, computed once.
+    """
+
+    def __init__(self, body):
+        self.body = body
+        self.gzipped = gzip.compress(body, compresslevel=9)
+        self.etag = hashlib.sha1(body).hexdigest()
+
+
+_payload = None
+_payload_lock = threading.Lock()
+
+
+def _build_payload(swagger):
+    if _prebuilt():
+        with open(SPEC_FILE, 'rb') as spec_file:
+            return SpecPayload(spec_file.read())
+    return SpecPayload(dumps_bytes(swagger.get_apispecs('apispec_1')))
+
+
+def _spec_view(swagger):
+    def apispec():
+        global _payload
+        if _payload is None:
+            with _payload_lock:
+                if _payload is None:
+                    _payload = _build_payload(swagger)
+        payload = _payload
+        if request.if_none_match.contains_weak(payload.etag):
+            response = current_app.response_class(status=304)
+        elif 'gzip' in request.accept_encodings:
+            response = current_app.response_class(payload.gzipped, mimetype='application/json')
+            response.headers['Content-Encoding'] = 'gzip'
+        else:
+            response = current_app.response_class(payload.body, mimetype='application/json')
+        response.set_etag(payload.etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        response.vary.add('Accept-Encoding')
+        return response
+    return apispec
+
+
+def init_docs(app):
+    """
+    Serve the Swagger UI at /apidocs/ and the cached spec at /apispec_1.json,
+    unless API_DOCS=0.
+    """
+    if not DOCS_ENABLED:
+        return None
+    from flasgger import Swagger
+
+    swagger_config = {
+        "headers": [],
+        "specs": [
+            {
+                "endpoint": 'apispec_1',
+                "route": SPEC_ROUTE,
+                "rule_filter": lambda rule: True,
+                "model_filter": lambda tag: True,
+            }
+        ],
+        "static_url_path": "/flasgger_static",
+        "swagger_ui": True,
+        "specs_route": "/apidocs/"
+    }
+
+    swagger_template = {
+        "swagger": "2.0",
+        "info": {
+            "title": "API de Gestão Escolar",
+            "version": "1.0.0",
+            "description": "API para gestão de alunos, categorias e detalhes de pedidos",
+            "termsOfService": "",
+            "contact": {
+                "email": "contato@escola.com"
+            },
+            "license": {
+                "name": "MIT",
+                "url": "https://opensource.org/licenses/MIT"
+            }
+        }
+    }
+
+    swagger = Swagger(app, config=swagger_config, template=swagger_template)
+    app.extensions['openapi'] = swagger
+    # Troca a view do flasgger, que percorre todas as rotas a cada requisição
+    for rule in app.url_map.iter_rules():
+        if rule.rule == SPEC_ROUTE:
+            app.view_functions[rule.endpoint] = _spec_view(swagger)
+    return swagger
+
+
+def main(argv):
+    if len(argv) != 1:
+        print("Uso: python -m app.Util.openapi <arquivo.json>")
+        return 2
+    # Executado com -m este arquivo é o __main__; as views consultam o módulo importado
+    from app.Util import openapi
+    openapi._building = True
+    from app import create_app
+
+    app = create_app()
+    swagger = app.extensions.get('openapi')
+    if swagger is None:
+        print("Documentação desligada (API_DOCS=0)")
+        return 1
+    with app.test_request_context():
+        body = dumps_bytes(swagger.get_apispecs('apispec_1'))
+    with open(argv[0], 'wb') as spec_file:
+        spec_file.write(body)
+    print(f"Spec gravada em {argv[0]} ({len(body)} bytes)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,99 @@
+import base64
+import json
+from urllib.parse import urlencode
+
+from flask import request
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+
+def encode_cursor(values):
+    """
+    Encode the sort key of the last row of a page into an opaque cursor.
+    :param values: Tuple with the values of the ORDER BY columns
+    :return: URL-safe string
+    """
+    raw = json.dumps(list(values), default=str, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token, size):
+    """
+    Decode a cursor produced by encode_cursor.
+    :param token: Cursor received in the `after` parameter
+    :param size: Number of ORDER BY columns expected
+    :return: Tuple of values or raises ValueError
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        values = json.loads(raw.decode('utf-8'))
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Parâmetro 'after' inválido")
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Parâmetro 'after' inválido")
+    return tuple(values)
+
+
+def get_page_args(key_size):
+    """
+    Read `limit` and `after` from the query string.
+    :param key_size: Number of ORDER BY columns of the endpoint
+    :return: (limit, after) where after is None on the first page
+    """
+    try:
+        limit = int(request.args.get('limit', DEFAULT_LIMIT))
+    except ValueError:
+        raise ValueError("Parâmetro 'limit' deve ser um número inteiro")
+    if limit < 1 or limit > MAX_LIMIT:
+        raise ValueError(f"Parâmetro 'limit' deve estar entre 1 e {MAX_LIMIT}")
+    after = request.args.get('after')
+    return limit, decode_cursor(after, key_size) if after else None
+
+
+def keyset_where(columns, after, conditions=(), params=()):
+    """
+    Build the WHERE clause that skips every row up to the cursor.
+    :param columns: ORDER BY columns, primary key last as tie-breaker
+    :param after: Values decoded from the cursor, or None
+    :param conditions: Extra filter conditions (see app/Util/filters.py)
+    :param params: Values of the placeholders in conditions
+    :return: (sql, params) with an empty sql on an unfiltered first page
+    """
+    conditions = list(conditions)
+    params = tuple(params)
+    if after is not None:
+        placeholders = ", ".join(["%s"] * len(columns))
+        conditions.append(f"({', '.join(columns)}) > ({placeholders})")
+        params += tuple(after)
+    if not conditions:
+        return "", ()
+    return f"WHERE {' AND '.join(conditions)}", params
+
+
+def split_page(rows, limit, key):
+    """
+    Trim the extra row fetched with LIMIT limit + 1 and compute the next cursor.
+    :param rows: Rows returned by the database
+    :param limit: Requested page size
+    :param key: Function returning the sort key of a row
+    :return: (rows, next_cursor) where next_cursor is None on the last page
+    """
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(key(rows[-1]))
+
+
+def page_headers(next_cursor):
+    """
+    Response headers advertising the next page, if there is one.
+    """
+    if next_cursor is None:
+        return {}
+    args = request.args.to_dict()
+    args['after'] = next_cursor
+    return {
+        'X-Next-Cursor': next_cursor,
+        'Link': f'<{request.base_url}?{urlencode(args)}>; rel="next"',
+    }
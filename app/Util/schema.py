@@ -0,0 +1,27 @@
+# Colunas de cada tabela exposta pela API, na ordem de criação (init.sql / northwind.sql).
+# É a mesma ordem de SELECT * usada pelos mapeamentos dos blueprints.
+TABLE_COLUMNS = {
+    'aluno': (
+        'id_aluno', 'nome_completo', 'data_nascimento', 'id_turma', 'nome_responsavel',
+        'telefone_responsavel', 'email_responsavel', 'informacoes_adicionais', 'endereco',
+        'cidade', 'estado', 'cep', 'pais', 'telefone'
+    ),
+    'turma': ('id_turma', 'nome_turma', 'id_professor', 'horario'),
+    'professor': ('id_professor', 'nome_completo', 'email', 'telefone'),
+    'pagamento': (
+        'id_pagamento', 'id_aluno', 'data_pagamento', 'valor_pago', 'forma_pagamento',
+        'referencia', 'status'
+    ),
+    'presenca': ('id_presenca', 'id_aluno', 'data_presenca', 'presente'),
+    'atividade': ('id_atividade', 'descricao', 'data_realizacao'),
+    'atividade_aluno': ('id_atividade', 'id_aluno'),
+    'usuario': ('id_usuario', 'login', 'senha', 'nivel_acesso', 'id_professor'),
+    'categories': ('category_id', 'category_name', 'description', 'picture'),
+    'order_details': ('order_id', 'product_id', 'unit_price', 'quantity', 'discount'),
+}
+
+# Colunas do tipo DATE (valores chegam como texto ISO-8601 em cursores e filtros)
+DATE_COLUMNS = {'data_nascimento', 'data_pagamento', 'data_presenca', 'data_realizacao'}
+
+# Colunas NUMERIC (a API as serializa como texto, sem perda de precisão)
+NUMERIC_COLUMNS = {'valor_pago'}
@@ -0,0 +1,69 @@
+import hashlib
+import re
+import threading
+
+from app.Util.bd import config
+
+# Desligue (prepared_statements: false) atrás de um PgBouncer em modo transaction,
+# onde a sessão que recebeu o PREPARE não é necessariamente a que executa.
+ENABLED = bool(config.get('prepared_statements', True))
+MAX_PER_CONNECTION = int(config.get('prepared_statements_max', 200))
+
+_PLACEHOLDER = re.compile(r'%%|%s')
+
+_statements = {}  # sql -> (name, body with $n placeholders, number of parameters)
+_lock = threading.Lock()
+
+
+def _compile(sql):
+    entry = _statements.get(sql)
+    if entry is not None:
+        return entry
+    count = 0
+
+    def number(match):
+        nonlocal count
+        if match.group(0) == '%%':
+            return '%'
+        count += 1
+        return f"${count}"
+
+    body = _PLACEHOLDER.sub(number, sql)
+    name = 'stmt_' + hashlib.md5(sql.encode('utf-8')).hexdigest()[:16]
+    entry = (name, body, count)
+    with _lock:
+        _statements[sql] = entry
+    return entry
+
+
+def execute_prepared(cursor, sql, params=()):
+    """
+    Execute `sql` as a server-side prepared statement. The statement is
+    PREPAREd the first time it runs on each pooled connection and executed
+    by name afterwards, so Postgres parses and plans it once per session.
+    Connections keep at most MAX_PER_CONNECTION statements, dropping the
+    least recently used.
+    :param sql: Query with psycopg2 positional placeholders (%s)
+    :param params: Sequence of parameters
+    """
+    prepared = getattr(cursor.connection, 'prepared', None)
+    if not ENABLED or prepared is None:
+        return cursor.execute(sql, params)
+    name, body, count = _compile(sql)
+    # A instrumentação (app/Util/metrics.py) registra a consulta original, não o EXECUTE
+    cursor.label = sql
+    try:
+        if name in prepared:
+            prepared.move_to_end(name)
+        else:
+            if len(prepared) >= MAX_PER_CONNECTION:
+                oldest = next(iter(prepared))
+                cursor.execute(f"DEALLOCATE {oldest}")
+                del prepared[oldest]
+            cursor.execute(f"PREPARE {name} AS {body}")
+            prepared[name] = True
+        if count:
+            return cursor.execute(f"EXECUTE {name} ({', '.join(['%s'] * count)})", params)
+        return cursor.execute(f"EXECUTE {name}")
+    finally:
+        cursor.label = None
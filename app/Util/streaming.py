@@ -0,0 +1,87 @@
+import itertools
+import uuid
+
+from flask import Response, request
+
+from app.Util.bd import get_connection
+from app.Util.json_provider import dumps
+
+DEFAULT_BATCH_SIZE = 1000
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+
+def get_stream_format():
+    """
+    Streaming format requested by the client, or None for a regular response.
+    `?stream=ndjson` / `Accept: application/x-ndjson` selects NDJSON and
+    `?stream=json` a chunked JSON array.
+    """
+    fmt = request.args.get('stream')
+    if fmt is None and request.accept_mimetypes.best == NDJSON_MIMETYPE:
+        fmt = 'ndjson'
+    if fmt not in (None, 'ndjson', 'json'):
+        raise ValueError("Parâmetro 'stream' deve ser 'ndjson' ou 'json'")
+    return fmt
+
+
+def _batches(sql, params, batch_size):
+    # Generator that owns the pooled connection for the whole response, so the
+    # connection goes back to the pool when the response is closed.
+    with get_connection() as conn:
+        cursor = conn.cursor(name=f"stream_{uuid.uuid4().hex}")
+        cursor.itersize = batch_size
+        try:
+            cursor.execute(sql, params)
+            rows = cursor.fetchmany(batch_size)
+            yield rows
+            while rows:
+                rows = cursor.fetchmany(batch_size)
+                if rows:
+                    yield rows
+        finally:
+            cursor.close()
+
+
+def _ndjson(first, batches):
+    try:
+        for batch in itertools.chain([first], batches):
+            if batch:
+                yield ''.join(dumps(row) + '\n' for row in batch)
+    finally:
+        batches.close()
+
+
+def _json_array(first, batches):
+    try:
+        yield '['
+        empty = True
+        for batch in itertools.chain([first], batches):
+            if not batch:
+                continue
+            chunk = ','.join(dumps(row) for row in batch)
+            yield chunk if empty else ',' + chunk
+            empty = False
+        yield ']'
+    finally:
+        batches.close()
+
+
+def stream_query(sql, params=(), fmt='ndjson', batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Stream the result of a query through a server-side cursor, `batch_size`
+    rows at a time, so memory stays flat regardless of the table size.
+    Each row is written as an array in SELECT order, the same representation
+    as the regular (non-streamed) responses.
+    The query and the first batch run before returning, so database errors
+    still surface as a regular exception in the handler.
+    :param sql: SELECT statement
+    :param params: Query parameters
+    :param fmt: 'ndjson' or 'json'
+    :return: Flask streaming Response
+    """
+    batches = _batches(sql, params, batch_size)
+    first = next(batches)
+    if fmt == 'ndjson':
+        return Response(_ndjson(first, batches), mimetype=NDJSON_MIMETYPE)
+    return Response(_json_array(first, batches), mimetype='application/json')
@@ -4,6 +4,10 @@ from flask import Flask, jsonify, redirect
 def create_app():
     app = Flask(__name__)
     
+    # Serialização JSON rápida: datas ISO-8601, Decimal sem perda e bytea em base64
+    from app.Util.json_provider import FastJSONProvider
+    app.json = FastJSONProvider(app)
+    
     # Registrar todos os blueprints dos CRUDs
     from app.crudAlunos import alunos_bp
     from app.crudTurmas import turmas_bp
@@ -27,8 +31,17 @@ def create_app():
     app.register_blueprint(categories_app)
     app.register_blueprint(order_details_app)
     
-    # Inicializar Swagger para documentação da API
-    from app.swagger import init_swagger
-    init_swagger(app)
+    # Métricas Prometheus da própria API (expostas em /metrics)
+    from app.Util.metrics import init_metrics
+    init_metrics(app)
+
+    # Compressão das respostas (gzip, brotli, zstd) negociada por Accept-Encoding;
+    # registrada depois das métricas para que elas vejam o corpo já compactado
+    from app.Util.compression import init_compression
+    init_compression(app)
+    
+    # Documentação Swagger (/apidocs/) e spec OpenAPI em cache; API_DOCS=0 desliga
+    from app.Util.openapi import init_docs
+    init_docs(app)
     
     return app 
\ No newline at end of file
@@ -0,0 +1,319 @@
+"""
+ASGI entry point with an asyncio read path.
+
+The hot GET endpoints are answered by Starlette handlers on an asyncpg pool,
+so a single process keeps hundreds of queries in flight instead of one per
+worker thread. Every other route (writes, exports, docs, /metrics) falls
+through to the regular Flask app, so both paths share the same URLs.
+
+    gunicorn -c gunicorn.conf.py -k uvicorn.workers.UvicornWorker app.asgi:app
+"""
+import contextlib
+import datetime
+import time
+
+import asyncpg
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.responses import Response
+from starlette.routing import Mount, Route
+from werkzeug.http import http_date, parse_accept_header, parse_date, parse_etags, quote_etag
+
+from app import create_app
+from app.Util.bd import config
+from app.Util.compression import MIN_SIZE, choose_encoding, compress
+from app.Util.etag import make_etag
+from app.Util.expand import RELATIONS, expand_select, parse_expand, related_tables
+from app.Util.fields import parse_fields, select_list
+from app.Util.json_provider import loads
+from app.Util.filters import parse_filters
+from app.Util.metrics import REQUEST_COUNT, REQUEST_LATENCY
+from app.Util.multiget import missing_headers, parse_ids
+from app.Util.pagination import DEFAULT_LIMIT, MAX_LIMIT, decode_cursor, split_page
+from app.Util.schema import DATE_COLUMNS
+from app.crudAlunos import ALUNO_FILTERS
+from app.crudPagamentos import PAGAMENTO_FILTERS
+from app.crudPresencas import PRESENCA_FILTERS
+
+flask_app = create_app()
+
+_pool = None
+# Desligado se a tabela table_version não existir (mesmo comportamento de app/Util/etag.py)
+_conditional_enabled = True
+
+
+@contextlib.asynccontextmanager
+async def _lifespan(app):
+    # Pool criado na inicialização do worker e fechado no desligamento
+    global _pool
+    _pool = await asyncpg.create_pool(
+        database=config['db_name'],
+        user=config['db_user'],
+        password=config['db_password'],
+        host=config['db_host'],
+        port=int(config['db_port']),
+        min_size=int(config.get('async_pool_min_size', 1)),
+        max_size=int(config.get('async_pool_max_size', 50)),
+        max_inactive_connection_lifetime=float(config.get('pool_max_idle', 300)),
+    )
+    try:
+        yield
+    finally:
+        await _pool.close()
+
+
+def _json(data, status=200, headers=None):
+    # Mesmo provedor JSON do app Flask, para que as respostas sejam idênticas
+    return Response(flask_app.json.dumps(data), status_code=status, headers=headers, media_type='application/json')
+
+
+def _compress(request, response):
+    # Mesma negociação de Accept-Encoding do app Flask (app/Util/compression.py)
+    if response.status_code != 200:
+        return response
+    response.headers['Vary'] = 'Accept-Encoding'
+    encoding = choose_encoding(parse_accept_header(request.headers.get('accept-encoding')))
+    if encoding is None or len(response.body) < MIN_SIZE:
+        return response
+    response.body = compress(response.body, encoding)
+    response.headers['Content-Length'] = str(len(response.body))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+async def _table_state(conn, tables):
+    global _conditional_enabled
+    if not _conditional_enabled:
+        return None
+    try:
+        rows = await conn.fetch(
+            "SELECT table_name, version, modified_at FROM table_version WHERE table_name = ANY($1::text[])",
+            list(tables)
+        )
+    except asyncpg.UndefinedTableError:
+        _conditional_enabled = False
+        return None
+    found = {row['table_name']: row for row in rows}
+    versions = tuple((table, found[table]['version'] if table in found else 0) for table in tables)
+    modified = [row['modified_at'] for row in rows]
+    return versions, max(modified) if modified else None
+
+
+def _not_modified(request, etag, last_modified):
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match:
+        return parse_etags(if_none_match).contains_weak(etag)
+    if_modified_since = parse_date(request.headers.get('if-modified-since'))
+    if if_modified_since and last_modified is not None:
+        return last_modified.replace(microsecond=0) <= if_modified_since
+    return False
+
+
+def _expanded_tables(request, table):
+    # Tabelas lidas por ?expand=, para que o ETag mude junto com elas
+    if table not in RELATIONS:
+        return ()
+    try:
+        return tuple(related_tables(table, parse_expand(table, request.query_params.get('expand'))))
+    except ValueError:
+        return ()
+
+
+def _expand(request, table, fields):
+    # ?expand= com as mesmas subconsultas json_build_object/json_agg do app Flask (app/Util/expand.py)
+    if table not in RELATIONS:
+        return fields, fields
+    select, names, _ = expand_select(table, fields, request.query_params.get('expand'))
+    return select, names
+
+
+def _record(row, fields, names):
+    # O asyncpg entrega as colunas json das expansões como texto
+    return {name: row[name] if name in fields or row[name] is None else loads(row[name]) for name in names}
+
+
+def read_endpoint(name, table, build):
+    """
+    Wrap an async read in the same conditional GET handling as the Flask
+    @conditional decorator, plus the request metrics of app/Util/metrics.py.
+    :param build: Coroutine (request, conn) -> Response
+    """
+    async def endpoint(request):
+        start = time.perf_counter()
+        try:
+            async with _pool.acquire() as conn:
+                state = await _table_state(conn, (table,) + _expanded_tables(request, table))
+                if state is None:
+                    response = await build(request, conn)
+                else:
+                    versions, last_modified = state
+                    full_path = f"{request.url.path}?{request.url.query}"
+                    etag = make_etag(full_path, request.headers.get('accept', ''), versions)
+                    if _not_modified(request, etag, last_modified):
+                        response = Response(status_code=304)
+                    else:
+                        response = await build(request, conn)
+                    if response.status_code in (200, 304):
+                        response.headers['ETag'] = quote_etag(etag, weak=True)
+                        if last_modified is not None:
+                            response.headers['Last-Modified'] = http_date(last_modified)
+                        response.headers['Cache-Control'] = 'no-cache'
+        except Exception as e:
+            response = _json({"error": str(e)}, 400)
+        response = _compress(request, response)
+        labels = (request.method, 'async', name)
+        REQUEST_LATENCY.labels(*labels).observe(time.perf_counter() - start)
+        REQUEST_COUNT.labels(*labels, str(response.status_code)).inc()
+        return response
+    return endpoint
+
+
+def item_reader(table, keys, not_found):
+    """
+    Single-row lookup by primary key, returning the row as a JSON object.
+    :param keys: Path parameters, in the order of the primary key columns
+    """
+    where = ' AND '.join(f"{key} = ${n}" for n, key in enumerate(keys, start=1))
+
+    async def build(request, conn):
+        try:
+            fields = parse_fields(table, request.query_params.get('fields'))
+            select, names = _expand(request, table, fields)
+        except ValueError as e:
+            return _json({"error": str(e)}, 400)
+        row = await conn.fetchrow(f"SELECT {', '.join(select)} FROM {table} WHERE {where}",
+                                  *(request.path_params[key] for key in keys))
+        if row is None:
+            return _json({"error": not_found}, 404)
+        return _json(_record(row, fields, names))
+    return build
+
+
+async def _fetch_by_ids(request, conn, table, key):
+    # ?ids=1,2,3: mesmo contrato de app/Util/multiget.py
+    try:
+        fields = parse_fields(table, request.query_params.get('fields'))
+        select, names = _expand(request, table, fields)
+        ids = parse_ids(request.query_params.get('ids'))
+    except ValueError as e:
+        return _json({"error": str(e)}, 400)
+    columns, row_key = select_list(select, (key,))
+    rows = await conn.fetch(f"SELECT {columns} FROM {table} WHERE {key} = ANY($1)", ids)
+    found = {row_key(row)[0]: row for row in rows}
+    missing = [id_ for id_ in ids if id_ not in found]
+    return _json([_record(found[id_], fields, names) for id_ in ids if id_ in found],
+                 headers=missing_headers(missing))
+
+
+def list_reader(table, order, filters=(), multiget=False):
+    """
+    Keyset-paginated listing with the same limit/after/filter contract and
+    cursor format as app/Util/pagination.py.
+    :param order: ORDER BY columns, primary key last
+    :param filters: Filter spec of the Flask endpoint (see app/Util/filters.py)
+    :param multiget: Whether ?ids= fetches rows by primary key instead
+    """
+    order_by = ', '.join(order)
+
+    async def build(request, conn):
+        if multiget and request.query_params.get('ids'):
+            return await _fetch_by_ids(request, conn, table, order[-1])
+        try:
+            limit = int(request.query_params.get('limit', DEFAULT_LIMIT))
+        except ValueError:
+            return _json({"error": "Parâmetro 'limit' deve ser um número inteiro"}, 400)
+        if limit < 1 or limit > MAX_LIMIT:
+            return _json({"error": f"Parâmetro 'limit' deve estar entre 1 e {MAX_LIMIT}"}, 400)
+        try:
+            fields = parse_fields(table, request.query_params.get('fields'))
+            select, names = _expand(request, table, fields)
+            parsed = parse_filters(filters, request.query_params)
+        except ValueError as e:
+            return _json({"error": str(e)}, 400)
+        columns, key = select_list(select, order)
+        conditions = [f"{column} {operator} ${n}" for n, (column, operator, _) in enumerate(parsed, start=1)]
+        params = [value for _, _, value in parsed]
+        after = request.query_params.get('after')
+        if after:
+            # O asyncpg exige objetos date para colunas DATE; o cursor guarda texto ISO-8601
+            after = [datetime.date.fromisoformat(value) if column in DATE_COLUMNS else value
+                     for column, value in zip(order, decode_cursor(after, len(order)))]
+            placeholders = ', '.join(f"${n}" for n in range(len(params) + 1, len(params) + len(order) + 1))
+            conditions.append(f"({order_by}) > ({placeholders})")
+            params += after
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = await conn.fetch(
+            f"SELECT {columns} FROM {table} {where} ORDER BY {order_by} LIMIT ${len(params) + 1}",
+            *params, limit + 1
+        )
+        rows, next_cursor = split_page(rows, limit, key)
+        headers = {}
+        if next_cursor is not None:
+            headers['X-Next-Cursor'] = next_cursor
+            headers['Link'] = f'<{request.url.include_query_params(after=next_cursor)}>; rel="next"'
+        return _json([_record(row, fields, names) for row in rows], headers=headers)
+    return build
+
+
+async def _order_detail(request, conn):
+    try:
+        fields = parse_fields('order_details', request.query_params.get('fields'))
+    except ValueError as e:
+        return _json({"error": str(e)}, 400)
+    row = await conn.fetchrow(
+        f"SELECT {', '.join(fields)} FROM order_details WHERE order_id = $1 AND product_id = $2",
+        request.path_params['order_id'], request.path_params['product_id']
+    )
+    if row is None:
+        return _json({"error": "Order detail not found"}, 404)
+    return _json(dict(row))
+
+
+async def _order_details_by_order(request, conn):
+    try:
+        fields = parse_fields('order_details', request.query_params.get('fields'))
+    except ValueError as e:
+        return _json({"error": str(e)}, 400)
+    rows = await conn.fetch(
+        f"SELECT {', '.join(fields)} FROM order_details WHERE order_id = $1",
+        request.path_params['order_id']
+    )
+    if not rows:
+        return _json({"error": "No order details found for this order"}, 404)
+    return _json([dict(row) for row in rows])
+
+
+def _route(path, name, table, build):
+    return Route(path, read_endpoint(name, table, build), methods=['GET'], name=name)
+
+
+routes = [
+    _route('/alunos', 'read_all_alunos', 'aluno', list_reader('aluno', ('nome_completo', 'id_aluno'), ALUNO_FILTERS, multiget=True)),
+    _route('/alunos/{id_aluno:int}', 'read_aluno', 'aluno', item_reader('aluno', ('id_aluno',), "Aluno não encontrado")),
+    _route('/turmas', 'read_all_turmas', 'turma', list_reader('turma', ('nome_turma', 'id_turma'), multiget=True)),
+    _route('/turmas/{id_turma:int}', 'read_turma', 'turma', item_reader('turma', ('id_turma',), "Turma não encontrada")),
+    _route('/professores', 'read_all_professores', 'professor', list_reader('professor', ('nome_completo', 'id_professor'), multiget=True)),
+    _route('/professores/{id_professor:int}', 'read_professor', 'professor',
+           item_reader('professor', ('id_professor',), "Professor não encontrado")),
+    _route('/pagamentos', 'read_all_pagamentos', 'pagamento',
+           list_reader('pagamento', ('data_pagamento', 'id_pagamento'), PAGAMENTO_FILTERS, multiget=True)),
+    _route('/pagamentos/{id_pagamento:int}', 'read_pagamento', 'pagamento',
+           item_reader('pagamento', ('id_pagamento',), "Pagamento não encontrado")),
+    _route('/presencas', 'read_all_presencas', 'presenca',
+           list_reader('presenca', ('data_presenca', 'id_presenca'), PRESENCA_FILTERS)),
+    _route('/presencas/{id_presenca:int}', 'read_presenca', 'presenca',
+           item_reader('presenca', ('id_presenca',), "Presença não encontrada")),
+    _route('/atividades', 'read_all_atividades', 'atividade', list_reader('atividade', ('data_realizacao', 'id_atividade'))),
+    _route('/atividades/{id_atividade:int}', 'read_atividade', 'atividade',
+           item_reader('atividade', ('id_atividade',), "Atividade não encontrada")),
+    _route('/atividades_alunos/{id_atividade:int}/{id_aluno:int}', 'read_atividade_aluno', 'atividade_aluno',
+           item_reader('atividade_aluno', ('id_atividade', 'id_aluno'), "Atividade-Aluno não encontrada")),
+    _route('/usuarios', 'read_all_usuarios', 'usuario', list_reader('usuario', ('id_usuario',))),
+    _route('/usuarios/{id_usuario:int}', 'read_usuario', 'usuario', item_reader('usuario', ('id_usuario',), "Usuário não encontrado")),
+    _route('/order-details/{order_id:int}/{product_id:int}', 'read_order_detail', 'order_details', _order_detail),
+    _route('/order-details/{order_id:int}', 'list_order_details', 'order_details', _order_details_by_order),
+    # Todo o resto (escritas, exportações, Swagger, /metrics) segue para o app Flask
+    Mount('/', app=WSGIMiddleware(flask_app)),
+]
+
+app = Starlette(routes=routes, lifespan=_lifespan)
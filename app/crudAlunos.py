@@ -1,144 +1,393 @@
-from flask import Blueprint, request, jsonify
-from app.Util.bd import create_connection
-from flasgger import swag_from
-from app.swagger import alunos_docs
+from flask import Blueprint, current_app, request, jsonify
+import csv
+import datetime
+import io
+from app.Util.bd import get_connection
+from app.Util.statements import execute_prepared
+from app.Util.json_provider import rows_to_dicts
+from app.Util.fields import get_fields, select_list
+from app.Util.expand import expand_tables, get_expand
+from app.Util.multiget import fetch_by_ids, get_ids, missing_headers
+from app.Util.filters import get_filters, parse_int
+from app.Util.etag import conditional
+from app.Util.pagination import get_page_args, keyset_where, split_page, page_headers
+from app.Util.openapi import api_doc
 
 alunos_bp = Blueprint('alunos', __name__)
 
+# Filtros aceitos por GET /alunos: (parâmetro, coluna, operador, tipo)
+ALUNO_FILTERS = (
+    ('id_turma', 'id_turma', '=', parse_int),
+)
+
+# Colunas aceitas pela importação em lote e tamanho máximo de cada texto (ver init.sql)
+ALUNO_BULK_COLUMNS = {
+    'id_aluno': None, 'nome_completo': 255, 'data_nascimento': None, 'id_turma': None,
+    'nome_responsavel': 255, 'telefone_responsavel': 20, 'email_responsavel': 100,
+    'informacoes_adicionais': None, 'endereco': 255, 'cidade': 100, 'estado': 100,
+    'cep': 20, 'pais': 100, 'telefone': 20
+}
+BULK_MAX_ROWS = 50000
+
 @alunos_bp.route('/alunos', methods=['POST'])
-@swag_from(alunos_docs['create_aluno'])
+@api_doc('alunos_docs', 'create_aluno')
 def create_aluno():
     data = request.get_json()
-    conn = create_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(
-            """
-            INSERT INTO aluno (nome_completo, data_nascimento, id_turma, nome_responsavel, telefone_responsavel, email_responsavel, informacoes_adicionais, endereco, cidade, estado, cep, pais, telefone)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """,
-            (data['nome_completo'], data['data_nascimento'], data.get('id_turma'), data.get('nome_responsavel'), 
-             data.get('telefone_responsavel'), data.get('email_responsavel'), data.get('informacoes_adicionais'),
-             data.get('endereco'), data.get('cidade'), data.get('estado'), data.get('cep'), data.get('pais'), data.get('telefone'))
-        )
-        conn.commit()
-        return jsonify({"message": "Aluno criado com sucesso"}), 201
-    except Exception as e:
-        conn.rollback()
-        return jsonify({"error": str(e)}), 400
-    finally:
-        cursor.close()
-        conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            execute_prepared(
+                cursor,
+                """
+                INSERT INTO aluno (nome_completo, data_nascimento, id_turma, nome_responsavel, telefone_responsavel, email_responsavel, informacoes_adicionais, endereco, cidade, estado, cep, pais, telefone)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                """,
+                (data['nome_completo'], data['data_nascimento'], data.get('id_turma'), data.get('nome_responsavel'), 
+                 data.get('telefone_responsavel'), data.get('email_responsavel'), data.get('informacoes_adicionais'),
+                 data.get('endereco'), data.get('cidade'), data.get('estado'), data.get('cep'), data.get('pais'), data.get('telefone'))
+            )
+            conn.commit()
+            return jsonify({"message": "Aluno criado com sucesso"}), 201
+        except Exception as e:
+            conn.rollback()
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
 
 @alunos_bp.route('/alunos/<int:id_aluno>', methods=['GET'])
-@swag_from(alunos_docs['read_aluno'])
+@api_doc('alunos_docs', 'read_aluno')
+@conditional('aluno', extra=expand_tables('aluno'))
 def read_aluno(id_aluno):
-    conn = create_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("SELECT * FROM aluno WHERE id_aluno = %s", (id_aluno,))
-        aluno = cursor.fetchone()
-        if aluno is None:
-            return jsonify({"error": "Aluno não encontrado"}), 404
-        return jsonify({
-            "id_aluno": aluno[0],
-            "nome_completo": aluno[1],
-            "data_nascimento": aluno[2],
-            "id_turma": aluno[3],
-            "nome_responsavel": aluno[4],
-            "telefone_responsavel": aluno[5],
-            "email_responsavel": aluno[6],
-            "informacoes_adicionais": aluno[7],
-            "endereco": aluno[8],
-            "cidade": aluno[9],
-            "estado": aluno[10],
-            "cep": aluno[11],
-            "pais": aluno[12],
-            "telefone": aluno[13]
-        }), 200
-    except Exception as e:
-        return jsonify({"error": str(e)}), 400
-    finally:
-        cursor.close()
-        conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            fields = get_fields('aluno')
+            expanded, fields, _ = get_expand('aluno', fields)
+            execute_prepared(cursor, f"SELECT {', '.join(expanded)} FROM aluno WHERE id_aluno = %s", (id_aluno,))
+            aluno = cursor.fetchone()
+            if aluno is None:
+                return jsonify({"error": "Aluno não encontrado"}), 404
+            return jsonify(dict(zip(fields, aluno))), 200
+        except Exception as e:
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
+
+# Documento completo do aluno montado pelo Postgres: cada lista sai de uma busca
+# indexada por id_aluno (pagamento, presenca e atividade_aluno) e o resultado
+# já chega serializado, sem passar linha a linha pelo Python.
+DOSSIE_SQL = """
+    SELECT json_build_object(
+        'aluno', json_build_object(
+            'id_aluno', a.id_aluno, 'nome_completo', a.nome_completo, 'data_nascimento', a.data_nascimento,
+            'id_turma', a.id_turma, 'nome_responsavel', a.nome_responsavel,
+            'telefone_responsavel', a.telefone_responsavel, 'email_responsavel', a.email_responsavel,
+            'informacoes_adicionais', a.informacoes_adicionais, 'endereco', a.endereco, 'cidade', a.cidade,
+            'estado', a.estado, 'cep', a.cep, 'pais', a.pais, 'telefone', a.telefone
+        ),
+        'turma', (
+            SELECT json_build_object(
+                'id_turma', t.id_turma, 'nome_turma', t.nome_turma, 'horario', t.horario,
+                'professor', (
+                    SELECT json_build_object(
+                        'id_professor', pf.id_professor, 'nome_completo', pf.nome_completo,
+                        'email', pf.email, 'telefone', pf.telefone
+                    )
+                    FROM professor pf
+                    WHERE pf.id_professor = t.id_professor
+                )
+            )
+            FROM turma t
+            WHERE t.id_turma = a.id_turma
+        ),
+        'resumo', json_build_object(
+            'pagamentos', pg.quantidade,
+            'total_pago', pg.total_pago::text,
+            'presencas', pr.presentes,
+            'faltas', pr.registros - pr.presentes,
+            'percentual_presenca', round(100.0 * pr.presentes / NULLIF(pr.registros, 0), 2),
+            'atividades', atv.quantidade
+        ),
+        'pagamentos', pg.lista,
+        'presencas', pr.lista,
+        'atividades', atv.lista
+    )::text
+    FROM aluno a
+    CROSS JOIN LATERAL (
+        SELECT COALESCE(json_agg(json_build_object(
+                   'id_pagamento', p.id_pagamento, 'data_pagamento', p.data_pagamento,
+                   'valor_pago', p.valor_pago::text, 'forma_pagamento', p.forma_pagamento,
+                   'referencia', p.referencia, 'status', p.status
+               ) ORDER BY p.data_pagamento DESC, p.id_pagamento DESC), '[]'::json) AS lista,
+               COALESCE(sum(p.valor_pago) FILTER (WHERE lower(p.status) = 'pago'), 0) AS total_pago,
+               count(*) AS quantidade
+        FROM pagamento p
+        WHERE p.id_aluno = a.id_aluno
+    ) pg
+    CROSS JOIN LATERAL (
+        SELECT COALESCE(json_agg(json_build_object(
+                   'id_presenca', ps.id_presenca, 'data_presenca', ps.data_presenca, 'presente', ps.presente
+               ) ORDER BY ps.data_presenca DESC, ps.id_presenca DESC), '[]'::json) AS lista,
+               count(*) FILTER (WHERE ps.presente) AS presentes,
+               count(*) AS registros
+        FROM presenca ps
+        WHERE ps.id_aluno = a.id_aluno
+    ) pr
+    CROSS JOIN LATERAL (
+        SELECT COALESCE(json_agg(json_build_object(
+                   'id_atividade', av.id_atividade, 'descricao', av.descricao,
+                   'data_realizacao', av.data_realizacao
+               ) ORDER BY av.data_realizacao DESC, av.id_atividade DESC), '[]'::json) AS lista,
+               count(*) AS quantidade
+        FROM atividade_aluno aa
+        JOIN atividade av ON av.id_atividade = aa.id_atividade
+        WHERE aa.id_aluno = a.id_aluno
+    ) atv
+    WHERE a.id_aluno = %s
+"""
+
+@alunos_bp.route('/alunos/<int:id_aluno>/dossie', methods=['GET'])
+@api_doc('alunos_docs', 'read_dossie_aluno')
+@conditional('aluno', 'turma', 'professor', 'pagamento', 'presenca', 'atividade', 'atividade_aluno')
+def read_dossie_aluno(id_aluno):
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            execute_prepared(cursor, DOSSIE_SQL, (id_aluno,))
+            dossie = cursor.fetchone()
+            if dossie is None:
+                return jsonify({"error": "Aluno não encontrado"}), 404
+            # O JSON montado pelo banco vai direto para o corpo da resposta
+            return current_app.response_class(dossie[0], mimetype='application/json')
+        except Exception as e:
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
 
 @alunos_bp.route('/alunos', methods=['GET'])
-@swag_from(alunos_docs['read_all_alunos'])
+@api_doc('alunos_docs', 'read_all_alunos')
+@conditional('aluno', extra=expand_tables('aluno'))
 def read_all_alunos():
-    conn = create_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("SELECT * FROM aluno ORDER BY nome_completo")
-        alunos = cursor.fetchall()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            fields = get_fields('aluno')
+            expanded, fields, _ = get_expand('aluno', fields)
+            ids = get_ids()
+            if ids is not None:
+                alunos, missing = fetch_by_ids(cursor, 'aluno', 'id_aluno', expanded, ids, fields)
+                return jsonify(alunos), 200, missing_headers(missing)
+            limit, after = get_page_args(2)
+            conditions, filter_params = get_filters(ALUNO_FILTERS)
+            where, params = keyset_where(('nome_completo', 'id_aluno'), after, conditions, filter_params)
+            columns, key = select_list(expanded, ('nome_completo', 'id_aluno'))
+            cursor.execute(
+                f"SELECT {columns} FROM aluno {where} ORDER BY nome_completo, id_aluno LIMIT %s",
+                params + (limit + 1,)
+            )
+            alunos, next_cursor = split_page(cursor.fetchall(), limit, key)
         
-        result = []
-        for aluno in alunos:
-            result.append({
-                "id_aluno": aluno[0],
-                "nome_completo": aluno[1],
-                "data_nascimento": aluno[2],
-                "id_turma": aluno[3],
-                "nome_responsavel": aluno[4],
-                "telefone_responsavel": aluno[5],
-                "email_responsavel": aluno[6],
-                "informacoes_adicionais": aluno[7],
-                "endereco": aluno[8],
-                "cidade": aluno[9],
-                "estado": aluno[10],
-                "cep": aluno[11],
-                "pais": aluno[12],
-                "telefone": aluno[13]
-            })
+            result = rows_to_dicts(fields, alunos)
         
-        return jsonify(result), 200
-    except Exception as e:
-        return jsonify({"error": str(e)}), 400
-    finally:
-        cursor.close()
-        conn.close()
+            return jsonify(result), 200, page_headers(next_cursor)
+        except Exception as e:
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
 
 @alunos_bp.route('/alunos/<int:id_aluno>', methods=['PUT'])
-@swag_from(alunos_docs['update_aluno'])
+@api_doc('alunos_docs', 'update_aluno')
 def update_aluno(id_aluno):
     data = request.get_json()
-    conn = create_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(
-            """
-            UPDATE aluno
-            SET nome_completo = %s, data_nascimento = %s, id_turma = %s, nome_responsavel = %s, telefone_responsavel = %s, email_responsavel = %s, informacoes_adicionais = %s, endereco = %s, cidade = %s, estado = %s, cep = %s, pais = %s, telefone = %s
-            WHERE id_aluno = %s
-            """,
-            (data['nome_completo'], data['data_nascimento'], data.get('id_turma'), data.get('nome_responsavel'),
-             data.get('telefone_responsavel'), data.get('email_responsavel'), data.get('informacoes_adicionais'),
-             data.get('endereco'), data.get('cidade'), data.get('estado'), data.get('cep'), data.get('pais'), data.get('telefone'), id_aluno)
-        )
-        conn.commit()
-        if cursor.rowcount == 0:
-            return jsonify({"error": "Aluno não encontrado"}), 404
-        return jsonify({"message": "Aluno atualizado com sucesso"}), 200
-    except Exception as e:
-        conn.rollback()
-        return jsonify({"error": str(e)}), 400
-    finally:
-        cursor.close()
-        conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            execute_prepared(
+                cursor,
+                """
+                UPDATE aluno
+                SET nome_completo = %s, data_nascimento = %s, id_turma = %s, nome_responsavel = %s, telefone_responsavel = %s, email_responsavel = %s, informacoes_adicionais = %s, endereco = %s, cidade = %s, estado = %s, cep = %s, pais = %s, telefone = %s
+                WHERE id_aluno = %s
+                """,
+                (data['nome_completo'], data['data_nascimento'], data.get('id_turma'), data.get('nome_responsavel'),
+                 data.get('telefone_responsavel'), data.get('email_responsavel'), data.get('informacoes_adicionais'),
+                 data.get('endereco'), data.get('cidade'), data.get('estado'), data.get('cep'), data.get('pais'), data.get('telefone'), id_aluno)
+            )
+            conn.commit()
+            if cursor.rowcount == 0:
+                return jsonify({"error": "Aluno não encontrado"}), 404
+            return jsonify({"message": "Aluno atualizado com sucesso"}), 200
+        except Exception as e:
+            conn.rollback()
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
 
 @alunos_bp.route('/alunos/<int:id_aluno>', methods=['DELETE'])
-@swag_from(alunos_docs['delete_aluno'])
+@api_doc('alunos_docs', 'delete_aluno')
 def delete_aluno(id_aluno):
-    conn = create_connection()
-    cursor = conn.cursor()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            execute_prepared(cursor, "DELETE FROM aluno WHERE id_aluno = %s", (id_aluno,))
+            conn.commit()
+            if cursor.rowcount == 0:
+                return jsonify({"error": "Aluno não encontrado"}), 404
+            return jsonify({"message": "Aluno deletado com sucesso"}), 200
+        except Exception as e:
+            conn.rollback()
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
+
+def _read_bulk_rows():
+    """
+    Parse the body of POST /alunos/bulk, either a JSON array of objects or a
+    CSV document whose first line holds the column names.
+    """
+    if request.mimetype == 'text/csv':
+        return list(csv.DictReader(io.StringIO(request.get_data(as_text=True))))
+    rows = request.get_json()
+    if not isinstance(rows, list):
+        raise ValueError("O corpo deve ser um array JSON ou um CSV")
+    return rows
+
+def _validate_bulk_row(row, seen_ids):
+    """
+    Normalize one input row into the column order of ALUNO_BULK_COLUMNS.
+    :return: Tuple of values or raises ValueError with the reason
+    """
+    if not isinstance(row, dict):
+        raise ValueError("Registro deve ser um objeto")
+    unknown = set(row) - set(ALUNO_BULK_COLUMNS)
+    if unknown:
+        raise ValueError(f"Colunas desconhecidas: {', '.join(sorted(unknown))}")
+    values = []
+    for column, max_length in ALUNO_BULK_COLUMNS.items():
+        value = row.get(column)
+        if isinstance(value, str):
+            value = value.strip() or None
+        if column in ('id_aluno', 'id_turma') and value is not None:
+            try:
+                value = int(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"{column} deve ser um número inteiro")
+        elif column == 'data_nascimento' and value is not None:
+            try:
+                value = datetime.date.fromisoformat(str(value)).isoformat()
+            except ValueError:
+                raise ValueError("data_nascimento deve estar no formato AAAA-MM-DD")
+        elif value is not None:
+            value = str(value)
+            if max_length and len(value) > max_length:
+                raise ValueError(f"{column} excede {max_length} caracteres")
+        values.append(value)
+    row_values = dict(zip(ALUNO_BULK_COLUMNS, values))
+    if row_values['nome_completo'] is None:
+        raise ValueError("nome_completo é obrigatório")
+    if row_values['data_nascimento'] is None:
+        raise ValueError("data_nascimento é obrigatório")
+    if row_values['id_aluno'] is not None:
+        if row_values['id_aluno'] in seen_ids:
+            raise ValueError(f"id_aluno {row_values['id_aluno']} repetido no lote")
+        seen_ids.add(row_values['id_aluno'])
+    return tuple(values)
+
+@alunos_bp.route('/alunos/bulk', methods=['POST'])
+@api_doc('alunos_docs', 'bulk_create_alunos')
+def bulk_create_alunos():
     try:
-        cursor.execute("DELETE FROM aluno WHERE id_aluno = %s", (id_aluno,))
-        conn.commit()
-        if cursor.rowcount == 0:
-            return jsonify({"error": "Aluno não encontrado"}), 404
-        return jsonify({"message": "Aluno deletado com sucesso"}), 200
+        rows = _read_bulk_rows()
     except Exception as e:
-        conn.rollback()
         return jsonify({"error": str(e)}), 400
-    finally:
-        cursor.close()
-        conn.close()
+    if not rows:
+        return jsonify({"error": "Nenhum aluno enviado"}), 400
+    if len(rows) > BULK_MAX_ROWS:
+        return jsonify({"error": f"Limite de {BULK_MAX_ROWS} alunos por lote"}), 400
+
+    # Validação em Python; as linhas válidas vão para o COPY como CSV
+    errors = []
+    seen_ids = set()
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for linha, row in enumerate(rows, start=1):
+        try:
+            writer.writerow((linha,) + _validate_bulk_row(row, seen_ids))
+        except ValueError as e:
+            errors.append({"linha": linha, "error": str(e)})
+    buffer.seek(0)
+
+    columns = ', '.join(ALUNO_BULK_COLUMNS)
+    data_columns = ', '.join(c for c in ALUNO_BULK_COLUMNS if c != 'id_aluno')
+    updates = ', '.join(f"{c} = EXCLUDED.{c}" for c in ALUNO_BULK_COLUMNS if c != 'id_aluno')
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                """
+                CREATE TEMP TABLE aluno_staging (
+                    linha INTEGER, id_aluno INTEGER, nome_completo TEXT, data_nascimento DATE,
+                    id_turma INTEGER, nome_responsavel TEXT, telefone_responsavel TEXT,
+                    email_responsavel TEXT, informacoes_adicionais TEXT, endereco TEXT,
+                    cidade TEXT, estado TEXT, cep TEXT, pais TEXT, telefone TEXT
+                ) ON COMMIT DROP
+                """
+            )
+            cursor.copy_expert(f"COPY aluno_staging (linha, {columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+            # Turmas inexistentes violariam a FK e abortariam o lote inteiro
+            cursor.execute(
+                """
+                DELETE FROM aluno_staging s
+                WHERE s.id_turma IS NOT NULL
+                  AND NOT EXISTS (SELECT 1 FROM turma t WHERE t.id_turma = s.id_turma)
+                RETURNING s.linha, s.id_turma
+                """
+            )
+            for linha, id_turma in cursor.fetchall():
+                errors.append({"linha": linha, "error": f"Turma {id_turma} não encontrada"})
+
+            # Ids explícitos à frente da sequência: ela é avançada antes do INSERT para que
+            # os ids gerados para as linhas sem id_aluno não colidam com eles. O lock impede
+            # que um INSERT concorrente tome da sequência um id do lote até o COMMIT.
+            cursor.execute("LOCK TABLE aluno IN SHARE ROW EXCLUSIVE MODE")
+            cursor.execute(
+                """
+                SELECT setval(pg_get_serial_sequence('aluno', 'id_aluno'),
+                              greatest(max(id_aluno), nextval(pg_get_serial_sequence('aluno', 'id_aluno'))))
+                FROM aluno_staging
+                HAVING max(id_aluno) IS NOT NULL
+                """
+            )
+
+            cursor.execute(
+                f"""
+                WITH merged AS (
+                    INSERT INTO aluno ({columns})
+                    SELECT {columns} FROM aluno_staging WHERE id_aluno IS NOT NULL
+                    ON CONFLICT (id_aluno) DO UPDATE SET {updates}
+                    RETURNING (xmax = 0) AS inserido
+                ), created AS (
+                    INSERT INTO aluno ({data_columns})
+                    SELECT {data_columns} FROM aluno_staging WHERE id_aluno IS NULL
+                    RETURNING 1
+                )
+                SELECT (SELECT count(*) FROM merged WHERE inserido) + (SELECT count(*) FROM created),
+                       (SELECT count(*) FROM merged WHERE NOT inserido)
+                """
+            )
+            inseridos, atualizados = cursor.fetchone()
+            conn.commit()
+            errors.sort(key=lambda error: error["linha"])
+            status = 201 if not errors else 207 if inseridos or atualizados else 400
+            return jsonify({
+                "message": "Importação de alunos concluída",
+                "inseridos": inseridos,
+                "atualizados": atualizados,
+                "erros": errors
+            }), status
+        except Exception as e:
+            conn.rollback()
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
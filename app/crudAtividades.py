@@ -1,118 +1,124 @@
 from flask import Blueprint, request, jsonify
-from app.Util.bd import create_connection
-from flasgger import swag_from
-from app.swagger import atividades_docs
+from app.Util.bd import get_connection
+from app.Util.statements import execute_prepared
+from app.Util.json_provider import rows_to_dicts
+from app.Util.fields import get_fields, select_list
+from app.Util.etag import conditional
+from app.Util.cache import cached_fetchone, cached_fetchall, invalidate
+from app.Util.pagination import get_page_args, keyset_where, split_page, page_headers
+from app.Util.openapi import api_doc
 
 atividades_bp = Blueprint('atividades', __name__)
 
 @atividades_bp.route('/atividades', methods=['POST'])
-@swag_from(atividades_docs['create_atividade'])
+@api_doc('atividades_docs', 'create_atividade')
 def create_atividade():
     data = request.get_json()
-    conn = create_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(
-            """
-            INSERT INTO atividade (descricao, data_realizacao)
-            VALUES (%s, %s)
-            """,
-            (data['descricao'], data['data_realizacao'])
-        )
-        conn.commit()
-        return jsonify({"message": "Atividade criada com sucesso"}), 201
-    except Exception as e:
-        conn.rollback()
-        return jsonify({"error": str(e)}), 400
-    finally:
-        cursor.close()
-        conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            execute_prepared(
+                cursor,
+                """
+                INSERT INTO atividade (descricao, data_realizacao)
+                VALUES (%s, %s)
+                """,
+                (data['descricao'], data['data_realizacao'])
+            )
+            conn.commit()
+            invalidate('atividade')
+            return jsonify({"message": "Atividade criada com sucesso"}), 201
+        except Exception as e:
+            conn.rollback()
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
 
 @atividades_bp.route('/atividades/<int:id_atividade>', methods=['GET'])
-@swag_from(atividades_docs['read_atividade'])
+@api_doc('atividades_docs', 'read_atividade')
+@conditional('atividade')
 def read_atividade(id_atividade):
-    conn = create_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("SELECT * FROM atividade WHERE id_atividade = %s", (id_atividade,))
-        atividade = cursor.fetchone()
-        if atividade is None:
-            return jsonify({"error": "Atividade não encontrada"}), 404
-        return jsonify({
-            "id_atividade": atividade[0],
-            "descricao": atividade[1],
-            "data_realizacao": atividade[2]
-        }), 200
-    except Exception as e:
-        return jsonify({"error": str(e)}), 400
-    finally:
-        cursor.close()
-        conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            fields = get_fields('atividade')
+            atividade = cached_fetchone(cursor, f"SELECT {', '.join(fields)} FROM atividade WHERE id_atividade = %s", (id_atividade,), ('atividade',))
+            if atividade is None:
+                return jsonify({"error": "Atividade não encontrada"}), 404
+            return jsonify(dict(zip(fields, atividade))), 200
+        except Exception as e:
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
 
 @atividades_bp.route('/atividades', methods=['GET'])
-@swag_from(atividades_docs['read_all_atividades'])
+@api_doc('atividades_docs', 'read_all_atividades')
+@conditional('atividade')
 def read_all_atividades():
-    conn = create_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("SELECT * FROM atividade ORDER BY data_realizacao")
-        atividades = cursor.fetchall()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            limit, after = get_page_args(2)
+            where, params = keyset_where(('data_realizacao', 'id_atividade'), after)
+            fields = get_fields('atividade')
+            columns, key = select_list(fields, ('data_realizacao', 'id_atividade'))
+            rows = cached_fetchall(
+                cursor,
+                f"SELECT {columns} FROM atividade {where} ORDER BY data_realizacao, id_atividade LIMIT %s",
+                params + (limit + 1,),
+                ('atividade',)
+            )
+            atividades, next_cursor = split_page(rows, limit, key)
         
-        result = []
-        for atividade in atividades:
-            result.append({
-                "id_atividade": atividade[0],
-                "descricao": atividade[1],
-                "data_realizacao": atividade[2]
-            })
+            result = rows_to_dicts(fields, atividades)
         
-        return jsonify(result), 200
-    except Exception as e:
-        return jsonify({"error": str(e)}), 400
-    finally:
-        cursor.close()
-        conn.close()
+            return jsonify(result), 200, page_headers(next_cursor)
+        except Exception as e:
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
 
 @atividades_bp.route('/atividades/<int:id_atividade>', methods=['PUT'])
-@swag_from(atividades_docs['update_atividade'])
+@api_doc('atividades_docs', 'update_atividade')
 def update_atividade(id_atividade):
     data = request.get_json()
-    conn = create_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(
-            """
-            UPDATE atividade
-            SET descricao = %s, data_realizacao = %s
-            WHERE id_atividade = %s
-            """,
-            (data['descricao'], data['data_realizacao'], id_atividade)
-        )
-        conn.commit()
-        if cursor.rowcount == 0:
-            return jsonify({"error": "Atividade não encontrada"}), 404
-        return jsonify({"message": "Atividade atualizada com sucesso"}), 200
-    except Exception as e:
-        conn.rollback()
-        return jsonify({"error": str(e)}), 400
-    finally:
-        cursor.close()
-        conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            execute_prepared(
+                cursor,
+                """
+                UPDATE atividade
+                SET descricao = %s, data_realizacao = %s
+                WHERE id_atividade = %s
+                """,
+                (data['descricao'], data['data_realizacao'], id_atividade)
+            )
+            conn.commit()
+            invalidate('atividade')
+            if cursor.rowcount == 0:
+                return jsonify({"error": "Atividade não encontrada"}), 404
+            return jsonify({"message": "Atividade atualizada com sucesso"}), 200
+        except Exception as e:
+            conn.rollback()
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
 
 @atividades_bp.route('/atividades/<int:id_atividade>', methods=['DELETE'])
-@swag_from(atividades_docs['delete_atividade'])
+@api_doc('atividades_docs', 'delete_atividade')
 def delete_atividade(id_atividade):
-    conn = create_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("DELETE FROM atividade WHERE id_atividade = %s", (id_atividade,))
-        conn.commit()
-        if cursor.rowcount == 0:
-            return jsonify({"error": "Atividade não encontrada"}), 404
-        return jsonify({"message": "Atividade deletada com sucesso"}), 200
-    except Exception as e:
-        conn.rollback()
-        return jsonify({"error": str(e)}), 400
-    finally:
-        cursor.close()
-        conn.close() 
\ No newline at end of file
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            execute_prepared(cursor, "DELETE FROM atividade WHERE id_atividade = %s", (id_atividade,))
+            conn.commit()
+            invalidate('atividade')
+            if cursor.rowcount == 0:
+                return jsonify({"error": "Atividade não encontrada"}), 404
+            return jsonify({"message": "Atividade deletada com sucesso"}), 200
+        except Exception as e:
+            conn.rollback()
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
@@ -1,101 +1,185 @@
-from flask import Blueprint, request, jsonify
-from app.Util.bd import create_connection
-from flasgger import swag_from
-from app.swagger import categories_docs
+from flask import Blueprint, request, jsonify, send_file, url_for
+from app.Util.bd import get_connection
+from app.Util.statements import execute_prepared
+from app.Util.blobs import cached_blob_path, sniff_mimetype, store_blob, strip_ole_header
+from app.Util.etag import conditional
+from app.Util.fields import get_fields
+from app.Util.cache import cached_fetchone, cached_fetchall, invalidate
+from app.Util.streaming import get_stream_format, stream_query
+from app.Util.openapi import api_doc
 import base64
+import io
 
 app = Blueprint('categories', __name__)
 
 @app.route('/categories', methods=['POST'])
-@swag_from(categories_docs['create_category'])
+@api_doc('categories_docs', 'create_category')
 def create_category():
     data = request.get_json()
-    conn = create_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(
-            """
-            INSERT INTO categories (category_id, category_name, description, picture)
-            VALUES (%s, %s, %s, %s)
-            """,
-            (data['category_id'], data['category_name'], data.get('description'), data.get('picture'))
-        )
-        conn.commit()
-        return jsonify({"message": "Category created successfully"}), 201
-    except Exception as e:
-        conn.rollback()
-        return jsonify({"error": str(e)}), 400
-    finally:
-        cursor.close()
-        conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            execute_prepared(
+                cursor,
+                """
+                INSERT INTO categories (category_id, category_name, description, picture)
+                VALUES (%s, %s, %s, %s)
+                """,
+                (data['category_id'], data['category_name'], data.get('description'), data.get('picture'))
+            )
+            conn.commit()
+            invalidate('categories')
+            return jsonify({"message": "Category created successfully"}), 201
+        except Exception as e:
+            conn.rollback()
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
 
 @app.route('/categories', methods=['GET'])
+@conditional('categories')
 def get_categories():
-    conn = create_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM categories")
-    categories = cursor.fetchall()
-    return jsonify(categories), 200
-
-@app.route('/categories/<int:category_id>', methods=['GET'])
-@swag_from(categories_docs['read_category'])
-def read_category(category_id):
-    conn = create_connection()
-    cursor = conn.cursor()
+    # ?stream=ndjson|json exporta a tabela inteira em lotes, sem carregá-la em memória
     try:
-        cursor.execute("SELECT * FROM categories WHERE category_id = %s", (category_id,))
-        category = cursor.fetchone()
-        if category is None:
-            return jsonify({"error": "Category not found"}), 404
-        return jsonify({
-            "category_id": category[0],
-            "category_name": category[1],
-            "description": category[2],
-            "picture": base64.b64encode(category[3]).decode('utf-8') if category[3] else None,
-        }), 200
+        fields = get_fields('categories')
+        fmt = get_stream_format()
+        if fmt:
+            return stream_query(f"SELECT {', '.join(fields)} FROM categories", fmt=fmt)
     except Exception as e:
         return jsonify({"error": str(e)}), 400
-    finally:
-        cursor.close()
-        conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            categories = cached_fetchall(cursor, f"SELECT {', '.join(fields)} FROM categories", (), ('categories',))
+            return jsonify(categories), 200
+        except Exception as e:
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
+
+@app.route('/categories/<int:category_id>', methods=['GET'])
+@api_doc('categories_docs', 'read_category')
+@conditional('categories')
+def read_category(category_id):
+    # ?picture=base64 (padrão) embute a imagem; url aponta para /categories/<id>/picture; none a omite
+    picture_mode = request.args.get('picture', 'base64')
+    if picture_mode not in ('base64', 'url', 'none'):
+        return jsonify({"error": "picture must be one of: base64, url, none"}), 400
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            fields = get_fields('categories')
+            # Fora do modo base64 a coluna bytea não é lida nem transferida, só testada
+            columns = [
+                'length(picture) > 0' if field == 'picture' and picture_mode != 'base64' else field
+                for field in fields
+            ]
+            sql = f"SELECT {', '.join(columns)} FROM categories WHERE category_id = %s"
+            category = cached_fetchone(cursor, sql, (category_id,), ('categories',))
+            if category is None:
+                return jsonify({"error": "Category not found"}), 404
+            result = dict(zip(fields, category))
+            if 'picture' in result:
+                picture = result.pop('picture')
+                if picture_mode == 'base64':
+                    result["picture"] = base64.b64encode(picture).decode('utf-8') if picture else None
+                elif picture_mode == 'url':
+                    result["picture_url"] = url_for('categories.read_category_picture', category_id=category_id) if picture else None
+            return jsonify(result), 200
+        except Exception as e:
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
+
+def _read_picture(cursor, category_id):
+    # Lê a imagem do banco e a grava no cache em disco; imagem vazia conta como ausente
+    execute_prepared(
+        cursor,
+        "SELECT picture, md5(picture) FROM categories WHERE category_id = %s AND length(picture) > 0",
+        (category_id,)
+    )
+    row = cursor.fetchone()
+    if row is None:
+        return None, None
+    data = strip_ole_header(row[0])
+    store_blob(row[1], data)
+    return data, row[1]
+
+@app.route('/categories/<int:category_id>/picture', methods=['GET'])
+@api_doc('categories_docs', 'read_category_picture')
+def read_category_picture(category_id):
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            # Só o hash sai do banco; a imagem é lida apenas se ainda não estiver no cache em disco
+            execute_prepared(
+                cursor,
+                "SELECT md5(picture), length(picture) > 0 FROM categories WHERE category_id = %s",
+                (category_id,)
+            )
+            row = cursor.fetchone()
+            if row is None:
+                return jsonify({"error": "Category not found"}), 404
+            if not row[1]:
+                return jsonify({"error": "Category has no picture"}), 404
+            digest = row[0]
+            path = cached_blob_path(digest)
+            if path is not None:
+                try:
+                    with open(path, 'rb') as picture_file:
+                        mimetype = sniff_mimetype(picture_file.read(16))
+                    # send_file trata Range e If-None-Match e entrega o arquivo via sendfile quando o servidor suporta
+                    return send_file(path, mimetype=mimetype, etag=digest, conditional=True)
+                except FileNotFoundError:
+                    # Removido do cache por outro worker depois da verificação: relê do banco
+                    pass
+            data, digest = _read_picture(cursor, category_id)
+            if data is None:
+                return jsonify({"error": "Category has no picture"}), 404
+            return send_file(io.BytesIO(data), mimetype=sniff_mimetype(data[:16]), etag=digest, conditional=True)
+        except Exception as e:
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
 
 @app.route('/categories/<int:category_id>', methods=['PUT'])
-@swag_from(categories_docs['update_category'])
+@api_doc('categories_docs', 'update_category')
 def update_category(category_id):
     data = request.get_json()
-    conn = create_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(
-            """
-            UPDATE categories
-            SET category_name = %s, description = %s, picture = %s
-            WHERE category_id = %s
-            """,
-            (data['category_name'], data.get('description'), data.get('picture'), category_id)
-        )
-        conn.commit()
-        return jsonify({"message": "Category updated successfully"}), 200
-    except Exception as e:
-        conn.rollback()
-        return jsonify({"error": str(e)}), 400
-    finally:
-        cursor.close()
-        conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            execute_prepared(
+                cursor,
+                """
+                UPDATE categories
+                SET category_name = %s, description = %s, picture = %s
+                WHERE category_id = %s
+                """,
+                (data['category_name'], data.get('description'), data.get('picture'), category_id)
+            )
+            conn.commit()
+            invalidate('categories')
+            return jsonify({"message": "Category updated successfully"}), 200
+        except Exception as e:
+            conn.rollback()
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
 
 @app.route('/categories/<int:category_id>', methods=['DELETE'])
-@swag_from(categories_docs['delete_category'])
+@api_doc('categories_docs', 'delete_category')
 def delete_category(category_id):
-    conn = create_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("DELETE FROM categories WHERE category_id = %s", (category_id,))
-        conn.commit()
-        return jsonify({"message": "Category deleted successfully"}), 200
-    except Exception as e:
-        conn.rollback()
-        return jsonify({"error": str(e)}), 400
-    finally:
-        cursor.close()
-        conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            execute_prepared(cursor, "DELETE FROM categories WHERE category_id = %s", (category_id,))
+            conn.commit()
+            invalidate('categories')
+            return jsonify({"message": "Category deleted successfully"}), 200
+        except Exception as e:
+            conn.rollback()
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
 
@@ -1,147 +1,171 @@
 from flask import Blueprint, request, jsonify
-from app.Util.bd import create_connection
-from flasgger import swag_from
-from app.swagger import order_details_docs
+from app.Util.bd import get_connection
+from app.Util.statements import execute_prepared
+from app.Util.json_provider import rows_to_dicts
+from app.Util.fields import get_fields, select_list
+from app.Util.filters import get_filters, parse_int
+from app.Util.etag import conditional
+from app.Util.streaming import get_stream_format, stream_query
+from app.Util.openapi import api_doc
+from app.Util.pagination import get_page_args, keyset_where, split_page, page_headers
 
 app = Blueprint('order_details', __name__)
 
+# Filtros aceitos por GET /order-details: (parâmetro, coluna, operador, tipo)
+ORDER_DETAIL_FILTERS = (
+    ('product_id', 'product_id', '=', parse_int),
+)
+
 @app.route('/')
 def index():
     return "API para gerenciamento de detalhes de pedidos"
 
 @app.route('/order-details', methods=['POST'])
-@swag_from(order_details_docs['create_order_detail'])
+@api_doc('order_details_docs', 'create_order_detail')
 def create_order_detail():
     data = request.get_json()
-    conn = create_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(
-            """
-            INSERT INTO order_details (order_id, product_id, unit_price, quantity, discount)
-            VALUES (%s, %s, %s, %s, %s)
-            """,
-            (data['order_id'], data['product_id'], data['unit_price'], 
-             data['quantity'], data.get('discount', 0.0))
-        )
-        conn.commit()
-        return jsonify({"message": "Order detail created successfully"}), 201
-    except Exception as e:
-        conn.rollback()
-        return jsonify({"error": str(e)}), 400
-    finally:
-        cursor.close()
-        conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            execute_prepared(
+                cursor,
+                """
+                INSERT INTO order_details (order_id, product_id, unit_price, quantity, discount)
+                VALUES (%s, %s, %s, %s, %s)
+                """,
+                (data['order_id'], data['product_id'], data['unit_price'], 
+                 data['quantity'], data.get('discount', 0.0))
+            )
+            conn.commit()
+            return jsonify({"message": "Order detail created successfully"}), 201
+        except Exception as e:
+            conn.rollback()
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
 
 @app.route('/order-details', methods=['GET'])
+@conditional('order_details')
 def get_order_details():
-    conn = create_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM order_details")
-    order_details = cursor.fetchall()
-    return jsonify(order_details), 200
+    # Listagem paginada; ?stream=ndjson|json exporta a tabela inteira em lotes, sem carregá-la em memória
+    try:
+        fields = get_fields('order_details')
+        conditions, params = get_filters(ORDER_DETAIL_FILTERS)
+        fmt = get_stream_format()
+        if fmt:
+            where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+            return stream_query(f"SELECT {', '.join(fields)} FROM order_details {where}", params, fmt=fmt)
+        limit, after = get_page_args(2)
+        where, params = keyset_where(('order_id', 'product_id'), after, conditions, params)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+    columns, key = select_list(fields, ('order_id', 'product_id'))
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                f"SELECT {columns} FROM order_details {where} ORDER BY order_id, product_id LIMIT %s",
+                params + (limit + 1,)
+            )
+            rows, next_cursor = split_page(cursor.fetchall(), limit, key)
+            # Sem as colunas da chave que o cliente não pediu, no mesmo formato do ?stream=
+            order_details = [row[:len(fields)] for row in rows]
+            return jsonify(order_details), 200, page_headers(next_cursor)
+        except Exception as e:
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
 
 @app.route('/order-details/<int:order_id>/<int:product_id>', methods=['GET'])
-@swag_from(order_details_docs['read_order_detail'])
+@api_doc('order_details_docs', 'read_order_detail')
+@conditional('order_details')
 def read_order_detail(order_id, product_id):
-    conn = create_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("""
-            SELECT order_id, product_id, unit_price, quantity, discount 
-            FROM order_details 
-            WHERE order_id = %s AND product_id = %s
-        """, (order_id, product_id))
-        order_detail = cursor.fetchone()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            fields = get_fields('order_details')
+            execute_prepared(cursor, f"""
+                SELECT {', '.join(fields)}
+                FROM order_details 
+                WHERE order_id = %s AND product_id = %s
+            """, (order_id, product_id))
+            order_detail = cursor.fetchone()
         
-        if order_detail is None:
-            return jsonify({"error": "Order detail not found"}), 404
+            if order_detail is None:
+                return jsonify({"error": "Order detail not found"}), 404
             
-        return jsonify({
-            "order_id": order_detail[0],
-            "product_id": order_detail[1],
-            "unit_price": float(order_detail[2]),
-            "quantity": order_detail[3],
-            "discount": float(order_detail[4])
-        }), 200
-    except Exception as e:
-        return jsonify({"error": str(e)}), 400
-    finally:
-        cursor.close()
-        conn.close()
+            return jsonify(dict(zip(fields, order_detail))), 200
+        except Exception as e:
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
 
 @app.route('/order-details/<int:order_id>/<int:product_id>', methods=['PUT'])
-@swag_from(order_details_docs['update_order_detail'])
+@api_doc('order_details_docs', 'update_order_detail')
 def update_order_detail(order_id, product_id):
     data = request.get_json()
-    conn = create_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(
-            """
-            UPDATE order_details
-            SET unit_price = %s, quantity = %s, discount = %s
-            WHERE order_id = %s AND product_id = %s
-            """,
-            (data['unit_price'], data['quantity'], 
-             data.get('discount', 0.0), order_id, product_id)
-        )
-        conn.commit()
-        return jsonify({"message": "Order detail updated successfully"}), 200
-    except Exception as e:
-        conn.rollback()
-        return jsonify({"error": str(e)}), 400
-    finally:
-        cursor.close()
-        conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            execute_prepared(
+                cursor,
+                """
+                UPDATE order_details
+                SET unit_price = %s, quantity = %s, discount = %s
+                WHERE order_id = %s AND product_id = %s
+                """,
+                (data['unit_price'], data['quantity'], 
+                 data.get('discount', 0.0), order_id, product_id)
+            )
+            conn.commit()
+            return jsonify({"message": "Order detail updated successfully"}), 200
+        except Exception as e:
+            conn.rollback()
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
 
 @app.route('/order-details/<int:order_id>/<int:product_id>', methods=['DELETE'])
-@swag_from(order_details_docs['delete_order_detail'])
+@api_doc('order_details_docs', 'delete_order_detail')
 def delete_order_detail(order_id, product_id):
-    conn = create_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("""
-            DELETE FROM order_details 
-            WHERE order_id = %s AND product_id = %s
-        """, (order_id, product_id))
-        conn.commit()
-        return jsonify({"message": "Order detail deleted successfully"}), 200
-    except Exception as e:
-        conn.rollback()
-        return jsonify({"error": str(e)}), 400
-    finally:
-        cursor.close()
-        conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            execute_prepared(cursor, """
+                DELETE FROM order_details 
+                WHERE order_id = %s AND product_id = %s
+            """, (order_id, product_id))
+            conn.commit()
+            return jsonify({"message": "Order detail deleted successfully"}), 200
+        except Exception as e:
+            conn.rollback()
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
 
 # Endpoint adicional para listar todos os detalhes de um pedido específico
 @app.route('/order-details/<int:order_id>', methods=['GET'])
-@swag_from(order_details_docs['list_order_details'])
+@api_doc('order_details_docs', 'list_order_details')
+@conditional('order_details')
 def list_order_details(order_id):
-    conn = create_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("""
-            SELECT order_id, product_id, unit_price, quantity, discount 
-            FROM order_details 
-            WHERE order_id = %s
-        """, (order_id,))
-        order_details = cursor.fetchall()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            fields = get_fields('order_details')
+            cursor.execute(f"""
+                SELECT {', '.join(fields)}
+                FROM order_details 
+                WHERE order_id = %s
+            """, (order_id,))
+            order_details = cursor.fetchall()
         
-        if not order_details:
-            return jsonify({"error": "No order details found for this order"}), 404
+            if not order_details:
+                return jsonify({"error": "No order details found for this order"}), 404
             
-        return jsonify([{
-            "order_id": detail[0],
-            "product_id": detail[1],
-            "unit_price": float(detail[2]),
-            "quantity": detail[3],
-            "discount": float(detail[4])
-        } for detail in order_details]), 200
-    except Exception as e:
-        return jsonify({"error": str(e)}), 400
-    finally:
-        cursor.close()
-        conn.close()
+            return jsonify(rows_to_dicts(fields, order_details)), 200
+        except Exception as e:
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
 
  
\ No newline at end of file
@@ -1,128 +1,228 @@
 from flask import Blueprint, request, jsonify
-from app.Util.bd import create_connection
-from flasgger import swag_from
-from app.swagger import pagamentos_docs
+import datetime
+from app.Util.bd import get_connection
+from app.Util.statements import execute_prepared
+from app.Util.json_provider import rows_to_dicts
+from app.Util.fields import get_fields, select_list
+from app.Util.expand import expand_tables, get_expand
+from app.Util.multiget import fetch_by_ids, get_ids, missing_headers
+from app.Util.filters import get_filters, parse_date, parse_int, parse_str
+from app.Util.etag import conditional
+from app.Util.matviews import request_refresh, start_refresher
+from app.Util.pagination import get_page_args, keyset_where, split_page, page_headers
+from app.Util.openapi import api_doc
 
 pagamentos_bp = Blueprint('pagamentos', __name__)
 
+# Filtros aceitos por GET /pagamentos: (parâmetro, coluna, operador, tipo)
+PAGAMENTO_FILTERS = (
+    ('id_aluno', 'id_aluno', '=', parse_int),
+    ('status', 'status', '=', parse_str),
+    ('de', 'data_pagamento', '>=', parse_date),
+    ('ate', 'data_pagamento', '<=', parse_date),
+)
+
 @pagamentos_bp.route('/pagamentos', methods=['POST'])
-@swag_from(pagamentos_docs['create_pagamento'])
+@api_doc('pagamentos_docs', 'create_pagamento')
 def create_pagamento():
     data = request.get_json()
-    conn = create_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(
-            """
-            INSERT INTO pagamento (id_aluno, data_pagamento, valor_pago, forma_pagamento, referencia, status)
-            VALUES (%s, %s, %s, %s, %s, %s)
-            """,
-            (data['id_aluno'], data['data_pagamento'], data['valor_pago'], 
-             data.get('forma_pagamento'), data.get('referencia'), data.get('status'))
-        )
-        conn.commit()
-        return jsonify({"message": "Pagamento criado com sucesso"}), 201
-    except Exception as e:
-        conn.rollback()
-        return jsonify({"error": str(e)}), 400
-    finally:
-        cursor.close()
-        conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            execute_prepared(
+                cursor,
+                """
+                INSERT INTO pagamento (id_aluno, data_pagamento, valor_pago, forma_pagamento, referencia, status)
+                VALUES (%s, %s, %s, %s, %s, %s)
+                """,
+                (data['id_aluno'], data['data_pagamento'], data['valor_pago'], 
+                 data.get('forma_pagamento'), data.get('referencia'), data.get('status'))
+            )
+            conn.commit()
+            request_refresh('pagamento')
+            return jsonify({"message": "Pagamento criado com sucesso"}), 201
+        except Exception as e:
+            conn.rollback()
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
 
 @pagamentos_bp.route('/pagamentos/<int:id_pagamento>', methods=['GET'])
-@swag_from(pagamentos_docs['read_pagamento'])
+@api_doc('pagamentos_docs', 'read_pagamento')
+@conditional('pagamento', extra=expand_tables('pagamento'))
 def read_pagamento(id_pagamento):
-    conn = create_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("SELECT * FROM pagamento WHERE id_pagamento = %s", (id_pagamento,))
-        pagamento = cursor.fetchone()
-        if pagamento is None:
-            return jsonify({"error": "Pagamento não encontrado"}), 404
-        return jsonify({
-            "id_pagamento": pagamento[0],
-            "id_aluno": pagamento[1],
-            "data_pagamento": pagamento[2],
-            "valor_pago": pagamento[3],
-            "forma_pagamento": pagamento[4],
-            "referencia": pagamento[5],
-            "status": pagamento[6]
-        }), 200
-    except Exception as e:
-        return jsonify({"error": str(e)}), 400
-    finally:
-        cursor.close()
-        conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            fields = get_fields('pagamento')
+            expanded, fields, _ = get_expand('pagamento', fields)
+            execute_prepared(cursor, f"SELECT {', '.join(expanded)} FROM pagamento WHERE id_pagamento = %s", (id_pagamento,))
+            pagamento = cursor.fetchone()
+            if pagamento is None:
+                return jsonify({"error": "Pagamento não encontrado"}), 404
+            return jsonify(dict(zip(fields, pagamento))), 200
+        except Exception as e:
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
 
 @pagamentos_bp.route('/pagamentos', methods=['GET'])
-@swag_from(pagamentos_docs['read_all_pagamentos'])
+@api_doc('pagamentos_docs', 'read_all_pagamentos')
+@conditional('pagamento', extra=expand_tables('pagamento'))
 def read_all_pagamentos():
-    conn = create_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("SELECT * FROM pagamento ORDER BY data_pagamento")
-        pagamentos = cursor.fetchall()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            fields = get_fields('pagamento')
+            expanded, fields, _ = get_expand('pagamento', fields)
+            ids = get_ids()
+            if ids is not None:
+                pagamentos, missing = fetch_by_ids(cursor, 'pagamento', 'id_pagamento', expanded, ids, fields)
+                return jsonify(pagamentos), 200, missing_headers(missing)
+            limit, after = get_page_args(2)
+            conditions, filter_params = get_filters(PAGAMENTO_FILTERS)
+            where, params = keyset_where(('data_pagamento', 'id_pagamento'), after, conditions, filter_params)
+            columns, key = select_list(expanded, ('data_pagamento', 'id_pagamento'))
+            cursor.execute(
+                f"SELECT {columns} FROM pagamento {where} ORDER BY data_pagamento, id_pagamento LIMIT %s",
+                params + (limit + 1,)
+            )
+            pagamentos, next_cursor = split_page(cursor.fetchall(), limit, key)
         
-        result = []
-        for pagamento in pagamentos:
-            result.append({
-                "id_pagamento": pagamento[0],
-                "id_aluno": pagamento[1],
-                "data_pagamento": pagamento[2],
-                "valor_pago": pagamento[3],
-                "forma_pagamento": pagamento[4],
-                "referencia": pagamento[5],
-                "status": pagamento[6]
-            })
+            result = rows_to_dicts(fields, pagamentos)
         
-        return jsonify(result), 200
-    except Exception as e:
-        return jsonify({"error": str(e)}), 400
-    finally:
-        cursor.close()
-        conn.close()
+            return jsonify(result), 200, page_headers(next_cursor)
+        except Exception as e:
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
 
 @pagamentos_bp.route('/pagamentos/<int:id_pagamento>', methods=['PUT'])
-@swag_from(pagamentos_docs['update_pagamento'])
+@api_doc('pagamentos_docs', 'update_pagamento')
 def update_pagamento(id_pagamento):
     data = request.get_json()
-    conn = create_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(
-            """
-            UPDATE pagamento
-            SET id_aluno = %s, data_pagamento = %s, valor_pago = %s, forma_pagamento = %s, referencia = %s, status = %s
-            WHERE id_pagamento = %s
-            """,
-            (data['id_aluno'], data['data_pagamento'], data['valor_pago'], 
-             data.get('forma_pagamento'), data.get('referencia'), data.get('status'), id_pagamento)
-        )
-        conn.commit()
-        if cursor.rowcount == 0:
-            return jsonify({"error": "Pagamento não encontrado"}), 404
-        return jsonify({"message": "Pagamento atualizado com sucesso"}), 200
-    except Exception as e:
-        conn.rollback()
-        return jsonify({"error": str(e)}), 400
-    finally:
-        cursor.close()
-        conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            execute_prepared(
+                cursor,
+                """
+                UPDATE pagamento
+                SET id_aluno = %s, data_pagamento = %s, valor_pago = %s, forma_pagamento = %s, referencia = %s, status = %s
+                WHERE id_pagamento = %s
+                """,
+                (data['id_aluno'], data['data_pagamento'], data['valor_pago'], 
+                 data.get('forma_pagamento'), data.get('referencia'), data.get('status'), id_pagamento)
+            )
+            conn.commit()
+            request_refresh('pagamento')
+            if cursor.rowcount == 0:
+                return jsonify({"error": "Pagamento não encontrado"}), 404
+            return jsonify({"message": "Pagamento atualizado com sucesso"}), 200
+        except Exception as e:
+            conn.rollback()
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
 
 @pagamentos_bp.route('/pagamentos/<int:id_pagamento>', methods=['DELETE'])
-@swag_from(pagamentos_docs['delete_pagamento'])
+@api_doc('pagamentos_docs', 'delete_pagamento')
 def delete_pagamento(id_pagamento):
-    conn = create_connection()
-    cursor = conn.cursor()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            execute_prepared(cursor, "DELETE FROM pagamento WHERE id_pagamento = %s", (id_pagamento,))
+            conn.commit()
+            request_refresh('pagamento')
+            if cursor.rowcount == 0:
+                return jsonify({"error": "Pagamento não encontrado"}), 404
+            return jsonify({"message": "Pagamento deletado com sucesso"}), 200
+        except Exception as e:
+            conn.rollback()
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
+
+def _parse_mes(value, param):
+    try:
+        return datetime.datetime.strptime(value, '%Y-%m').date()
+    except ValueError:
+        raise ValueError(f"Parâmetro '{param}' deve estar no formato AAAA-MM")
+
+@pagamentos_bp.route('/pagamentos/resumo', methods=['GET'])
+@api_doc('pagamentos_docs', 'read_resumo_pagamentos')
+@conditional('pagamento_resumo_mensal')
+def read_resumo_pagamentos():
+    start_refresher()
+    conditions, params = [], []
+    try:
+        if request.args.get('de'):
+            conditions.append("mes >= %s")
+            params.append(_parse_mes(request.args['de'], 'de'))
+        if request.args.get('ate'):
+            conditions.append("mes <= %s")
+            params.append(_parse_mes(request.args['ate'], 'ate'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                f"""
+                SELECT mes, forma_pagamento, status, quantidade, total
+                FROM pagamento_resumo_mensal {where}
+                ORDER BY mes, forma_pagamento, status
+                """,
+                params
+            )
+            resumo = rows_to_dicts(('mes', 'forma_pagamento', 'status', 'quantidade', 'total'), cursor.fetchall())
+            return jsonify(resumo), 200
+        except Exception as e:
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
+
+def _mes_inadimplentes():
+    # Padrão: mês corrente
+    return _parse_mes(request.args['mes'], 'mes') if request.args.get('mes') else datetime.date.today().replace(day=1)
+
+def _vary_mes():
+    # O mês padrão vem da data de hoje, que não está na URL
+    try:
+        mes = _mes_inadimplentes()
+    except ValueError:
+        return '', None
+    since = None if request.args.get('mes') else datetime.datetime.combine(mes, datetime.time.min).astimezone()
+    return str(mes), since
+
+@pagamentos_bp.route('/pagamentos/inadimplentes', methods=['GET'])
+@api_doc('pagamentos_docs', 'read_inadimplentes')
+@conditional('pagamento_meses_pagos', 'aluno', vary=_vary_mes)
+def read_inadimplentes():
+    start_refresher()
     try:
-        cursor.execute("DELETE FROM pagamento WHERE id_pagamento = %s", (id_pagamento,))
-        conn.commit()
-        if cursor.rowcount == 0:
-            return jsonify({"error": "Pagamento não encontrado"}), 404
-        return jsonify({"message": "Pagamento deletado com sucesso"}), 200
-    except Exception as e:
-        conn.rollback()
+        mes = _mes_inadimplentes()
+    except ValueError as e:
         return jsonify({"error": str(e)}), 400
-    finally:
-        cursor.close()
-        conn.close() 
\ No newline at end of file
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                """
+                SELECT a.id_aluno, a.nome_completo, a.id_turma,
+                       (SELECT max(m.mes) FROM pagamento_meses_pagos m WHERE m.id_aluno = a.id_aluno)
+                FROM aluno a
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM pagamento_meses_pagos m WHERE m.id_aluno = a.id_aluno AND m.mes = %s
+                )
+                ORDER BY a.nome_completo, a.id_aluno
+                """,
+                (mes,)
+            )
+            inadimplentes = rows_to_dicts(('id_aluno', 'nome_completo', 'id_turma', 'ultimo_mes_pago'), cursor.fetchall())
+            return jsonify({"mes": mes, "alunos": inadimplentes}), 200
+        except Exception as e:
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
@@ -1,120 +1,192 @@
 from flask import Blueprint, request, jsonify
-from app.Util.bd import create_connection
-from flasgger import swag_from
-from app.swagger import presencas_docs
+from psycopg2.extras import execute_values
+import datetime
+from app.Util.bd import get_connection
+from app.Util.statements import execute_prepared
+from app.Util.json_provider import rows_to_dicts
+from app.Util.fields import get_fields, select_list
+from app.Util.filters import get_filters, parse_bool, parse_date, parse_int
+from app.Util.etag import conditional
+from app.Util.pagination import get_page_args, keyset_where, split_page, page_headers
+from app.Util.openapi import api_doc
 
 presencas_bp = Blueprint('presencas', __name__)
 
+# Filtros aceitos por GET /presencas: (parâmetro, coluna, operador, tipo)
+PRESENCA_FILTERS = (
+    ('id_aluno', 'id_aluno', '=', parse_int),
+    ('data_de', 'data_presenca', '>=', parse_date),
+    ('data_ate', 'data_presenca', '<=', parse_date),
+    ('presente', 'presente', '=', parse_bool),
+)
+
 @presencas_bp.route('/presencas', methods=['POST'])
-@swag_from(presencas_docs['create_presenca'])
+@api_doc('presencas_docs', 'create_presenca')
 def create_presenca():
     data = request.get_json()
-    conn = create_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(
-            """
-            INSERT INTO presenca (id_aluno, data_presenca, presente)
-            VALUES (%s, %s, %s)
-            """,
-            (data['id_aluno'], data['data_presenca'], data['presente'])
-        )
-        conn.commit()
-        return jsonify({"message": "Presença criada com sucesso"}), 201
-    except Exception as e:
-        conn.rollback()
-        return jsonify({"error": str(e)}), 400
-    finally:
-        cursor.close()
-        conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            execute_prepared(
+                cursor,
+                """
+                INSERT INTO presenca (id_aluno, data_presenca, presente)
+                VALUES (%s, %s, %s)
+                """,
+                (data['id_aluno'], data['data_presenca'], data['presente'])
+            )
+            conn.commit()
+            return jsonify({"message": "Presença criada com sucesso"}), 201
+        except Exception as e:
+            conn.rollback()
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
 
 @presencas_bp.route('/presencas/<int:id_presenca>', methods=['GET'])
-@swag_from(presencas_docs['read_presenca'])
+@api_doc('presencas_docs', 'read_presenca')
+@conditional('presenca')
 def read_presenca(id_presenca):
-    conn = create_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("SELECT * FROM presenca WHERE id_presenca = %s", (id_presenca,))
-        presenca = cursor.fetchone()
-        if presenca is None:
-            return jsonify({"error": "Presença não encontrada"}), 404
-        return jsonify({
-            "id_presenca": presenca[0],
-            "id_aluno": presenca[1],
-            "data_presenca": presenca[2],
-            "presente": presenca[3]
-        }), 200
-    except Exception as e:
-        return jsonify({"error": str(e)}), 400
-    finally:
-        cursor.close()
-        conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            fields = get_fields('presenca')
+            execute_prepared(cursor, f"SELECT {', '.join(fields)} FROM presenca WHERE id_presenca = %s", (id_presenca,))
+            presenca = cursor.fetchone()
+            if presenca is None:
+                return jsonify({"error": "Presença não encontrada"}), 404
+            return jsonify(dict(zip(fields, presenca))), 200
+        except Exception as e:
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
 
 @presencas_bp.route('/presencas', methods=['GET'])
-@swag_from(presencas_docs['read_all_presencas'])
+@api_doc('presencas_docs', 'read_all_presencas')
+@conditional('presenca')
 def read_all_presencas():
-    conn = create_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("SELECT * FROM presenca ORDER BY data_presenca")
-        presencas = cursor.fetchall()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            limit, after = get_page_args(2)
+            conditions, filter_params = get_filters(PRESENCA_FILTERS)
+            where, params = keyset_where(('data_presenca', 'id_presenca'), after, conditions, filter_params)
+            fields = get_fields('presenca')
+            columns, key = select_list(fields, ('data_presenca', 'id_presenca'))
+            cursor.execute(
+                f"SELECT {columns} FROM presenca {where} ORDER BY data_presenca, id_presenca LIMIT %s",
+                params + (limit + 1,)
+            )
+            presencas, next_cursor = split_page(cursor.fetchall(), limit, key)
         
-        result = []
-        for presenca in presencas:
-            result.append({
-                "id_presenca": presenca[0],
-                "id_aluno": presenca[1],
-                "data_presenca": presenca[2],
-                "presente": presenca[3]
-            })
+            result = rows_to_dicts(fields, presencas)
         
-        return jsonify(result), 200
-    except Exception as e:
-        return jsonify({"error": str(e)}), 400
-    finally:
-        cursor.close()
-        conn.close()
+            return jsonify(result), 200, page_headers(next_cursor)
+        except Exception as e:
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
 
 @presencas_bp.route('/presencas/<int:id_presenca>', methods=['PUT'])
-@swag_from(presencas_docs['update_presenca'])
+@api_doc('presencas_docs', 'update_presenca')
 def update_presenca(id_presenca):
     data = request.get_json()
-    conn = create_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(
-            """
-            UPDATE presenca
-            SET id_aluno = %s, data_presenca = %s, presente = %s
-            WHERE id_presenca = %s
-            """,
-            (data['id_aluno'], data['data_presenca'], data['presente'], id_presenca)
-        )
-        conn.commit()
-        if cursor.rowcount == 0:
-            return jsonify({"error": "Presença não encontrada"}), 404
-        return jsonify({"message": "Presença atualizada com sucesso"}), 200
-    except Exception as e:
-        conn.rollback()
-        return jsonify({"error": str(e)}), 400
-    finally:
-        cursor.close()
-        conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            execute_prepared(
+                cursor,
+                """
+                UPDATE presenca
+                SET id_aluno = %s, data_presenca = %s, presente = %s
+                WHERE id_presenca = %s
+                """,
+                (data['id_aluno'], data['data_presenca'], data['presente'], id_presenca)
+            )
+            conn.commit()
+            if cursor.rowcount == 0:
+                return jsonify({"error": "Presença não encontrada"}), 404
+            return jsonify({"message": "Presença atualizada com sucesso"}), 200
+        except Exception as e:
+            conn.rollback()
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
 
 @presencas_bp.route('/presencas/<int:id_presenca>', methods=['DELETE'])
-@swag_from(presencas_docs['delete_presenca'])
+@api_doc('presencas_docs', 'delete_presenca')
 def delete_presenca(id_presenca):
-    conn = create_connection()
-    cursor = conn.cursor()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            execute_prepared(cursor, "DELETE FROM presenca WHERE id_presenca = %s", (id_presenca,))
+            conn.commit()
+            if cursor.rowcount == 0:
+                return jsonify({"error": "Presença não encontrada"}), 404
+            return jsonify({"message": "Presença deletada com sucesso"}), 200
+        except Exception as e:
+            conn.rollback()
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
+
+@presencas_bp.route('/turmas/<int:id_turma>/presencas', methods=['POST'])
+@api_doc('presencas_docs', 'create_presencas_turma')
+def create_presencas_turma(id_turma):
+    data = request.get_json()
     try:
-        cursor.execute("DELETE FROM presenca WHERE id_presenca = %s", (id_presenca,))
-        conn.commit()
-        if cursor.rowcount == 0:
-            return jsonify({"error": "Presença não encontrada"}), 404
-        return jsonify({"message": "Presença deletada com sucesso"}), 200
+        data_presenca = datetime.date.fromisoformat(str(data['data_presenca']))
+        presencas = data['presencas']
+        if not isinstance(presencas, list) or not presencas:
+            raise ValueError("presencas deve ser uma lista não vazia")
+    except KeyError as e:
+        return jsonify({"error": f"Campo obrigatório ausente: {e.args[0]}"}), 400
     except Exception as e:
-        conn.rollback()
         return jsonify({"error": str(e)}), 400
-    finally:
-        cursor.close()
-        conn.close() 
\ No newline at end of file
+
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT id_aluno FROM aluno WHERE id_turma = %s", (id_turma,))
+            alunos_turma = {row[0] for row in cursor.fetchall()}
+            if not alunos_turma:
+                return jsonify({"error": "Turma não encontrada ou sem alunos"}), 404
+
+            # A chamada inteira é rejeitada se algum item for inválido, para que o
+            # professor possa simplesmente reenviá-la depois de corrigir.
+            values = []
+            errors = []
+            seen = set()
+            for indice, item in enumerate(presencas):
+                id_aluno = item.get('id_aluno') if isinstance(item, dict) else None
+                presente = item.get('presente') if isinstance(item, dict) else None
+                # bool é subclasse de int: true/false não podem passar por id 1/0
+                if not isinstance(id_aluno, int) or isinstance(id_aluno, bool) or not isinstance(presente, bool):
+                    errors.append({"indice": indice, "error": "Informe id_aluno (inteiro) e presente (booleano)"})
+                elif id_aluno not in alunos_turma:
+                    errors.append({"indice": indice, "error": f"Aluno {id_aluno} não pertence à turma {id_turma}"})
+                elif id_aluno in seen:
+                    errors.append({"indice": indice, "error": f"Aluno {id_aluno} informado mais de uma vez"})
+                else:
+                    seen.add(id_aluno)
+                    values.append((id_aluno, data_presenca, presente))
+            if errors:
+                return jsonify({"error": "Chamada inválida", "erros": errors}), 400
+
+            execute_values(
+                cursor,
+                """
+                INSERT INTO presenca (id_aluno, data_presenca, presente)
+                VALUES %s
+                ON CONFLICT (id_aluno, data_presenca) DO UPDATE SET presente = EXCLUDED.presente
+                """,
+                values,
+                page_size=len(values)
+            )
+            conn.commit()
+            return jsonify({"message": "Chamada registrada com sucesso", "registradas": len(values)}), 201
+        except Exception as e:
+            conn.rollback()
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
@@ -1,120 +1,129 @@
 from flask import Blueprint, request, jsonify
-from app.Util.bd import create_connection
-from flasgger import swag_from
-from app.swagger import professores_docs
+from app.Util.bd import get_connection
+from app.Util.statements import execute_prepared
+from app.Util.json_provider import rows_to_dicts
+from app.Util.fields import get_fields, select_list
+from app.Util.multiget import fetch_by_ids, get_ids, missing_headers
+from app.Util.etag import conditional
+from app.Util.cache import cached_fetchone, cached_fetchall, invalidate
+from app.Util.pagination import get_page_args, keyset_where, split_page, page_headers
+from app.Util.openapi import api_doc
 
 professores_bp = Blueprint('professores', __name__)
 
 @professores_bp.route('/professores', methods=['POST'])
-@swag_from(professores_docs['create_professor'])
+@api_doc('professores_docs', 'create_professor')
 def create_professor():
     data = request.get_json()
-    conn = create_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(
-            """
-            INSERT INTO professor (nome_completo, email, telefone)
-            VALUES (%s, %s, %s)
-            """,
-            (data['nome_completo'], data.get('email'), data.get('telefone'))
-        )
-        conn.commit()
-        return jsonify({"message": "Professor criado com sucesso"}), 201
-    except Exception as e:
-        conn.rollback()
-        return jsonify({"error": str(e)}), 400
-    finally:
-        cursor.close()
-        conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            execute_prepared(
+                cursor,
+                """
+                INSERT INTO professor (nome_completo, email, telefone)
+                VALUES (%s, %s, %s)
+                """,
+                (data['nome_completo'], data.get('email'), data.get('telefone'))
+            )
+            conn.commit()
+            invalidate('professor')
+            return jsonify({"message": "Professor criado com sucesso"}), 201
+        except Exception as e:
+            conn.rollback()
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
 
 @professores_bp.route('/professores/<int:id_professor>', methods=['GET'])
-@swag_from(professores_docs['read_professor'])
+@api_doc('professores_docs', 'read_professor')
+@conditional('professor')
 def read_professor(id_professor):
-    conn = create_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("SELECT * FROM professor WHERE id_professor = %s", (id_professor,))
-        professor = cursor.fetchone()
-        if professor is None:
-            return jsonify({"error": "Professor não encontrado"}), 404
-        return jsonify({
-            "id_professor": professor[0],
-            "nome_completo": professor[1],
-            "email": professor[2],
-            "telefone": professor[3]
-        }), 200
-    except Exception as e:
-        return jsonify({"error": str(e)}), 400
-    finally:
-        cursor.close()
-        conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            fields = get_fields('professor')
+            professor = cached_fetchone(cursor, f"SELECT {', '.join(fields)} FROM professor WHERE id_professor = %s", (id_professor,), ('professor',))
+            if professor is None:
+                return jsonify({"error": "Professor não encontrado"}), 404
+            return jsonify(dict(zip(fields, professor))), 200
+        except Exception as e:
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
 
 @professores_bp.route('/professores', methods=['GET'])
-@swag_from(professores_docs['read_all_professores'])
+@api_doc('professores_docs', 'read_all_professores')
+@conditional('professor')
 def read_all_professores():
-    conn = create_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("SELECT * FROM professor ORDER BY nome_completo")
-        professores = cursor.fetchall()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            fields = get_fields('professor')
+            ids = get_ids()
+            if ids is not None:
+                professores, missing = fetch_by_ids(cursor, 'professor', 'id_professor', fields, ids)
+                return jsonify(professores), 200, missing_headers(missing)
+            limit, after = get_page_args(2)
+            where, params = keyset_where(('nome_completo', 'id_professor'), after)
+            columns, key = select_list(fields, ('nome_completo', 'id_professor'))
+            rows = cached_fetchall(
+                cursor,
+                f"SELECT {columns} FROM professor {where} ORDER BY nome_completo, id_professor LIMIT %s",
+                params + (limit + 1,),
+                ('professor',)
+            )
+            professores, next_cursor = split_page(rows, limit, key)
         
-        result = []
-        for professor in professores:
-            result.append({
-                "id_professor": professor[0],
-                "nome_completo": professor[1],
-                "email": professor[2],
-                "telefone": professor[3]
-            })
+            result = rows_to_dicts(fields, professores)
         
-        return jsonify(result), 200
-    except Exception as e:
-        return jsonify({"error": str(e)}), 400
-    finally:
-        cursor.close()
-        conn.close()
+            return jsonify(result), 200, page_headers(next_cursor)
+        except Exception as e:
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
 
 @professores_bp.route('/professores/<int:id_professor>', methods=['PUT'])
-@swag_from(professores_docs['update_professor'])
+@api_doc('professores_docs', 'update_professor')
 def update_professor(id_professor):
     data = request.get_json()
-    conn = create_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(
-            """
-            UPDATE professor
-            SET nome_completo = %s, email = %s, telefone = %s
-            WHERE id_professor = %s
-            """,
-            (data['nome_completo'], data.get('email'), data.get('telefone'), id_professor)
-        )
-        conn.commit()
-        if cursor.rowcount == 0:
-            return jsonify({"error": "Professor não encontrado"}), 404
-        return jsonify({"message": "Professor atualizado com sucesso"}), 200
-    except Exception as e:
-        conn.rollback()
-        return jsonify({"error": str(e)}), 400
-    finally:
-        cursor.close()
-        conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            execute_prepared(
+                cursor,
+                """
+                UPDATE professor
+                SET nome_completo = %s, email = %s, telefone = %s
+                WHERE id_professor = %s
+                """,
+                (data['nome_completo'], data.get('email'), data.get('telefone'), id_professor)
+            )
+            conn.commit()
+            invalidate('professor')
+            if cursor.rowcount == 0:
+                return jsonify({"error": "Professor não encontrado"}), 404
+            return jsonify({"message": "Professor atualizado com sucesso"}), 200
+        except Exception as e:
+            conn.rollback()
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
 
 @professores_bp.route('/professores/<int:id_professor>', methods=['DELETE'])
-@swag_from(professores_docs['delete_professor'])
+@api_doc('professores_docs', 'delete_professor')
 def delete_professor(id_professor):
-    conn = create_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("DELETE FROM professor WHERE id_professor = %s", (id_professor,))
-        conn.commit()
-        if cursor.rowcount == 0:
-            return jsonify({"error": "Professor não encontrado"}), 404
-        return jsonify({"message": "Professor deletado com sucesso"}), 200
-    except Exception as e:
-        conn.rollback()
-        return jsonify({"error": str(e)}), 400
-    finally:
-        cursor.close()
-        conn.close() 
\ No newline at end of file
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            execute_prepared(cursor, "DELETE FROM professor WHERE id_professor = %s", (id_professor,))
+            conn.commit()
+            invalidate('professor')
+            if cursor.rowcount == 0:
+                return jsonify({"error": "Professor não encontrado"}), 404
+            return jsonify({"message": "Professor deletado com sucesso"}), 200
+        except Exception as e:
+            conn.rollback()
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
@@ -1,120 +1,228 @@
 from flask import Blueprint, request, jsonify
-from app.Util.bd import create_connection
-from flasgger import swag_from
-from app.swagger import turmas_docs
+import datetime
+from app.Util.bd import get_connection
+from app.Util.statements import execute_prepared
+from app.Util.json_provider import rows_to_dicts
+from app.Util.fields import get_fields, select_list
+from app.Util.expand import expand_tables, get_expand
+from app.Util.multiget import fetch_by_ids, get_ids, missing_headers
+from app.Util.filters import parse_date
+from app.Util.etag import conditional
+from app.Util.cache import cached_fetchone, cached_fetchall, invalidate
+from app.Util.pagination import get_page_args, keyset_where, split_page, page_headers
+from app.Util.openapi import api_doc
 
 turmas_bp = Blueprint('turmas', __name__)
 
 @turmas_bp.route('/turmas', methods=['POST'])
-@swag_from(turmas_docs['create_turma'])
+@api_doc('turmas_docs', 'create_turma')
 def create_turma():
     data = request.get_json()
-    conn = create_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(
-            """
-            INSERT INTO turma (nome_turma, id_professor, horario)
-            VALUES (%s, %s, %s)
-            """,
-            (data['nome_turma'], data.get('id_professor'), data.get('horario'))
-        )
-        conn.commit()
-        return jsonify({"message": "Turma criada com sucesso"}), 201
-    except Exception as e:
-        conn.rollback()
-        return jsonify({"error": str(e)}), 400
-    finally:
-        cursor.close()
-        conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            execute_prepared(
+                cursor,
+                """
+                INSERT INTO turma (nome_turma, id_professor, horario)
+                VALUES (%s, %s, %s)
+                """,
+                (data['nome_turma'], data.get('id_professor'), data.get('horario'))
+            )
+            conn.commit()
+            invalidate('turma')
+            return jsonify({"message": "Turma criada com sucesso"}), 201
+        except Exception as e:
+            conn.rollback()
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
 
 @turmas_bp.route('/turmas/<int:id_turma>', methods=['GET'])
-@swag_from(turmas_docs['read_turma'])
+@api_doc('turmas_docs', 'read_turma')
+@conditional('turma', extra=expand_tables('turma'))
 def read_turma(id_turma):
-    conn = create_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("SELECT * FROM turma WHERE id_turma = %s", (id_turma,))
-        turma = cursor.fetchone()
-        if turma is None:
-            return jsonify({"error": "Turma não encontrada"}), 404
-        return jsonify({
-            "id_turma": turma[0],
-            "nome_turma": turma[1],
-            "id_professor": turma[2],
-            "horario": turma[3]
-        }), 200
-    except Exception as e:
-        return jsonify({"error": str(e)}), 400
-    finally:
-        cursor.close()
-        conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            fields = get_fields('turma')
+            expanded, fields, related = get_expand('turma', fields)
+            sql = f"SELECT {', '.join(expanded)} FROM turma WHERE id_turma = %s"
+            if related:
+                # As expansões leem tabelas que não invalidam o cache (ex.: aluno)
+                cursor.execute(sql, (id_turma,))
+                turma = cursor.fetchone()
+            else:
+                turma = cached_fetchone(cursor, sql, (id_turma,), ('turma',))
+            if turma is None:
+                return jsonify({"error": "Turma não encontrada"}), 404
+            return jsonify(dict(zip(fields, turma))), 200
+        except Exception as e:
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
 
 @turmas_bp.route('/turmas', methods=['GET'])
-@swag_from(turmas_docs['read_all_turmas'])
+@api_doc('turmas_docs', 'read_all_turmas')
+@conditional('turma', extra=expand_tables('turma'))
 def read_all_turmas():
-    conn = create_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("SELECT * FROM turma ORDER BY nome_turma")
-        turmas = cursor.fetchall()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            fields = get_fields('turma')
+            expanded, fields, related = get_expand('turma', fields)
+            ids = get_ids()
+            if ids is not None:
+                turmas, missing = fetch_by_ids(cursor, 'turma', 'id_turma', expanded, ids, fields)
+                return jsonify(turmas), 200, missing_headers(missing)
+            limit, after = get_page_args(2)
+            where, params = keyset_where(('nome_turma', 'id_turma'), after)
+            columns, key = select_list(expanded, ('nome_turma', 'id_turma'))
+            sql = f"SELECT {columns} FROM turma {where} ORDER BY nome_turma, id_turma LIMIT %s"
+            if related:
+                cursor.execute(sql, params + (limit + 1,))
+                rows = cursor.fetchall()
+            else:
+                rows = cached_fetchall(cursor, sql, params + (limit + 1,), ('turma',))
+            turmas, next_cursor = split_page(rows, limit, key)
         
-        result = []
-        for turma in turmas:
-            result.append({
-                "id_turma": turma[0],
-                "nome_turma": turma[1],
-                "id_professor": turma[2],
-                "horario": turma[3]
-            })
+            result = rows_to_dicts(fields, turmas)
         
-        return jsonify(result), 200
-    except Exception as e:
-        return jsonify({"error": str(e)}), 400
-    finally:
-        cursor.close()
-        conn.close()
+            return jsonify(result), 200, page_headers(next_cursor)
+        except Exception as e:
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
 
 @turmas_bp.route('/turmas/<int:id_turma>', methods=['PUT'])
-@swag_from(turmas_docs['update_turma'])
+@api_doc('turmas_docs', 'update_turma')
 def update_turma(id_turma):
     data = request.get_json()
-    conn = create_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(
-            """
-            UPDATE turma
-            SET nome_turma = %s, id_professor = %s, horario = %s
-            WHERE id_turma = %s
-            """,
-            (data['nome_turma'], data.get('id_professor'), data.get('horario'), id_turma)
-        )
-        conn.commit()
-        if cursor.rowcount == 0:
-            return jsonify({"error": "Turma não encontrada"}), 404
-        return jsonify({"message": "Turma atualizada com sucesso"}), 200
-    except Exception as e:
-        conn.rollback()
-        return jsonify({"error": str(e)}), 400
-    finally:
-        cursor.close()
-        conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            execute_prepared(
+                cursor,
+                """
+                UPDATE turma
+                SET nome_turma = %s, id_professor = %s, horario = %s
+                WHERE id_turma = %s
+                """,
+                (data['nome_turma'], data.get('id_professor'), data.get('horario'), id_turma)
+            )
+            conn.commit()
+            invalidate('turma')
+            if cursor.rowcount == 0:
+                return jsonify({"error": "Turma não encontrada"}), 404
+            return jsonify({"message": "Turma atualizada com sucesso"}), 200
+        except Exception as e:
+            conn.rollback()
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
 
 @turmas_bp.route('/turmas/<int:id_turma>', methods=['DELETE'])
-@swag_from(turmas_docs['delete_turma'])
+@api_doc('turmas_docs', 'delete_turma')
 def delete_turma(id_turma):
-    conn = create_connection()
-    cursor = conn.cursor()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            execute_prepared(cursor, "DELETE FROM turma WHERE id_turma = %s", (id_turma,))
+            conn.commit()
+            invalidate('turma')
+            if cursor.rowcount == 0:
+                return jsonify({"error": "Turma não encontrada"}), 404
+            return jsonify({"message": "Turma deletada com sucesso"}), 200
+        except Exception as e:
+            conn.rollback()
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
+
+def _periodo_frequencia():
+    # Padrão: do primeiro dia do mês corrente até hoje
+    hoje = datetime.date.today()
+    try:
+        de = parse_date(request.args['de']) if request.args.get('de') else hoje.replace(day=1)
+        ate = parse_date(request.args['ate']) if request.args.get('ate') else hoje
+    except ValueError:
+        raise ValueError("Parâmetros 'de' e 'ate' devem estar no formato AAAA-MM-DD")
+    if de > ate:
+        raise ValueError("Parâmetro 'de' deve ser anterior ou igual a 'ate'")
+    return de, ate
+
+def _vary_periodo():
+    # O período padrão vem da data de hoje, que não está na URL
+    try:
+        de, ate = _periodo_frequencia()
+    except ValueError:
+        return '', None
+    since = None if request.args.get('ate') else datetime.datetime.combine(ate, datetime.time.min).astimezone()
+    return f"{de}/{ate}", since
+
+def _proximo_mes(data):
+    return (data.replace(day=1) + datetime.timedelta(days=32)).replace(day=1)
+
+@turmas_bp.route('/turmas/<int:id_turma>/frequencia', methods=['GET'])
+@api_doc('turmas_docs', 'read_frequencia_turma')
+@conditional('turma', 'aluno', 'presenca', vary=_vary_periodo)
+def read_frequencia_turma(id_turma):
     try:
-        cursor.execute("DELETE FROM turma WHERE id_turma = %s", (id_turma,))
-        conn.commit()
-        if cursor.rowcount == 0:
-            return jsonify({"error": "Turma não encontrada"}), 404
-        return jsonify({"message": "Turma deletada com sucesso"}), 200
-    except Exception as e:
-        conn.rollback()
+        de, ate = _periodo_frequencia()
+    except ValueError as e:
         return jsonify({"error": str(e)}), 400
-    finally:
-        cursor.close()
-        conn.close() 
\ No newline at end of file
+    # Meses inteiros do período saem de frequencia_mensal; os dias dos meses
+    # incompletos das pontas são contados direto em presenca. Quando o período
+    # vai até hoje (o padrão), o mês corrente também sai do consolidado, descontadas
+    # as presenças já lançadas para depois de 'ate' (em geral nenhuma).
+    inicio_meses = de if de.day == 1 else _proximo_mes(de)
+    fim_meses = _proximo_mes(ate) if ate >= datetime.date.today() else (ate + datetime.timedelta(days=1)).replace(day=1)
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            if cached_fetchone(cursor, "SELECT 1 FROM turma WHERE id_turma = %s", (id_turma,), ('turma',)) is None:
+                return jsonify({"error": "Turma não encontrada"}), 404
+            cursor.execute(
+                """
+                SELECT a.id_aluno, a.nome_completo,
+                       COALESCE(m.presentes, 0) + d.presentes,
+                       COALESCE(m.registros, 0) + d.registros
+                FROM aluno a
+                LEFT JOIN LATERAL (
+                    SELECT sum(f.presentes) AS presentes, sum(f.registros) AS registros
+                    FROM frequencia_mensal f
+                    WHERE f.id_aluno = a.id_aluno AND f.mes >= %(inicio_meses)s AND f.mes < %(fim_meses)s
+                ) m ON true
+                CROSS JOIN LATERAL (
+                    SELECT COALESCE(sum(s.sinal) FILTER (WHERE s.presente), 0) AS presentes,
+                           COALESCE(sum(s.sinal), 0) AS registros
+                    FROM (
+                        SELECT p.presente, CASE WHEN p.data_presenca > %(ate)s THEN -1 ELSE 1 END AS sinal
+                        FROM presenca p
+                        WHERE p.id_aluno = a.id_aluno
+                          AND ((p.data_presenca >= %(de)s AND p.data_presenca < LEAST(%(inicio_meses)s, %(ate)s + 1))
+                            OR (p.data_presenca >= GREATEST(%(fim_meses)s, %(inicio_meses)s) AND p.data_presenca <= %(ate)s)
+                            OR (p.data_presenca > %(ate)s AND p.data_presenca >= %(inicio_meses)s
+                                AND p.data_presenca < %(fim_meses)s))
+                    ) s
+                ) d
+                WHERE a.id_turma = %(id_turma)s
+                ORDER BY a.nome_completo, a.id_aluno
+                """,
+                {'id_turma': id_turma, 'de': de, 'ate': ate, 'inicio_meses': inicio_meses, 'fim_meses': fim_meses}
+            )
+            alunos = []
+            for id_aluno, nome_completo, presentes, registros in cursor.fetchall():
+                alunos.append({
+                    "id_aluno": id_aluno,
+                    "nome_completo": nome_completo,
+                    "presentes": presentes,
+                    "faltas": registros - presentes,
+                    "registros": registros,
+                    "percentual": round(100.0 * presentes / registros, 2) if registros else None
+                })
+            return jsonify({"id_turma": id_turma, "de": de, "ate": ate, "alunos": alunos}), 200
+        except Exception as e:
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
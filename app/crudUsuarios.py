@@ -1,122 +1,119 @@
 from flask import Blueprint, request, jsonify
-from app.Util.bd import create_connection
-from flasgger import swag_from
-from app.swagger import usuarios_docs
+from app.Util.bd import get_connection
+from app.Util.statements import execute_prepared
+from app.Util.json_provider import rows_to_dicts
+from app.Util.fields import get_fields, select_list
+from app.Util.etag import conditional
+from app.Util.pagination import get_page_args, keyset_where, split_page, page_headers
+from app.Util.openapi import api_doc
 
 usuarios_bp = Blueprint('usuarios', __name__)
 
 @usuarios_bp.route('/usuarios', methods=['POST'])
-@swag_from(usuarios_docs['create_usuario'])
+@api_doc('usuarios_docs', 'create_usuario')
 def create_usuario():
     data = request.get_json()
-    conn = create_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(
-            """
-            INSERT INTO usuario (login, senha, nivel_acesso, id_professor)
-            VALUES (%s, %s, %s, %s)
-            """,
-            (data['login'], data['senha'], data.get('nivel_acesso'), data.get('id_professor'))
-        )
-        conn.commit()
-        return jsonify({"message": "Usuário criado com sucesso"}), 201
-    except Exception as e:
-        conn.rollback()
-        return jsonify({"error": str(e)}), 400
-    finally:
-        cursor.close()
-        conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            execute_prepared(
+                cursor,
+                """
+                INSERT INTO usuario (login, senha, nivel_acesso, id_professor)
+                VALUES (%s, %s, %s, %s)
+                """,
+                (data['login'], data['senha'], data.get('nivel_acesso'), data.get('id_professor'))
+            )
+            conn.commit()
+            return jsonify({"message": "Usuário criado com sucesso"}), 201
+        except Exception as e:
+            conn.rollback()
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
 
 @usuarios_bp.route('/usuarios/<int:id_usuario>', methods=['GET'])
-@swag_from(usuarios_docs['read_usuario'])
+@api_doc('usuarios_docs', 'read_usuario')
+@conditional('usuario')
 def read_usuario(id_usuario):
-    conn = create_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("SELECT * FROM usuario WHERE id_usuario = %s", (id_usuario,))
-        usuario = cursor.fetchone()
-        if usuario is None:
-            return jsonify({"error": "Usuário não encontrado"}), 404
-        return jsonify({
-            "id_usuario": usuario[0],
-            "login": usuario[1],
-            "senha": usuario[2],
-            "nivel_acesso": usuario[3],
-            "id_professor": usuario[4]
-        }), 200
-    except Exception as e:
-        return jsonify({"error": str(e)}), 400
-    finally:
-        cursor.close()
-        conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            fields = get_fields('usuario')
+            execute_prepared(cursor, f"SELECT {', '.join(fields)} FROM usuario WHERE id_usuario = %s", (id_usuario,))
+            usuario = cursor.fetchone()
+            if usuario is None:
+                return jsonify({"error": "Usuário não encontrado"}), 404
+            return jsonify(dict(zip(fields, usuario))), 200
+        except Exception as e:
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
 
 @usuarios_bp.route('/usuarios', methods=['GET'])
-@swag_from(usuarios_docs['read_all_usuarios'])
+@api_doc('usuarios_docs', 'read_all_usuarios')
+@conditional('usuario')
 def read_all_usuarios():
-    conn = create_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("SELECT * FROM usuario")
-        usuarios = cursor.fetchall()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            limit, after = get_page_args(1)
+            where, params = keyset_where(('id_usuario',), after)
+            fields = get_fields('usuario')
+            columns, key = select_list(fields, ('id_usuario',))
+            cursor.execute(
+                f"SELECT {columns} FROM usuario {where} ORDER BY id_usuario LIMIT %s",
+                params + (limit + 1,)
+            )
+            usuarios, next_cursor = split_page(cursor.fetchall(), limit, key)
         
-        result = []
-        for usuario in usuarios:
-            result.append({
-                "id_usuario": usuario[0],
-                "login": usuario[1],
-                "senha": usuario[2],
-                "nivel_acesso": usuario[3],
-                "id_professor": usuario[4]
-            })
+            result = rows_to_dicts(fields, usuarios)
         
-        return jsonify(result), 200
-    except Exception as e:
-        return jsonify({"error": str(e)}), 400
-    finally:
-        cursor.close()
-        conn.close()
+            return jsonify(result), 200, page_headers(next_cursor)
+        except Exception as e:
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
 
 @usuarios_bp.route('/usuarios/<int:id_usuario>', methods=['PUT'])
-@swag_from(usuarios_docs['update_usuario'])
+@api_doc('usuarios_docs', 'update_usuario')
 def update_usuario(id_usuario):
     data = request.get_json()
-    conn = create_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(
-            """
-            UPDATE usuario
-            SET login = %s, senha = %s, nivel_acesso = %s, id_professor = %s
-            WHERE id_usuario = %s
-            """,
-            (data['login'], data['senha'], data.get('nivel_acesso'), data.get('id_professor'), id_usuario)
-        )
-        conn.commit()
-        if cursor.rowcount == 0:
-            return jsonify({"error": "Usuário não encontrado"}), 404
-        return jsonify({"message": "Usuário atualizado com sucesso"}), 200
-    except Exception as e:
-        conn.rollback()
-        return jsonify({"error": str(e)}), 400
-    finally:
-        cursor.close()
-        conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            execute_prepared(
+                cursor,
+                """
+                UPDATE usuario
+                SET login = %s, senha = %s, nivel_acesso = %s, id_professor = %s
+                WHERE id_usuario = %s
+                """,
+                (data['login'], data['senha'], data.get('nivel_acesso'), data.get('id_professor'), id_usuario)
+            )
+            conn.commit()
+            if cursor.rowcount == 0:
+                return jsonify({"error": "Usuário não encontrado"}), 404
+            return jsonify({"message": "Usuário atualizado com sucesso"}), 200
+        except Exception as e:
+            conn.rollback()
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
 
 @usuarios_bp.route('/usuarios/<int:id_usuario>', methods=['DELETE'])
-@swag_from(usuarios_docs['delete_usuario'])
+@api_doc('usuarios_docs', 'delete_usuario')
 def delete_usuario(id_usuario):
-    conn = create_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("DELETE FROM usuario WHERE id_usuario = %s", (id_usuario,))
-        conn.commit()
-        if cursor.rowcount == 0:
-            return jsonify({"error": "Usuário não encontrado"}), 404
-        return jsonify({"message": "Usuário deletado com sucesso"}), 200
-    except Exception as e:
-        conn.rollback()
-        return jsonify({"error": str(e)}), 400
-    finally:
-        cursor.close()
-        conn.close() 
\ No newline at end of file
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            execute_prepared(cursor, "DELETE FROM usuario WHERE id_usuario = %s", (id_usuario,))
+            conn.commit()
+            if cursor.rowcount == 0:
+                return jsonify({"error": "Usuário não encontrado"}), 404
+            return jsonify({"message": "Usuário deletado com sucesso"}), 200
+        except Exception as e:
+            conn.rollback()
+            return jsonify({"error": str(e)}), 400
+        finally:
+            cursor.close()
@@ -0,0 +1,11 @@
+-- Índices de paginação por cursor e dos filtros das listagens, já presentes em
+-- init.sql, para bancos criados antes deles
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_professor_nome_id ON professor (nome_completo, id_professor);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_turma_nome_id ON turma (nome_turma, id_turma);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_aluno_nome_id ON aluno (nome_completo, id_aluno);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_pagamento_data_id ON pagamento (data_pagamento, id_pagamento);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_presenca_data_id ON presenca (data_presenca, id_presenca);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_atividade_data_id ON atividade (data_realizacao, id_atividade);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_aluno_turma_nome_id ON aluno (id_turma, nome_completo, id_aluno);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_pagamento_aluno_data_id ON pagamento (id_aluno, data_pagamento, id_pagamento);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_pagamento_status_data_id ON pagamento (status, data_pagamento, id_pagamento);
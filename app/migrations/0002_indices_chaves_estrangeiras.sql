@@ -0,0 +1,33 @@
+-- Índices das chaves estrangeiras: evitam leitura sequencial da tabela filha nos
+-- JOINs e na verificação da FK ao excluir o registro pai (DELETE /turmas, /alunos, /professores).
+-- aluno.id_turma e pagamento.id_aluno já são o início de idx_aluno_turma_nome_id e
+-- idx_pagamento_aluno_data_id (0001).
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_turma_professor ON turma (id_professor);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_atividade_aluno_aluno ON atividade_aluno (id_aluno);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_usuario_professor ON usuario (id_professor);
+
+-- presenca.id_aluno: mesmo nome do índice da restrição uq_presenca_aluno_data de init.sql,
+-- que atende a FK, o filtro por aluno e período e o ON CONFLICT da chamada da turma.
+-- Com presenças repetidas o índice único falharia e ficaria inválido, sendo recriado
+-- a cada execução; a verificação abaixo para antes, listando as repetições.
+DO $$
+DECLARE
+    repetidas TEXT;
+BEGIN
+    SELECT string_agg(format('aluno %s em %s (%s registros)', id_aluno, data_presenca, total), '; ')
+    INTO repetidas
+    FROM (
+        SELECT id_aluno, data_presenca, count(*) AS total
+        FROM presenca
+        GROUP BY id_aluno, data_presenca
+        HAVING count(*) > 1
+        ORDER BY id_aluno, data_presenca
+        LIMIT 50
+    ) d;
+    IF repetidas IS NOT NULL THEN
+        RAISE EXCEPTION 'presenca tem registros repetidos por (id_aluno, data_presenca); remova-os antes de aplicar esta migração: %', repetidas;
+    END IF;
+END;
+$$;
+
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_presenca_aluno_data ON presenca (id_aluno, data_presenca);
@@ -0,0 +1,48 @@
+-- Consolidado mensal de presenças (GET /turmas/<id>/frequencia). A carga inicial e
+-- a criação do trigger ficam na mesma transação, com presenca bloqueada para escrita,
+-- para que nenhuma presença seja contada duas vezes ou perdida.
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS frequencia_mensal (
+    id_aluno INT NOT NULL REFERENCES aluno(id_aluno) ON DELETE CASCADE,
+    mes DATE NOT NULL,
+    presentes INT NOT NULL DEFAULT 0,
+    registros INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (id_aluno, mes)
+);
+
+CREATE OR REPLACE FUNCTION atualizar_frequencia_mensal() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.id_aluno IS NOT NULL THEN
+        UPDATE frequencia_mensal
+        SET presentes = presentes - (CASE WHEN OLD.presente THEN 1 ELSE 0 END),
+            registros = registros - 1
+        WHERE id_aluno = OLD.id_aluno AND mes = date_trunc('month', OLD.data_presenca)::date;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.id_aluno IS NOT NULL THEN
+        INSERT INTO frequencia_mensal (id_aluno, mes, presentes, registros)
+        VALUES (NEW.id_aluno, date_trunc('month', NEW.data_presenca)::date, CASE WHEN NEW.presente THEN 1 ELSE 0 END, 1)
+        ON CONFLICT (id_aluno, mes) DO UPDATE
+        SET presentes = frequencia_mensal.presentes + EXCLUDED.presentes,
+            registros = frequencia_mensal.registros + 1;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+LOCK TABLE presenca IN SHARE MODE;
+
+DROP TRIGGER IF EXISTS trg_presenca_frequencia ON presenca;
+
+DELETE FROM frequencia_mensal;
+
+INSERT INTO frequencia_mensal (id_aluno, mes, presentes, registros)
+SELECT id_aluno, date_trunc('month', data_presenca)::date, count(*) FILTER (WHERE presente), count(*)
+FROM presenca
+WHERE id_aluno IS NOT NULL
+GROUP BY 1, 2;
+
+CREATE TRIGGER trg_presenca_frequencia AFTER INSERT OR UPDATE OR DELETE ON presenca
+    FOR EACH ROW EXECUTE FUNCTION atualizar_frequencia_mensal();
+
+COMMIT;
@@ -0,0 +1,22 @@
+-- Visões materializadas dos relatórios de pagamentos (GET /pagamentos/resumo e
+-- /pagamentos/inadimplentes). table_version recebe o contador de cada visão a cada refresh.
+CREATE TABLE IF NOT EXISTS table_version (
+    table_name VARCHAR(63) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    modified_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS pagamento_resumo_mensal AS
+SELECT date_trunc('month', data_pagamento)::date AS mes, forma_pagamento, status,
+       count(*) AS quantidade, sum(valor_pago) AS total
+FROM pagamento
+GROUP BY 1, 2, 3;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_pagamento_resumo_mensal ON pagamento_resumo_mensal (mes, forma_pagamento, status);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS pagamento_meses_pagos AS
+SELECT DISTINCT id_aluno, date_trunc('month', data_pagamento)::date AS mes
+FROM pagamento
+WHERE id_aluno IS NOT NULL AND lower(status) = 'pago';
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_pagamento_meses_pagos ON pagamento_meses_pagos (id_aluno, mes);
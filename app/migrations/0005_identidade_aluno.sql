@@ -0,0 +1,20 @@
+-- id_aluno passa a ser gerado pelo banco quando omitido (POST /alunos e as linhas sem id
+-- de POST /alunos/bulk). A sequência começa depois do maior id já gravado.
+BEGIN;
+
+LOCK TABLE aluno IN SHARE ROW EXCLUSIVE MODE;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_attribute
+        WHERE attrelid = 'aluno'::regclass AND attname = 'id_aluno' AND attidentity <> ''
+    ) THEN
+        ALTER TABLE aluno ALTER COLUMN id_aluno ADD GENERATED BY DEFAULT AS IDENTITY;
+    END IF;
+END;
+$$;
+
+SELECT setval(pg_get_serial_sequence('aluno', 'id_aluno'), coalesce((SELECT max(id_aluno) FROM aluno), 0) + 1, false);
+
+COMMIT;
@@ -0,0 +1,20 @@
+-- id_presenca passa a ser gerado pelo banco quando omitido (POST /presencas e a chamada
+-- da turma não o informam). A sequência começa depois do maior id já gravado.
+BEGIN;
+
+LOCK TABLE presenca IN SHARE ROW EXCLUSIVE MODE;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_attribute
+        WHERE attrelid = 'presenca'::regclass AND attname = 'id_presenca' AND attidentity <> ''
+    ) THEN
+        ALTER TABLE presenca ALTER COLUMN id_presenca ADD GENERATED BY DEFAULT AS IDENTITY;
+    END IF;
+END;
+$$;
+
+SELECT setval(pg_get_serial_sequence('presenca', 'id_presenca'), coalesce((SELECT max(id_presenca) FROM presenca), 0) + 1, false);
+
+COMMIT;
@@ -0,0 +1,54 @@
+-- Contador de alterações por tabela, usado como validador (ETag/Last-Modified) pela API
+-- (app/Util/etag.py). Mesmo esquema de init.sql; função e triggers na mesma transação
+-- para que nenhuma tabela fique sem contador.
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS table_version (
+    table_name VARCHAR(63) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    modified_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO table_version (table_name, version, modified_at)
+    VALUES (TG_TABLE_NAME, 1, now())
+    ON CONFLICT (table_name) DO UPDATE
+    SET version = table_version.version + 1, modified_at = now();
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_professor_version ON professor;
+CREATE TRIGGER trg_professor_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON professor
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+
+DROP TRIGGER IF EXISTS trg_turma_version ON turma;
+CREATE TRIGGER trg_turma_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON turma
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+
+DROP TRIGGER IF EXISTS trg_aluno_version ON aluno;
+CREATE TRIGGER trg_aluno_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON aluno
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+
+DROP TRIGGER IF EXISTS trg_pagamento_version ON pagamento;
+CREATE TRIGGER trg_pagamento_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON pagamento
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+
+DROP TRIGGER IF EXISTS trg_presenca_version ON presenca;
+CREATE TRIGGER trg_presenca_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON presenca
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+
+DROP TRIGGER IF EXISTS trg_atividade_version ON atividade;
+CREATE TRIGGER trg_atividade_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON atividade
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+
+DROP TRIGGER IF EXISTS trg_atividade_aluno_version ON atividade_aluno;
+CREATE TRIGGER trg_atividade_aluno_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON atividade_aluno
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+
+DROP TRIGGER IF EXISTS trg_usuario_version ON usuario;
+CREATE TRIGGER trg_usuario_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON usuario
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+
+COMMIT;
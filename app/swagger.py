@@ -1,43 +1,143 @@
-from flasgger import Swagger
+# Documentação OpenAPI de cada rota, aplicada pelo api_doc de app/Util/openapi.py.
+# Só é importado quando a spec é gerada no processo (ver init_docs).
 
-def init_swagger(app):
-    """
-    Initialize Swagger for the Flask app
-    """
-    swagger_config = {
-        "headers": [],
-        "specs": [
-            {
-                "endpoint": 'apispec_1',
-                "route": '/apispec_1.json',
-                "rule_filter": lambda rule: True,
-                "model_filter": lambda tag: True,
-            }
-        ],
-        "static_url_path": "/flasgger_static",
-        "swagger_ui": True,
-        "specs_route": "/apidocs/"
+# Parâmetros de paginação por cursor (keyset) compartilhados pelas listagens
+pagination_params = [
+    {
+        'name': 'limit',
+        'in': 'query',
+        'required': False,
+        'type': 'integer',
+        'default': 100,
+        'description': 'Quantidade máxima de registros por página (1 a 1000)'
+    },
+    {
+        'name': 'after',
+        'in': 'query',
+        'required': False,
+        'type': 'string',
+        'description': 'Cursor opaco retornado em X-Next-Cursor pela página anterior'
     }
-    
-    swagger_template = {
-        "swagger": "2.0",
-        "info": {
-            "title": "API de Gestão Escolar",
-            "version": "1.0.0",
-            "description": "API para gestão de alunos, categorias e detalhes de pedidos",
-            "termsOfService": "",
-            "contact": {
-                "email": "contato@escola.com"
-            },
-            "license": {
-                "name": "MIT",
-                "url": "https://opensource.org/licenses/MIT"
-            }
-        }
+]
+
+pagination_headers = {
+    'X-Next-Cursor': {'type': 'string', 'description': 'Cursor da próxima página (ausente na última página)'},
+    'Link': {'type': 'string', 'description': 'URL da próxima página com rel="next"'}
+}
+
+fields_param = {
+    'name': 'fields',
+    'in': 'query',
+    'required': False,
+    'type': 'string',
+    'description': 'Colunas a retornar, separadas por vírgula (ex.: id_aluno,nome_completo). Padrão: todas'
+}
+
+# Busca de vários registros por id (?ids=), ver app/Util/multiget.py
+ids_param = {
+    'name': 'ids',
+    'in': 'query',
+    'required': False,
+    'type': 'string',
+    'description': 'IDs separados por vírgula (ex.: 1,2,3; máximo configurável, padrão 200). '
+                   'Retorna os registros na ordem pedida em uma única consulta, ignorando a paginação e os filtros'
+}
+
+multiget_headers = {
+    'X-Missing-Ids': {'type': 'string', 'description': 'IDs pedidos em ?ids= que não foram encontrados'}
+}
+
+# Relações resolvidas por ?expand= (ver RELATIONS em app/Util/expand.py)
+def _expand_param(relations):
+    return {
+        'name': 'expand',
+        'in': 'query',
+        'required': False,
+        'type': 'string',
+        'description': 'Relações incluídas na resposta, na mesma consulta, separadas por vírgula e aninhadas '
+                       f'com ponto (até expand_max_depth níveis, padrão 2): {relations}'
+    }
+
+turma_expand_param = _expand_param('professor, alunos (ex.: professor,alunos.pagamentos)')
+aluno_expand_param = _expand_param('turma, pagamentos (ex.: turma.professor,pagamentos)')
+pagamento_expand_param = _expand_param('aluno (ex.: aluno.turma)')
+
+# Filtros das listagens (ver *_FILTERS nos blueprints)
+aluno_filter_params = [
+    {
+        'name': 'id_turma',
+        'in': 'query',
+        'required': False,
+        'type': 'integer',
+        'description': 'Somente alunos da turma'
+    }
+]
+
+pagamento_filter_params = [
+    {
+        'name': 'id_aluno',
+        'in': 'query',
+        'required': False,
+        'type': 'integer',
+        'description': 'Somente pagamentos do aluno'
+    },
+    {
+        'name': 'status',
+        'in': 'query',
+        'required': False,
+        'type': 'string',
+        'description': 'Status do pagamento'
+    },
+    {
+        'name': 'de',
+        'in': 'query',
+        'required': False,
+        'type': 'string',
+        'format': 'date',
+        'description': 'Data de pagamento inicial (inclusive)'
+    },
+    {
+        'name': 'ate',
+        'in': 'query',
+        'required': False,
+        'type': 'string',
+        'format': 'date',
+        'description': 'Data de pagamento final (inclusive)'
+    }
+]
+
+presenca_filter_params = [
+    {
+        'name': 'id_aluno',
+        'in': 'query',
+        'required': False,
+        'type': 'integer',
+        'description': 'Somente presenças do aluno'
+    },
+    {
+        'name': 'data_de',
+        'in': 'query',
+        'required': False,
+        'type': 'string',
+        'format': 'date',
+        'description': 'Data inicial (inclusive)'
+    },
+    {
+        'name': 'data_ate',
+        'in': 'query',
+        'required': False,
+        'type': 'string',
+        'format': 'date',
+        'description': 'Data final (inclusive)'
+    },
+    {
+        'name': 'presente',
+        'in': 'query',
+        'required': False,
+        'type': 'boolean',
+        'description': 'true para presenças, false para faltas'
     }
-    
-    swagger = Swagger(app, config=swagger_config, template=swagger_template)
-    return swagger
+]
 
 # Documentação para CRUD Alunos
 alunos_docs = {
@@ -96,7 +196,7 @@ alunos_docs = {
             'required': True,
             'type': 'integer',
             'description': 'ID do aluno'
-        }],
+        }, fields_param, aluno_expand_param],
         'responses': {
             200: {
                 'description': 'Dados do aluno',
@@ -123,12 +223,53 @@ alunos_docs = {
             404: {'description': 'Aluno não encontrado'}
         }
     },
+    'read_dossie_aluno': {
+        'tags': ['Alunos'],
+        'description': 'Documento completo do aluno (dados, turma e professor, pagamentos, presenças e '
+                       'atividades, do mais recente para o mais antigo, e um resumo), montado em uma única consulta.',
+        'parameters': [{
+            'name': 'id_aluno',
+            'in': 'path',
+            'required': True,
+            'type': 'integer',
+            'description': 'ID do aluno'
+        }],
+        'responses': {
+            200: {
+                'description': 'Dossiê do aluno',
+                'schema': {
+                    'type': 'object',
+                    'properties': {
+                        'aluno': {'type': 'object'},
+                        'turma': {'type': 'object', 'description': 'Turma com o professor (null sem turma)'},
+                        'resumo': {
+                            'type': 'object',
+                            'properties': {
+                                'pagamentos': {'type': 'integer'},
+                                'total_pago': {'type': 'string', 'description': 'Soma dos pagamentos com status pago'},
+                                'presencas': {'type': 'integer'},
+                                'faltas': {'type': 'integer'},
+                                'percentual_presenca': {'type': 'number'},
+                                'atividades': {'type': 'integer'}
+                            }
+                        },
+                        'pagamentos': {'type': 'array', 'items': {'type': 'object'}},
+                        'presencas': {'type': 'array', 'items': {'type': 'object'}},
+                        'atividades': {'type': 'array', 'items': {'type': 'object'}}
+                    }
+                }
+            },
+            404: {'description': 'Aluno não encontrado'}
+        }
+    },
     'read_all_alunos': {
         'tags': ['Alunos'],
         'description': 'Lista todos os alunos cadastrados.',
+        'parameters': pagination_params + aluno_filter_params + [ids_param, fields_param, aluno_expand_param],
         'responses': {
             200: {
                 'description': 'Lista de alunos',
+                'headers': {**pagination_headers, **multiget_headers},
                 'schema': {
                     'type': 'array',
                     'items': {
@@ -210,6 +351,46 @@ alunos_docs = {
             200: {'description': 'Aluno deletado com sucesso'},
             404: {'description': 'Aluno não encontrado'}
         }
+    },
+    'bulk_create_alunos': {
+        'tags': ['Alunos'],
+        'description': 'Importa alunos em lote via COPY. Aceita um array JSON ou um CSV (Content-Type: text/csv) '
+                       'com cabeçalho. Registros com id_aluno existente são atualizados; os inválidos são '
+                       'reportados por linha sem impedir a importação dos demais.',
+        'consumes': ['application/json', 'text/csv'],
+        'parameters': [{
+            'name': 'body',
+            'in': 'body',
+            'required': True,
+            'schema': {
+                'type': 'array',
+                'items': {
+                    'type': 'object',
+                    'properties': {
+                        'id_aluno': {'type': 'integer'},
+                        'nome_completo': {'type': 'string'},
+                        'data_nascimento': {'type': 'string', 'format': 'date'},
+                        'id_turma': {'type': 'integer'},
+                        'nome_responsavel': {'type': 'string'},
+                        'telefone_responsavel': {'type': 'string'},
+                        'email_responsavel': {'type': 'string'},
+                        'informacoes_adicionais': {'type': 'string'},
+                        'endereco': {'type': 'string'},
+                        'cidade': {'type': 'string'},
+                        'estado': {'type': 'string'},
+                        'cep': {'type': 'string'},
+                        'pais': {'type': 'string'},
+                        'telefone': {'type': 'string'}
+                    },
+                    'required': ['nome_completo', 'data_nascimento']
+                }
+            }
+        }],
+        'responses': {
+            201: {'description': 'Todos os alunos importados'},
+            207: {'description': 'Importação parcial; veja o campo erros'},
+            400: {'description': 'Nenhum aluno importado ou erro na requisição'}
+        }
     }
 }
 
@@ -247,13 +428,25 @@ categories_docs = {
     'read_category': {
         'tags': ['Categorias'],
         'description': 'Busca uma categoria pelo ID.',
-        'parameters': [{
-            'name': 'category_id',
-            'in': 'path',
-            'required': True,
-            'type': 'integer',
-            'description': 'ID da categoria'
-        }],
+        'parameters': [
+            {
+                'name': 'category_id',
+                'in': 'path',
+                'required': True,
+                'type': 'integer',
+                'description': 'ID da categoria'
+            },
+            {
+                'name': 'picture',
+                'in': 'query',
+                'required': False,
+                'type': 'string',
+                'enum': ['base64', 'url', 'none'],
+                'default': 'base64',
+                'description': 'Imagem embutida em base64, link para /categories/{id}/picture (picture_url) ou omitida'
+            },
+            fields_param
+        ],
         'responses': {
             200: {
                 'description': 'Dados da categoria',
@@ -263,13 +456,32 @@ categories_docs = {
                         'category_id': {'type': 'integer'},
                         'category_name': {'type': 'string'},
                         'description': {'type': 'string'},
-                        'picture': {'type': 'string'}
+                        'picture': {'type': 'string'},
+                        'picture_url': {'type': 'string'}
                     }
                 }
             },
             404: {'description': 'Categoria não encontrada'}
         }
     },
+    'read_category_picture': {
+        'tags': ['Categorias'],
+        'description': 'Retorna a imagem da categoria em binário, com suporte a Range e ETag.',
+        'produces': ['image/bmp', 'image/png', 'image/jpeg', 'image/gif', 'application/octet-stream'],
+        'parameters': [{
+            'name': 'category_id',
+            'in': 'path',
+            'required': True,
+            'type': 'integer',
+            'description': 'ID da categoria'
+        }],
+        'responses': {
+            200: {'description': 'Imagem da categoria'},
+            206: {'description': 'Parte da imagem solicitada via Range'},
+            304: {'description': 'Imagem não modificada (If-None-Match)'},
+            404: {'description': 'Categoria não encontrada ou sem imagem'}
+        }
+    },
     'update_category': {
         'tags': ['Categorias'],
         'description': 'Atualiza os dados de uma categoria.',
@@ -368,7 +580,8 @@ order_details_docs = {
                 'required': True,
                 'type': 'integer',
                 'description': 'ID do produto'
-            }
+            },
+            fields_param
         ],
         'responses': {
             200: {
@@ -396,7 +609,7 @@ order_details_docs = {
             'required': True,
             'type': 'integer',
             'description': 'ID do pedido'
-        }],
+        }, fields_param],
         'responses': {
             200: {
                 'description': 'Lista de detalhes do pedido',
@@ -519,7 +732,7 @@ turmas_docs = {
             'required': True,
             'type': 'integer',
             'description': 'ID da turma'
-        }],
+        }, fields_param, turma_expand_param],
         'responses': {
             200: {'description': 'Dados da turma'},
             404: {'description': 'Turma não encontrada'}
@@ -528,8 +741,9 @@ turmas_docs = {
     'read_all_turmas': {
         'tags': ['Turmas'],
         'description': 'Lista todas as turmas.',
+        'parameters': pagination_params + [ids_param, fields_param, turma_expand_param],
         'responses': {
-            200: {'description': 'Lista de turmas'}
+            200: {'description': 'Lista de turmas', 'headers': {**pagination_headers, **multiget_headers}}
         }
     },
     'update_turma': {
@@ -578,6 +792,64 @@ turmas_docs = {
             200: {'description': 'Turma deletada com sucesso'},
             404: {'description': 'Turma não encontrada'}
         }
+    },
+    'read_frequencia_turma': {
+        'tags': ['Turmas'],
+        'description': 'Frequência de cada aluno da turma no período, calculada a partir do consolidado mensal de presenças.',
+        'parameters': [
+            {
+                'name': 'id_turma',
+                'in': 'path',
+                'required': True,
+                'type': 'integer',
+                'description': 'ID da turma'
+            },
+            {
+                'name': 'de',
+                'in': 'query',
+                'required': False,
+                'type': 'string',
+                'format': 'date',
+                'description': 'Data inicial (inclusive). Padrão: primeiro dia do mês corrente'
+            },
+            {
+                'name': 'ate',
+                'in': 'query',
+                'required': False,
+                'type': 'string',
+                'format': 'date',
+                'description': 'Data final (inclusive). Padrão: hoje'
+            }
+        ],
+        'responses': {
+            200: {
+                'description': 'Frequência por aluno',
+                'schema': {
+                    'type': 'object',
+                    'properties': {
+                        'id_turma': {'type': 'integer'},
+                        'de': {'type': 'string', 'format': 'date'},
+                        'ate': {'type': 'string', 'format': 'date'},
+                        'alunos': {
+                            'type': 'array',
+                            'items': {
+                                'type': 'object',
+                                'properties': {
+                                    'id_aluno': {'type': 'integer'},
+                                    'nome_completo': {'type': 'string'},
+                                    'presentes': {'type': 'integer'},
+                                    'faltas': {'type': 'integer'},
+                                    'registros': {'type': 'integer'},
+                                    'percentual': {'type': 'number'}
+                                }
+                            }
+                        }
+                    }
+                }
+            },
+            400: {'description': 'Período inválido'},
+            404: {'description': 'Turma não encontrada'}
+        }
     }
 }
 
@@ -619,7 +891,7 @@ professores_docs = {
             'required': True,
             'type': 'integer',
             'description': 'ID do professor'
-        }],
+        }, fields_param],
         'responses': {
             200: {'description': 'Dados do professor'},
             404: {'description': 'Professor não encontrado'}
@@ -628,8 +900,9 @@ professores_docs = {
     'read_all_professores': {
         'tags': ['Professores'],
         'description': 'Lista todos os professores.',
+        'parameters': pagination_params + [ids_param, fields_param],
         'responses': {
-            200: {'description': 'Lista de professores'}
+            200: {'description': 'Lista de professores', 'headers': {**pagination_headers, **multiget_headers}}
         }
     },
     'update_professor': {
@@ -725,7 +998,7 @@ pagamentos_docs = {
             'required': True,
             'type': 'integer',
             'description': 'ID do pagamento'
-        }],
+        }, fields_param, pagamento_expand_param],
         'responses': {
             200: {'description': 'Dados do pagamento'},
             404: {'description': 'Pagamento não encontrado'}
@@ -734,8 +1007,9 @@ pagamentos_docs = {
     'read_all_pagamentos': {
         'tags': ['Pagamentos'],
         'description': 'Lista todos os pagamentos.',
+        'parameters': pagination_params + pagamento_filter_params + [ids_param, fields_param, pagamento_expand_param],
         'responses': {
-            200: {'description': 'Lista de pagamentos'}
+            200: {'description': 'Lista de pagamentos', 'headers': {**pagination_headers, **multiget_headers}}
         }
     },
     'update_pagamento': {
@@ -787,6 +1061,80 @@ pagamentos_docs = {
             200: {'description': 'Pagamento deletado com sucesso'},
             404: {'description': 'Pagamento não encontrado'}
         }
+    },
+    'read_resumo_pagamentos': {
+        'tags': ['Pagamentos'],
+        'description': 'Totais de pagamentos por mês, forma de pagamento e status (visão materializada, atualizada após escritas e periodicamente).',
+        'parameters': [
+            {
+                'name': 'de',
+                'in': 'query',
+                'required': False,
+                'type': 'string',
+                'description': 'Mês inicial no formato AAAA-MM (inclusive)'
+            },
+            {
+                'name': 'ate',
+                'in': 'query',
+                'required': False,
+                'type': 'string',
+                'description': 'Mês final no formato AAAA-MM (inclusive)'
+            }
+        ],
+        'responses': {
+            200: {
+                'description': 'Resumo mensal',
+                'schema': {
+                    'type': 'array',
+                    'items': {
+                        'type': 'object',
+                        'properties': {
+                            'mes': {'type': 'string', 'format': 'date'},
+                            'forma_pagamento': {'type': 'string'},
+                            'status': {'type': 'string'},
+                            'quantidade': {'type': 'integer'},
+                            'total': {'type': 'string', 'description': 'Valor decimal exato'}
+                        }
+                    }
+                }
+            },
+            400: {'description': 'Erro na requisição'}
+        }
+    },
+    'read_inadimplentes': {
+        'tags': ['Pagamentos'],
+        'description': 'Alunos sem pagamento com status "Pago" no mês de referência (visão materializada).',
+        'parameters': [{
+            'name': 'mes',
+            'in': 'query',
+            'required': False,
+            'type': 'string',
+            'description': 'Mês de referência no formato AAAA-MM. Padrão: mês corrente'
+        }],
+        'responses': {
+            200: {
+                'description': 'Alunos inadimplentes',
+                'schema': {
+                    'type': 'object',
+                    'properties': {
+                        'mes': {'type': 'string', 'format': 'date'},
+                        'alunos': {
+                            'type': 'array',
+                            'items': {
+                                'type': 'object',
+                                'properties': {
+                                    'id_aluno': {'type': 'integer'},
+                                    'nome_completo': {'type': 'string'},
+                                    'id_turma': {'type': 'integer'},
+                                    'ultimo_mes_pago': {'type': 'string', 'format': 'date'}
+                                }
+                            }
+                        }
+                    }
+                }
+            },
+            400: {'description': 'Erro na requisição'}
+        }
     }
 }
 
@@ -828,7 +1176,7 @@ presencas_docs = {
             'required': True,
             'type': 'integer',
             'description': 'ID da presença'
-        }],
+        }, fields_param],
         'responses': {
             200: {'description': 'Dados da presença'},
             404: {'description': 'Presença não encontrada'}
@@ -837,8 +1185,9 @@ presencas_docs = {
     'read_all_presencas': {
         'tags': ['Presenças'],
         'description': 'Lista todas as presenças.',
+        'parameters': pagination_params + presenca_filter_params + [fields_param],
         'responses': {
-            200: {'description': 'Lista de presenças'}
+            200: {'description': 'Lista de presenças', 'headers': pagination_headers}
         }
     },
     'update_presenca': {
@@ -887,6 +1236,54 @@ presencas_docs = {
             200: {'description': 'Presença deletada com sucesso'},
             404: {'description': 'Presença não encontrada'}
         }
+    },
+    'create_presencas_turma': {
+        'tags': ['Presenças'],
+        'description': 'Registra a chamada de uma turma inteira em uma única transação. '
+                       'Reenviar a mesma chamada atualiza as presenças já lançadas na data.',
+        'parameters': [
+            {
+                'name': 'id_turma',
+                'in': 'path',
+                'required': True,
+                'type': 'integer',
+                'description': 'ID da turma'
+            },
+            {
+                'name': 'body',
+                'in': 'body',
+                'required': True,
+                'schema': {
+                    'type': 'object',
+                    'properties': {
+                        'data_presenca': {'type': 'string', 'format': 'date', 'description': 'Data da chamada'},
+                        'presencas': {
+                            'type': 'array',
+                            'items': {
+                                'type': 'object',
+                                'properties': {
+                                    'id_aluno': {'type': 'integer'},
+                                    'presente': {'type': 'boolean'}
+                                }
+                            }
+                        }
+                    },
+                    'required': ['data_presenca', 'presencas'],
+                    'example': {
+                        'data_presenca': '2024-01-15',
+                        'presencas': [
+                            {'id_aluno': 1, 'presente': True},
+                            {'id_aluno': 2, 'presente': False}
+                        ]
+                    }
+                }
+            }
+        ],
+        'responses': {
+            201: {'description': 'Chamada registrada com sucesso'},
+            400: {'description': 'Chamada inválida'},
+            404: {'description': 'Turma não encontrada ou sem alunos'}
+        }
     }
 }
 
@@ -926,7 +1323,7 @@ atividades_docs = {
             'required': True,
             'type': 'integer',
             'description': 'ID da atividade'
-        }],
+        }, fields_param],
         'responses': {
             200: {'description': 'Dados da atividade'},
             404: {'description': 'Atividade não encontrada'}
@@ -935,8 +1332,9 @@ atividades_docs = {
     'read_all_atividades': {
         'tags': ['Atividades'],
         'description': 'Lista todas as atividades.',
+        'parameters': pagination_params + [fields_param],
         'responses': {
-            200: {'description': 'Lista de atividades'}
+            200: {'description': 'Lista de atividades', 'headers': pagination_headers}
         }
     },
     'update_atividade': {
@@ -1031,7 +1429,8 @@ atividades_alunos_docs = {
                 'required': True,
                 'type': 'integer',
                 'description': 'ID do aluno'
-            }
+            },
+            fields_param
         ],
         'responses': {
             200: {'description': 'Dados da associação'},
@@ -1041,6 +1440,7 @@ atividades_alunos_docs = {
     'read_all_atividades_alunos': {
         'tags': ['Atividades-Alunos'],
         'description': 'Lista todas as associações atividade-aluno.',
+        'parameters': [fields_param],
         'responses': {
             200: {'description': 'Lista de associações'}
         }
@@ -1111,7 +1511,7 @@ usuarios_docs = {
             'required': True,
             'type': 'integer',
             'description': 'ID do usuário'
-        }],
+        }, fields_param],
         'responses': {
             200: {'description': 'Dados do usuário'},
             404: {'description': 'Usuário não encontrado'}
@@ -1120,8 +1520,9 @@ usuarios_docs = {
     'read_all_usuarios': {
         'tags': ['Usuários'],
         'description': 'Lista todos os usuários.',
+        'parameters': pagination_params + [fields_param],
         'responses': {
-            200: {'description': 'Lista de usuários'}
+            200: {'description': 'Lista de usuários', 'headers': pagination_headers}
         }
     },
     'update_usuario': {
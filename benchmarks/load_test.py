@@ -0,0 +1,369 @@
+"""
+Load test of the API driven by a request trace in JSONL, one request per line:
+
+    {"method": "GET", "path": "/alunos/42", "name": "GET /alunos/<id_aluno>"}
+    {"method": "POST", "path": "/alunos", "json": {"nome_completo": "..."}}
+
+`name` groups the requests in the report; without it the route of the path
+is used. Generate a reproducible read-only trace from the ids in the database
+configured in app/Util/paramsBD.yml:
+
+    PYTHONPATH=. python benchmarks/load_test.py generate --requests 5000 --seed 1 -o trace.jsonl
+
+Replay it in process against create_app() (or against a running server with
+--url) and store the results as JSON:
+
+    PYTHONPATH=. python benchmarks/load_test.py run trace.jsonl --concurrency 16 \
+        --duration 30 -o resultados/atual.json
+
+Compare two runs; the exit status is 1 when an endpoint got slower (p95) or
+lost throughput beyond the tolerance, so it can gate a CI job:
+
+    python benchmarks/load_test.py compare resultados/base.json resultados/atual.json --tolerance 10
+"""
+import argparse
+import datetime
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+# (peso, nome, tabela de onde vêm os ids, caminho); {id} recebe um id existente
+READ_MIX = [
+    (20, 'GET /alunos/<id_aluno>', ('aluno', 'id_aluno'), '/alunos/{id}'),
+    (10, 'GET /turmas/<id_turma>', ('turma', 'id_turma'), '/turmas/{id}'),
+    (5, 'GET /professores/<id_professor>', ('professor', 'id_professor'), '/professores/{id}'),
+    (10, 'GET /pagamentos/<id_pagamento>', ('pagamento', 'id_pagamento'), '/pagamentos/{id}'),
+    (5, 'GET /presencas/<id_presenca>', ('presenca', 'id_presenca'), '/presencas/{id}'),
+    (10, 'GET /alunos', None, '/alunos?limit=50'),
+    (5, 'GET /pagamentos?id_aluno=', ('aluno', 'id_aluno'), '/pagamentos?limit=50&id_aluno={id}'),
+    (5, 'GET /presencas', None, '/presencas?limit=50'),
+    (3, 'GET /turmas', None, '/turmas?limit=50'),
+    (3, 'GET /turmas/<id_turma>/frequencia', ('turma', 'id_turma'), '/turmas/{id}/frequencia'),
+    (2, 'GET /pagamentos/resumo', None, '/pagamentos/resumo'),
+    (2, 'GET /pagamentos/inadimplentes', None, '/pagamentos/inadimplentes'),
+    (5, 'GET /order-details/<order_id>', ('order_details', 'order_id'), '/order-details/{id}'),
+    (2, 'GET /order-details?product_id=', ('order_details', 'product_id'), '/order-details?product_id={id}'),
+    (3, 'GET /categories', None, '/categories'),
+    (3, 'GET /categories/<category_id>', ('categories', 'category_id'), '/categories/{id}'),
+]
+
+_NUMBER = re.compile(r'/\d+(?=/|$)')
+
+
+def _sample_ids(cursor, table, key, limit=1000):
+    try:
+        cursor.execute(f"SELECT DISTINCT {key} FROM {table} ORDER BY {key} LIMIT %s", (limit,))
+        return [row[0] for row in cursor.fetchall()]
+    except Exception as e:
+        cursor.connection.rollback()
+        print(f"Ignorando {table}: {e}", file=sys.stderr)
+        return []
+
+
+def generate_trace(count, seed):
+    """
+    Build a read-only trace following READ_MIX, with ids taken from the
+    database. The same seed and data produce the same trace.
+    :return: List of request dicts
+    """
+    from app.Util.bd import create_connection
+
+    conn = create_connection()
+    cursor = conn.cursor()
+    try:
+        ids = {}
+        for _, _, source, _ in READ_MIX:
+            if source is not None and source not in ids:
+                ids[source] = _sample_ids(cursor, *source)
+    finally:
+        cursor.close()
+        conn.close()
+
+    mix = [entry for entry in READ_MIX if entry[2] is None or ids[entry[2]]]
+    rng = random.Random(seed)
+    weights = [entry[0] for entry in mix]
+    trace = []
+    for _, name, source, path in rng.choices(mix, weights=weights, k=count):
+        if source is not None:
+            path = path.format(id=rng.choice(ids[source]))
+        trace.append({'method': 'GET', 'path': path, 'name': name})
+    return trace
+
+
+def load_trace(path):
+    with open(path, 'r', encoding='utf-8') as trace_file:
+        trace = [json.loads(line) for line in trace_file if line.strip()]
+    if not trace:
+        raise SystemExit(f"Trace vazio: {path}")
+    return trace
+
+
+class InProcessTarget:
+    """
+    Send the requests straight to create_app() through the Flask test client,
+    measuring the application and the database without the network and
+    the WSGI server.
+    """
+
+    def __init__(self):
+        from app import create_app
+
+        self.app = create_app()
+        self.adapter = self.app.url_map.bind('localhost')
+        self.local = threading.local()
+
+    def name(self, entry):
+        try:
+            rule, _ = self.adapter.match(entry['path'].split('?', 1)[0], method=entry.get('method', 'GET'),
+                                         return_rule=True)
+            return f"{entry.get('method', 'GET')} {rule.rule}"
+        except Exception:
+            return None
+
+    def send(self, entry):
+        client = getattr(self.local, 'client', None)
+        if client is None:
+            client = self.local.client = self.app.test_client()
+        response = client.open(entry['path'], method=entry.get('method', 'GET'), json=entry.get('json'))
+        try:
+            response.get_data()
+            return response.status_code
+        finally:
+            response.close()
+
+
+class HttpTarget:
+    """
+    Send the requests to a running server (e.g. ./start_api.sh).
+    """
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+
+    def name(self, entry):
+        return None
+
+    def send(self, entry):
+        body = None
+        headers = {}
+        if entry.get('json') is not None:
+            body = json.dumps(entry['json']).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+        request = urllib.request.Request(self.base_url + entry['path'], data=body, headers=headers,
+                                         method=entry.get('method', 'GET'))
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            e.read()
+            return e.code
+
+
+def _entry_name(target, entry):
+    if entry.get('name'):
+        return entry['name']
+    return target.name(entry) or f"{entry.get('method', 'GET')} {_NUMBER.sub('/<id>', entry['path'].split('?', 1)[0])}"
+
+
+def replay(target, trace, concurrency, duration):
+    """
+    Replay the trace with `concurrency` closed-loop clients. With a duration
+    the trace is cycled until it expires; otherwise it runs once.
+    :return: (elapsed seconds, list of (name, seconds, status or None))
+    """
+    names = [_entry_name(target, entry) for entry in trace]
+    samples = []
+    lock = threading.Lock()
+    position = [0]
+    deadline = time.perf_counter() + duration if duration else None
+
+    def next_index():
+        with lock:
+            index = position[0]
+            position[0] += 1
+        if deadline is None:
+            return index if index < len(trace) else None
+        return index % len(trace) if time.perf_counter() < deadline else None
+
+    def client():
+        local = []
+        while True:
+            index = next_index()
+            if index is None:
+                break
+            start = time.perf_counter()
+            try:
+                status = target.send(trace[index])
+            except (urllib.error.URLError, OSError):
+                status = None
+            local.append((names[index], time.perf_counter() - start, status))
+        with lock:
+            samples.extend(local)
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started, samples
+
+
+def _summary(latencies, errors, elapsed):
+    latencies = sorted(latencies)
+
+    def pct(p):
+        return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000, 3) if latencies else 0.0
+
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        'mean_ms': round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+        'p50_ms': pct(0.50),
+        'p95_ms': pct(0.95),
+        'p99_ms': pct(0.99),
+        'max_ms': round(latencies[-1] * 1000, 3) if latencies else 0.0,
+    }
+
+
+def summarize(samples, elapsed):
+    """
+    Aggregate the samples overall and per endpoint. Requests without a
+    response or answered with 5xx count as errors.
+    """
+    per_endpoint = {}
+    for name, seconds, status in samples:
+        latencies, errors = per_endpoint.setdefault(name, ([], [0]))
+        latencies.append(seconds)
+        if status is None or status >= 500:
+            errors[0] += 1
+    return {
+        'overall': _summary([seconds for _, seconds, _ in samples],
+                            sum(errors[0] for _, errors in per_endpoint.values()), elapsed),
+        'endpoints': {
+            name: _summary(latencies, errors[0], elapsed) for name, (latencies, errors) in sorted(per_endpoint.items())
+        },
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _print_table(rows):
+    print(f"{'endpoint':<40} {'req':>7} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for name, result in rows:
+        print(f"{name[:40]:<40} {result['requests']:>7} {result['rps']:>9.1f} {result['p50_ms']:>8.1f} "
+              f"{result['p95_ms']:>8.1f} {result['p99_ms']:>8.1f} {result['errors']:>7}")
+
+
+def cmd_generate(args):
+    trace = generate_trace(args.requests, args.seed)
+    with open(args.output, 'w', encoding='utf-8') as trace_file:
+        for entry in trace:
+            trace_file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+    print(f"{len(trace)} requisições gravadas em {args.output}")
+    return 0
+
+
+def cmd_run(args):
+    trace = load_trace(args.trace)
+    target = HttpTarget(args.url) if args.url else InProcessTarget()
+    if args.warmup:
+        replay(target, trace, args.concurrency, args.warmup)
+    elapsed, samples = replay(target, trace, args.concurrency, args.duration)
+    result = {
+        'started_at': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'git_commit': _git_commit(),
+        'target': args.url or 'create_app()',
+        'trace': os.path.basename(args.trace),
+        'concurrency': args.concurrency,
+        'duration_s': round(elapsed, 3),
+        **summarize(samples, elapsed),
+    }
+    _print_table(list(result['endpoints'].items()) + [('TOTAL', result['overall'])])
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as result_file:
+            json.dump(result, result_file, ensure_ascii=False, indent=2)
+        print(f"Resultado gravado em {args.output}")
+    return 0
+
+
+def compare(base, current, tolerance):
+    """
+    Compare two results endpoint by endpoint.
+    :param tolerance: Accepted p95 increase / throughput drop, in percent
+    :return: List of (name, p95 base, p95 current, rps change %, regressed)
+    """
+    rows = []
+    for name in sorted(set(base['endpoints']) & set(current['endpoints'])):
+        before, after = base['endpoints'][name], current['endpoints'][name]
+        p95_change = (after['p95_ms'] - before['p95_ms']) / before['p95_ms'] * 100 if before['p95_ms'] else 0.0
+        rps_change = (after['rps'] - before['rps']) / before['rps'] * 100 if before['rps'] else 0.0
+        regressed = p95_change > tolerance or rps_change < -tolerance or after['errors'] > before['errors']
+        rows.append((name, before['p95_ms'], after['p95_ms'], p95_change, rps_change, regressed))
+    return rows
+
+
+def cmd_compare(args):
+    with open(args.base, 'r', encoding='utf-8') as base_file:
+        base = json.load(base_file)
+    with open(args.current, 'r', encoding='utf-8') as current_file:
+        current = json.load(current_file)
+    rows = compare(base, current, args.tolerance)
+    print(f"{base.get('git_commit')} -> {current.get('git_commit')} (tolerância {args.tolerance:.0f}%)")
+    print(f"{'endpoint':<40} {'p95 base':>9} {'p95 atual':>9} {'p95 %':>7} {'req/s %':>8}")
+    for name, p95_before, p95_after, p95_change, rps_change, regressed in rows:
+        print(f"{name[:40]:<40} {p95_before:>9.1f} {p95_after:>9.1f} {p95_change:>+7.1f} {rps_change:>+8.1f}"
+              f"{'  REGRESSÃO' if regressed else ''}")
+    for name in sorted(set(base['endpoints']) ^ set(current['endpoints'])):
+        print(f"{name[:40]:<40} presente em apenas um dos resultados")
+    return 1 if any(row[-1] for row in rows) else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    generate = commands.add_parser('generate', help='Generate a read-only trace from the database ids')
+    generate.add_argument('--requests', type=int, default=5000)
+    generate.add_argument('--seed', type=int, default=1)
+    generate.add_argument('-o', '--output', default='trace.jsonl')
+    generate.set_defaults(func=cmd_generate)
+
+    run = commands.add_parser('run', help='Replay a trace and report latency per endpoint')
+    run.add_argument('trace', help='JSONL trace file')
+    run.add_argument('--url', help='Base URL of a running server (default: create_app() in process)')
+    run.add_argument('--concurrency', type=int, default=8)
+    run.add_argument('--duration', type=float, default=0.0,
+                     help='Seconds to keep cycling through the trace (default: replay it once)')
+    run.add_argument('--warmup', type=float, default=0.0, help='Seconds of unmeasured load before the run')
+    run.add_argument('-o', '--output', help='JSON file to store the results')
+    run.set_defaults(func=cmd_run)
+
+    comp = commands.add_parser('compare', help='Compare two results and flag regressions')
+    comp.add_argument('base')
+    comp.add_argument('current')
+    comp.add_argument('--tolerance', type=float, default=10.0)
+    comp.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
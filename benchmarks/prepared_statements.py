@@ -0,0 +1,84 @@
+"""
+Compare the latency of the hot single-row queries sent as ad-hoc SQL
+(cursor.execute) and as server-side prepared statements
+(app.Util.statements.execute_prepared), on one connection to the database
+configured in app/Util/paramsBD.yml.
+
+    PYTHONPATH=. python benchmarks/prepared_statements.py --iterations 5000
+"""
+import argparse
+import statistics
+import time
+
+from app.Util.bd import create_connection
+from app.Util.schema import TABLE_COLUMNS
+from app.Util.statements import execute_prepared
+
+QUERIES = {
+    'read_aluno': (f"SELECT {', '.join(TABLE_COLUMNS['aluno'])} FROM aluno WHERE id_aluno = %s", 'aluno', 'id_aluno'),
+    'read_pagamento': (
+        f"SELECT {', '.join(TABLE_COLUMNS['pagamento'])} FROM pagamento WHERE id_pagamento = %s", 'pagamento', 'id_pagamento'
+    ),
+    'read_presenca': (
+        f"SELECT {', '.join(TABLE_COLUMNS['presenca'])} FROM presenca WHERE id_presenca = %s", 'presenca', 'id_presenca'
+    ),
+    'read_usuario': (f"SELECT {', '.join(TABLE_COLUMNS['usuario'])} FROM usuario WHERE id_usuario = %s", 'usuario', 'id_usuario'),
+}
+
+
+def _existing_ids(cursor, table, key, limit=100):
+    cursor.execute(f"SELECT {key} FROM {table} ORDER BY {key} LIMIT %s", (limit,))
+    return [row[0] for row in cursor.fetchall()] or [1]
+
+
+def measure(cursor, execute, sql, ids, iterations):
+    """
+    Run `sql` `iterations` times, cycling through ids.
+    :return: dict with latency statistics in microseconds
+    """
+    for key in ids[:10]:  # aquecimento (inclui o PREPARE)
+        execute(cursor, sql, (key,))
+        cursor.fetchone()
+    latencies = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        execute(cursor, sql, (ids[i % len(ids)],))
+        cursor.fetchone()
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return {
+        'mean_us': statistics.mean(latencies) * 1e6,
+        'p50_us': latencies[len(latencies) // 2] * 1e6,
+        'p95_us': latencies[int(len(latencies) * 0.95)] * 1e6,
+    }
+
+
+def _adhoc(cursor, sql, params):
+    cursor.execute(sql, params)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('--query', action='append', dest='queries', choices=sorted(QUERIES),
+                        help='Query to measure (repeatable, default: all)')
+    args = parser.parse_args()
+
+    conn = create_connection()
+    conn.autocommit = True
+    cursor = conn.cursor()
+    try:
+        print(f"{'query':<16} {'mode':<9} {'mean us':>9} {'p50 us':>9} {'p95 us':>9}")
+        for name in args.queries or sorted(QUERIES):
+            sql, table, key = QUERIES[name]
+            ids = _existing_ids(cursor, table, key)
+            for mode, execute in (('ad-hoc', _adhoc), ('prepared', execute_prepared)):
+                result = measure(cursor, execute, sql, ids, args.iterations)
+                print(f"{name:<16} {mode:<9} {result['mean_us']:>9.1f} {result['p50_us']:>9.1f} {result['p95_us']:>9.1f}")
+    finally:
+        cursor.close()
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
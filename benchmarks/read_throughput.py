@@ -0,0 +1,94 @@
+"""
+Compare the read throughput of the sync (Flask/gthread) and async (ASGI/asyncpg)
+serving modes against the same database.
+
+Start both servers, e.g.:
+
+    APP_SERVER=gunicorn PORT=5000 ./start_api.sh
+    APP_SERVER=async PORT=5001 ./start_api.sh
+
+and run:
+
+    python benchmarks/read_throughput.py --sync-url http://localhost:5000 \
+        --async-url http://localhost:5001 --concurrency 200 --duration 20
+"""
+import argparse
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+
+DEFAULT_PATHS = ['/alunos/1', '/turmas/1', '/presencas?limit=50', '/pagamentos/1', '/order-details/10248']
+
+
+def run(base_url, paths, concurrency, duration):
+    """
+    Hit base_url with `concurrency` closed-loop clients for `duration` seconds.
+    :return: dict with requests/s, error count and latency percentiles (ms)
+    """
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client(offset):
+        i = offset
+        local = []
+        failed = 0
+        while time.perf_counter() < deadline:
+            url = base_url + paths[i % len(paths)]
+            i += 1
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(url, timeout=30) as response:
+                    response.read()
+            except (urllib.error.URLError, OSError):
+                failed += 1
+                continue
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else 0.0
+    return {
+        'requests': len(latencies),
+        'errors': errors[0],
+        'rps': len(latencies) / elapsed,
+        'mean_ms': statistics.mean(latencies) * 1000 if latencies else 0.0,
+        'p50_ms': pct(0.50),
+        'p95_ms': pct(0.95),
+        'p99_ms': pct(0.99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sync-url', default='http://localhost:5000')
+    parser.add_argument('--async-url', default='http://localhost:5001')
+    parser.add_argument('--path', action='append', dest='paths', help='Path to request (repeatable)')
+    parser.add_argument('--concurrency', type=int, default=100)
+    parser.add_argument('--duration', type=float, default=15.0)
+    args = parser.parse_args()
+    paths = args.paths or DEFAULT_PATHS
+
+    print(f"{'mode':<6} {'req/s':>10} {'mean ms':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for mode, url in (('sync', args.sync_url), ('async', args.async_url)):
+        result = run(url.rstrip('/'), paths, args.concurrency, args.duration)
+        print(f"{mode:<6} {result['rps']:>10.1f} {result['mean_ms']:>9.1f} {result['p50_ms']:>8.1f} "
+              f"{result['p95_ms']:>8.1f} {result['p99_ms']:>8.1f} {result['errors']:>7}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+# Configuração do Gunicorn para o modo de produção (APP_SERVER=gunicorn).
+# Todos os valores podem ser ajustados por variáveis de ambiente.
+import multiprocessing
+import os
+import shutil
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+
+# Processos pré-criados (fork) com várias threads cada
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', '4'))
+worker_class = 'gthread'
+
+# Carrega create_app() uma vez no processo mestre e compartilha a memória com os workers
+preload_app = True
+
+# Reciclagem dos workers depois de N requisições (com variação para não reiniciarem juntos)
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', '1000'))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', '100'))
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '30'))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', '5'))
+
+accesslog = '-'
+errorlog = '-'
+
+
+def on_starting(server):
+    # Métricas de execuções anteriores não podem ser somadas às novas
+    multiproc_dir = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if multiproc_dir:
+        shutil.rmtree(multiproc_dir, ignore_errors=True)
+        os.makedirs(multiproc_dir, exist_ok=True)
+
+
+def when_ready(server):
+    # Nenhuma conexão aberta durante o preload pode ser herdada pelos workers
+    from app.Util.bd import close_pool
+    close_pool()
+
+
+def post_fork(server, worker):
+    # Cada worker cria o próprio pool de conexões no primeiro acesso ao banco
+    from app.Util.bd import close_pool
+    close_pool()
+
+
+def child_exit(server, worker):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
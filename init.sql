@@ -1,3 +1,6 @@
+DROP MATERIALIZED VIEW IF EXISTS pagamento_resumo_mensal;
+DROP MATERIALIZED VIEW IF EXISTS pagamento_meses_pagos;
+DROP TABLE IF EXISTS frequencia_mensal;
 DROP TABLE IF EXISTS atividade_aluno;
 DROP TABLE IF EXISTS atividade;
 DROP TABLE IF EXISTS presenca;
@@ -23,7 +26,7 @@ CREATE TABLE turma (
 );
 
 CREATE TABLE aluno (
-    id_aluno INTEGER PRIMARY KEY,
+    id_aluno INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
     nome_completo VARCHAR(255) NOT NULL,
     data_nascimento DATE NOT NULL,
     id_turma INT,
@@ -52,7 +55,7 @@ CREATE TABLE pagamento (
 );
 
 CREATE TABLE presenca (
-    id_presenca INTEGER PRIMARY KEY,
+    id_presenca INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
     id_aluno INT,
     data_presenca DATE NOT NULL,
     presente BOOLEAN,
@@ -82,6 +85,95 @@ CREATE TABLE usuario (
     FOREIGN KEY (id_professor) REFERENCES professor(id_professor)
 );
 
+-- Índices para paginação por cursor (keyset) das listagens
+CREATE INDEX idx_professor_nome_id ON professor (nome_completo, id_professor);
+CREATE INDEX idx_turma_nome_id ON turma (nome_turma, id_turma);
+CREATE INDEX idx_aluno_nome_id ON aluno (nome_completo, id_aluno);
+CREATE INDEX idx_pagamento_data_id ON pagamento (data_pagamento, id_pagamento);
+CREATE INDEX idx_presenca_data_id ON presenca (data_presenca, id_presenca);
+CREATE INDEX idx_atividade_data_id ON atividade (data_realizacao, id_atividade);
+
+-- Índices dos filtros das listagens (GET /alunos?id_turma=, /pagamentos?id_aluno=&status=).
+-- Os filtros de /presencas por aluno e período usam uq_presenca_aluno_data.
+CREATE INDEX idx_aluno_turma_nome_id ON aluno (id_turma, nome_completo, id_aluno);
+CREATE INDEX idx_pagamento_aluno_data_id ON pagamento (id_aluno, data_pagamento, id_pagamento);
+CREATE INDEX idx_pagamento_status_data_id ON pagamento (status, data_pagamento, id_pagamento);
+
+-- Índices das chaves estrangeiras sem índice próprio (JOINs e verificação da FK nos DELETEs)
+CREATE INDEX idx_turma_professor ON turma (id_professor);
+CREATE INDEX idx_atividade_aluno_aluno ON atividade_aluno (id_aluno);
+CREATE INDEX idx_usuario_professor ON usuario (id_professor);
+
+-- Uma presença por aluno por dia (chamada idempotente em POST /turmas/<id>/presencas)
+ALTER TABLE presenca ADD CONSTRAINT uq_presenca_aluno_data UNIQUE (id_aluno, data_presenca);
+
+-- Contador de alterações por tabela, usado como validador (ETag/Last-Modified) pela API
+CREATE TABLE IF NOT EXISTS table_version (
+    table_name VARCHAR(63) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    modified_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO table_version (table_name, version, modified_at)
+    VALUES (TG_TABLE_NAME, 1, now())
+    ON CONFLICT (table_name) DO UPDATE
+    SET version = table_version.version + 1, modified_at = now();
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_professor_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON professor
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+CREATE TRIGGER trg_turma_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON turma
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+CREATE TRIGGER trg_aluno_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON aluno
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+CREATE TRIGGER trg_pagamento_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON pagamento
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+CREATE TRIGGER trg_presenca_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON presenca
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+CREATE TRIGGER trg_atividade_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON atividade
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+CREATE TRIGGER trg_atividade_aluno_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON atividade_aluno
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+CREATE TRIGGER trg_usuario_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON usuario
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+
+-- Consolidado mensal de presenças por aluno, mantido pelo trigger de presenca.
+-- GET /turmas/<id>/frequencia soma os meses inteiros do período aqui e só lê
+-- de presenca os dias dos meses incompletos das pontas.
+CREATE TABLE IF NOT EXISTS frequencia_mensal (
+    id_aluno INT NOT NULL REFERENCES aluno(id_aluno) ON DELETE CASCADE,
+    mes DATE NOT NULL,
+    presentes INT NOT NULL DEFAULT 0,
+    registros INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (id_aluno, mes)
+);
+
+CREATE OR REPLACE FUNCTION atualizar_frequencia_mensal() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.id_aluno IS NOT NULL THEN
+        UPDATE frequencia_mensal
+        SET presentes = presentes - (CASE WHEN OLD.presente THEN 1 ELSE 0 END),
+            registros = registros - 1
+        WHERE id_aluno = OLD.id_aluno AND mes = date_trunc('month', OLD.data_presenca)::date;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.id_aluno IS NOT NULL THEN
+        INSERT INTO frequencia_mensal (id_aluno, mes, presentes, registros)
+        VALUES (NEW.id_aluno, date_trunc('month', NEW.data_presenca)::date, CASE WHEN NEW.presente THEN 1 ELSE 0 END, 1)
+        ON CONFLICT (id_aluno, mes) DO UPDATE
+        SET presentes = frequencia_mensal.presentes + EXCLUDED.presentes,
+            registros = frequencia_mensal.registros + 1;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_presenca_frequencia AFTER INSERT OR UPDATE OR DELETE ON presenca
+    FOR EACH ROW EXECUTE FUNCTION atualizar_frequencia_mensal();
+
 INSERT INTO professor (id_professor, nome_completo, email, telefone) VALUES 
 (1, 'João Silva', 'joao@escola.com', '123456789'),
 (2, 'Maria Santos', 'maria@escola.com', '987654321');
@@ -95,6 +187,9 @@ INSERT INTO aluno (id_aluno, nome_completo, data_nascimento, id_turma, nome_resp
 (2, 'Pedro Almeida', '2011-03-20', 1, 'Carlos Almeida', '123456789', 'carlos@escola.com', 'Rua B, 456', 'Rio de Janeiro', 'RJ', '23456-789', 'Brasil', '21987654321'),
 (3, 'Lucas Pereira', '2010-07-30', 2, 'Fernanda Pereira', '456789123', 'fernanda@escola.com', 'Rua C, 789', 'Belo Horizonte', 'MG', '34567-890', 'Brasil', '31987654321');
 
+-- A carga usa ids explícitos; as sequências continuam a partir do maior
+SELECT setval(pg_get_serial_sequence('aluno', 'id_aluno'), (SELECT max(id_aluno) FROM aluno));
+
 INSERT INTO pagamento (id_pagamento, id_aluno, data_pagamento, valor_pago, forma_pagamento, referencia, status) VALUES 
 (1, 1, '2023-03-01', 200.00, 'Transferência', 'Mensalidade Março', 'Pago'),
 (2, 2, '2023-03-01', 200.00, 'Cartão de Crédito', 'Mensalidade Março', 'Pendente');
@@ -103,6 +198,8 @@ INSERT INTO presenca (id_presenca, id_aluno, data_presenca, presente) VALUES
 (1, 1, '2023-03-01', TRUE),
 (2, 2, '2023-03-01', FALSE);
 
+SELECT setval(pg_get_serial_sequence('presenca', 'id_presenca'), (SELECT max(id_presenca) FROM presenca));
+
 INSERT INTO atividade (id_atividade, descricao, data_realizacao) VALUES 
 (1, 'Atividade de Matemática', '2023-03-15'),
 (2, 'Atividade de Português', '2023-03-20');
@@ -115,4 +212,23 @@ INSERT INTO atividade_aluno (id_atividade, id_aluno) VALUES
 
 INSERT INTO usuario (id_usuario, login, senha, nivel_acesso, id_professor) VALUES 
 (1, 'usuario1', 'senha_hash_1', 'professor', 1),
-(2, 'usuario2', 'senha_hash_2', 'administrador', NULL);
\ No newline at end of file
+(2, 'usuario2', 'senha_hash_2', 'administrador', NULL);
+
+-- Visões materializadas dos relatórios de pagamentos (GET /pagamentos/resumo e
+-- /pagamentos/inadimplentes), criadas após a carga para já nascerem preenchidas.
+-- São atualizadas com REFRESH ... CONCURRENTLY pela API (app/Util/matviews.py),
+-- o que exige um índice único em cada uma.
+CREATE MATERIALIZED VIEW IF NOT EXISTS pagamento_resumo_mensal AS
+SELECT date_trunc('month', data_pagamento)::date AS mes, forma_pagamento, status,
+       count(*) AS quantidade, sum(valor_pago) AS total
+FROM pagamento
+GROUP BY 1, 2, 3;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_pagamento_resumo_mensal ON pagamento_resumo_mensal (mes, forma_pagamento, status);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS pagamento_meses_pagos AS
+SELECT DISTINCT id_aluno, date_trunc('month', data_pagamento)::date AS mes
+FROM pagamento
+WHERE id_aluno IS NOT NULL AND lower(status) = 'pago';
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_pagamento_meses_pagos ON pagamento_meses_pagos (id_aluno, mes);
@@ -20,7 +20,7 @@ CREATE TABLE turma (
 -- Tabela de Alunos
 -- Relacionamento: turma (1) --- (N) aluno
 CREATE TABLE aluno (
-    id_aluno INTEGER PRIMARY KEY, -- Identificador único do aluno
+    id_aluno INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY, -- Identificador único do aluno (gerado quando omitido)
     nome_completo VARCHAR(255) NOT NULL, -- Nome completo do aluno
     data_nascimento DATE NOT NULL, -- Data de nascimento
     id_turma INTEGER, -- FK: cada aluno pertence a uma turma (1:N)
@@ -53,7 +53,7 @@ CREATE TABLE pagamento (
 -- Tabela de Presenças
 -- Relacionamento: aluno (1) --- (N) presenca
 CREATE TABLE presenca (
-    id_presenca INTEGER PRIMARY KEY, -- Identificador da presença
+    id_presenca INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY, -- Identificador da presença (gerado quando omitido)
     id_aluno INTEGER, -- FK: cada presença está vinculada a um aluno (1:N)
     data_presenca DATE NOT NULL, -- Data da presença
     presente BOOLEAN, -- Indica se o aluno esteve presente (true/false)
@@ -87,3 +87,114 @@ CREATE TABLE usuario (
     nivel_acesso VARCHAR(20), -- Nível de acesso (admin, professor, etc)
     id_professor INTEGER, -- FK: usuário pode ser vinculado a um professor (1:N)
     FOREIGN KEY (id_professor) REFERENCES professor(id_professor) -- FK
+);
+
+-- Índices para paginação por cursor (keyset) das listagens
+-- Cada índice cobre a ordenação da listagem com a PK como critério de desempate
+CREATE INDEX idx_professor_nome_id ON professor (nome_completo, id_professor); -- GET /professores
+CREATE INDEX idx_turma_nome_id ON turma (nome_turma, id_turma); -- GET /turmas
+CREATE INDEX idx_aluno_nome_id ON aluno (nome_completo, id_aluno); -- GET /alunos
+CREATE INDEX idx_pagamento_data_id ON pagamento (data_pagamento, id_pagamento); -- GET /pagamentos
+CREATE INDEX idx_presenca_data_id ON presenca (data_presenca, id_presenca); -- GET /presencas
+CREATE INDEX idx_atividade_data_id ON atividade (data_realizacao, id_atividade); -- GET /atividades
+
+-- Índices dos filtros das listagens: coluna filtrada seguida da ordenação da listagem,
+-- para que o filtro e a paginação sejam atendidos pelo mesmo índice
+CREATE INDEX idx_aluno_turma_nome_id ON aluno (id_turma, nome_completo, id_aluno); -- GET /alunos?id_turma=
+CREATE INDEX idx_pagamento_aluno_data_id ON pagamento (id_aluno, data_pagamento, id_pagamento); -- GET /pagamentos?id_aluno=
+CREATE INDEX idx_pagamento_status_data_id ON pagamento (status, data_pagamento, id_pagamento); -- GET /pagamentos?status=
+-- GET /presencas?id_aluno=&data_de=&data_ate= usa uq_presenca_aluno_data (id_aluno, data_presenca)
+
+-- Índices das chaves estrangeiras: sem eles, excluir um professor, turma ou aluno
+-- faz uma leitura sequencial da tabela filha para verificar a FK
+CREATE INDEX idx_turma_professor ON turma (id_professor); -- FK turma -> professor
+CREATE INDEX idx_atividade_aluno_aluno ON atividade_aluno (id_aluno); -- FK atividade_aluno -> aluno (a PK começa por id_atividade)
+CREATE INDEX idx_usuario_professor ON usuario (id_professor); -- FK usuario -> professor
+
+-- Uma presença por aluno por dia: permite regravar a chamada da turma sem duplicar registros
+ALTER TABLE presenca ADD CONSTRAINT uq_presenca_aluno_data UNIQUE (id_aluno, data_presenca); -- POST /turmas/<id>/presencas
+
+-- Contador de alterações por tabela
+-- Incrementado por gatilho a cada escrita; a API o usa para responder 304 Not Modified (ETag/Last-Modified)
+CREATE TABLE IF NOT EXISTS table_version (
+    table_name VARCHAR(63) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    modified_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO table_version (table_name, version, modified_at)
+    VALUES (TG_TABLE_NAME, 1, now())
+    ON CONFLICT (table_name) DO UPDATE
+    SET version = table_version.version + 1, modified_at = now();
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_professor_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON professor
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+CREATE TRIGGER trg_turma_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON turma
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+CREATE TRIGGER trg_aluno_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON aluno
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+CREATE TRIGGER trg_pagamento_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON pagamento
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+CREATE TRIGGER trg_presenca_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON presenca
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+CREATE TRIGGER trg_atividade_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON atividade
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+CREATE TRIGGER trg_atividade_aluno_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON atividade_aluno
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+CREATE TRIGGER trg_usuario_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON usuario
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+
+-- Consolidado mensal de presenças por aluno, mantido pelo trigger de presenca.
+-- GET /turmas/<id>/frequencia soma os meses inteiros do período aqui e só lê
+-- de presenca os dias dos meses incompletos das pontas.
+CREATE TABLE IF NOT EXISTS frequencia_mensal (
+    id_aluno INT NOT NULL REFERENCES aluno(id_aluno) ON DELETE CASCADE,
+    mes DATE NOT NULL,
+    presentes INT NOT NULL DEFAULT 0,
+    registros INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (id_aluno, mes)
+);
+
+CREATE OR REPLACE FUNCTION atualizar_frequencia_mensal() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.id_aluno IS NOT NULL THEN
+        UPDATE frequencia_mensal
+        SET presentes = presentes - (CASE WHEN OLD.presente THEN 1 ELSE 0 END),
+            registros = registros - 1
+        WHERE id_aluno = OLD.id_aluno AND mes = date_trunc('month', OLD.data_presenca)::date;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.id_aluno IS NOT NULL THEN
+        INSERT INTO frequencia_mensal (id_aluno, mes, presentes, registros)
+        VALUES (NEW.id_aluno, date_trunc('month', NEW.data_presenca)::date, CASE WHEN NEW.presente THEN 1 ELSE 0 END, 1)
+        ON CONFLICT (id_aluno, mes) DO UPDATE
+        SET presentes = frequencia_mensal.presentes + EXCLUDED.presentes,
+            registros = frequencia_mensal.registros + 1;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_presenca_frequencia AFTER INSERT OR UPDATE OR DELETE ON presenca
+    FOR EACH ROW EXECUTE FUNCTION atualizar_frequencia_mensal();
+
+-- Visões materializadas dos relatórios de pagamentos, atualizadas com
+-- REFRESH MATERIALIZED VIEW CONCURRENTLY (exige índice único) pela API
+CREATE MATERIALIZED VIEW IF NOT EXISTS pagamento_resumo_mensal AS
+SELECT date_trunc('month', data_pagamento)::date AS mes, forma_pagamento, status,
+       count(*) AS quantidade, sum(valor_pago) AS total
+FROM pagamento
+GROUP BY 1, 2, 3; -- GET /pagamentos/resumo
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_pagamento_resumo_mensal ON pagamento_resumo_mensal (mes, forma_pagamento, status);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS pagamento_meses_pagos AS
+SELECT DISTINCT id_aluno, date_trunc('month', data_pagamento)::date AS mes
+FROM pagamento
+WHERE id_aluno IS NOT NULL AND lower(status) = 'pago'; -- GET /pagamentos/inadimplentes
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_pagamento_meses_pagos ON pagamento_meses_pagos (id_aluno, mes);
@@ -0,0 +1,21 @@
+#!/bin/sh
+# Inicia a API no modo escolhido por APP_SERVER:
+#   gunicorn (padrão) - produção, workers síncronos com threads (wsgi.py)
+#   async             - produção, workers ASGI com leituras assíncronas (app/asgi.py)
+#   dev               - servidor de desenvolvimento do Flask (app.py)
+# Antes de subir, aplica as migrações pendentes (app/migrations); RUN_MIGRATIONS=0 desliga.
+if [ "${RUN_MIGRATIONS:-1}" = "1" ]; then
+    python -m app.Util.migrations || echo "Falha ao aplicar as migrações; iniciando a API mesmo assim"
+fi
+
+case "${APP_SERVER:-gunicorn}" in
+    dev)
+        exec python app.py
+        ;;
+    async)
+        exec gunicorn -c gunicorn.conf.py -k uvicorn.workers.UvicornWorker app.asgi:app
+        ;;
+    *)
+        exec gunicorn -c gunicorn.conf.py wsgi:app
+        ;;
+esac
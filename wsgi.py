@@ -0,0 +1,4 @@
+# Ponto de entrada WSGI para servidores de produção (ex.: gunicorn -c gunicorn.conf.py wsgi:app)
+from app import create_app
+
+app = create_app()